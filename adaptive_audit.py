@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Sequential (adaptive) audits for the ZK Data Integrity Audit System.
+
+A fixed audit verifies every selected block, even after the first tampered
+block has decided the verdict. run_adaptive_audit instead walks the
+upload's data blocks in the selector's seeded order
+(RandomBlockSelector.iter_random_blocks), where every prefix is a uniform
+sample, and verifies them a batch at a time. It stops at the first batch
+holding a tampered block. Otherwise it goes on until the clean blocks
+reach the target confidence (the fixed audit's sample size for that
+confidence) or the block budget runs out. The confidence reached is
+recorded after every batch.
+
+Stopping at a tampered block never changes the verdict, and a clean audit
+stops at exactly the fixed sample, on the same blocks for the same seed,
+so the fixed audit's guarantees hold. Tampered uploads are decided after
+about N / (K + 1) blocks instead of the whole sample, and a higher target
+buys more confidence only while the upload keeps verifying clean.
+
+Blocks are verified by a callable taking block indices and returning the
+tampered ones: CommitmentVerifier re-hashes the stored blocks against the
+commitment and its Merkle tree or Mountain Range root, and StarkVerifier runs verification-rs'
+``verify_upload_blocks`` (a STARK proof per block) on each batch.
+
+Usage:
+    python adaptive_audit.py merkle_commitments/commitment_<id>.json upload_blocks/<id> [--confidence 0.99]
+                             [--budget 200] [--stark]
+"""
+
+import json
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from binary_commitment import BinaryCommitment, is_binary_commitment, load_commitment
+from block_storage import open_block_reader
+from compact_merkle import get_commitment_authentication_path, recompute_root_path
+from incremental_commit import hash_block_data
+from merkle_mountain_range import mmr_authentication_path, verify_mmr_path
+from random_block_selector import SIZING_METHODS, RandomBlockSelector
+
+# Audit outcomes: a tampered block was found, the clean blocks reached the
+# target confidence (or every block was verified), or the budget ran out first
+VERDICTS = ('tampered', 'clean', 'budget_exhausted')
+
+COMMITMENT_TYPES = ('merkle_tree', 'merkle_mountain_range')
+
+# Blocks per verify call; the STARK verifier starts one process per batch
+DEFAULT_BATCH_SIZE = 1
+DEFAULT_STARK_BATCH_SIZE = 8
+
+
+class CommitmentVerifier:
+    """
+    Checks blocks of an upload against its commitment (one of
+    COMMITMENT_TYPES): the stored bytes must hash to the committed block
+    hash, and that hash must authenticate against the committed root.
+    Unreadable blocks, and blocks whose check raises, count as tampered;
+    the errors raised are kept in ``errors`` by block index.
+    """
+
+    def __init__(self, commitment_file: str, blocks_dir: str):
+        self.commitment = load_commitment(commitment_file)
+        commitment_type = self.commitment.get('commitment_type', 'merkle_tree')
+        if commitment_type not in COMMITMENT_TYPES:
+            raise ValueError(f"Cannot verify a {commitment_type} commitment (expected one of {COMMITMENT_TYPES})")
+        self.blocks = self.commitment['block_metadata']
+        self.root = self.commitment['root_hash'][0]
+        # Mountain Range paths are derived from the leaf hashes
+        self.mmr_leaves = ([block['hash'] for block in self.blocks]
+                           if commitment_type == 'merkle_mountain_range' else None)
+        self.reader = open_block_reader(blocks_dir)
+        self.errors: Dict[int, str] = {}
+
+    def block_intact(self, block_index: int) -> bool:
+        block = self.blocks[block_index]
+        try:
+            data = self.reader.read_block(block['block_id'])
+        except (OSError, KeyError):
+            return False
+        if hash_block_data(data)['hash'] != block['hash']:
+            return False
+        if self.mmr_leaves is not None:
+            return verify_mmr_path(block['hash'], mmr_authentication_path(self.mmr_leaves, block_index), self.root)
+        auth_path = [bytes.fromhex(node) for node in get_commitment_authentication_path(self.commitment, block_index)]
+        nodes = recompute_root_path(bytes.fromhex(block['hash']), block_index, len(self.blocks), auth_path)
+        return nodes[-1].hex() == self.root
+
+    def __call__(self, block_indices: List[int]) -> List[int]:
+        tampered = []
+        for block_index in block_indices:
+            try:
+                intact = self.block_intact(block_index)
+            except Exception as e:
+                # e.g. a corrupt compressed block or a malformed path: the block cannot be trusted
+                self.errors[block_index] = f"{type(e).__name__}: {e}"
+                intact = False
+            if not intact:
+                tampered.append(block_index)
+        return tampered
+
+    def close(self):
+        self.reader.close()
+
+
+class StarkVerifier:
+    """
+    Verifies batches with verification-rs' ``verify_upload_blocks``, which
+    reads ``upload_blocks/<upload_id>`` next to ``verification-rs``. Blocks it
+    reports as tampered or failing Merkle verification count as tampered;
+    each run's output is kept in ``outputs``. verification-rs only derives
+    power-of-two Merkle tree paths, so other commitment types are rejected.
+    """
+
+    REPORT_PATTERNS = (
+        re.compile(r'TAMPERING DETECTED! Block (\d+)'),
+        re.compile(r'Traditional verification FAILED for block (\d+)'),
+        re.compile(r'Failed to read block file for block (\d+)'),
+    )
+
+    def __init__(self, upload_id: str, commitment_file: str,
+                 project_root: Optional[Path] = None):
+        commitment_type = commitment_type_of(commitment_file)
+        if commitment_type != 'merkle_tree':
+            # Its Mountain Range blocks would all fail Merkle verification and read as tampered
+            raise ValueError(f"verify_upload_blocks cannot verify a {commitment_type} commitment; "
+                             f"audit it without --stark")
+        self.upload_id = upload_id
+        self.commitment_file = str(Path(commitment_file).resolve())
+        self.project_root = project_root or Path(__file__).parent / 'verification-rs'
+        self.outputs: List[str] = []
+
+    def __call__(self, block_indices: List[int]) -> List[int]:
+        cmd = ['cargo', 'run', '--bin', 'verify_upload_blocks', '--',
+               self.upload_id, json.dumps(block_indices), self.commitment_file]
+        result = subprocess.run(cmd, capture_output=True, text=True, cwd=self.project_root, timeout=1800)
+        self.outputs.append(result.stdout)
+        tampered = sorted({int(match) for pattern in self.REPORT_PATTERNS
+                           for match in pattern.findall(result.stdout)})
+        if result.returncode != 0 and not tampered:
+            raise RuntimeError(f"verify_upload_blocks failed ({result.returncode}): {result.stderr.strip()}")
+        return tampered
+
+    def close(self):
+        pass
+
+
+def commitment_type_of(commitment_file: str) -> str:
+    """The ``commitment_type`` of a JSON or binary commitment file."""
+    if is_binary_commitment(commitment_file):
+        with BinaryCommitment(commitment_file) as commitment:
+            return commitment.info.get('commitment_type', 'merkle_tree')
+    with open(commitment_file, 'r') as f:
+        return json.load(f).get('commitment_type', 'merkle_tree')
+
+
+def run_adaptive_audit(selector: RandomBlockSelector, total_blocks: int, user_id: str, upload_id: str,
+                       verify_blocks: Callable[[List[int]], List[int]],
+                       target_confidence: Optional[float] = None,
+                       budget: Optional[int] = None,
+                       batch_size: int = DEFAULT_BATCH_SIZE,
+                       padding_blocks: int = 0,
+                       audit_timestamp: Optional[str] = None,
+                       on_step: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Verify blocks in seeded order until tampering, the target confidence or the budget.
+
+    ``target_confidence`` defaults to the selector's confidence level and is
+    the chance of catching ``selector.min_corruption_rate`` corruption,
+    sized like the selector's fixed audits. ``budget`` caps the blocks
+    verified. ``verify_blocks`` gets a batch of block indices and returns
+    the tampered ones. ``on_step`` is called with each step as it is recorded.
+
+    Returns the verdict (one of VERDICTS), the tampered blocks, the
+    confidence reached, the fixed audit's sample size and one step per batch.
+    """
+    if target_confidence is None:
+        target_confidence = selector.confidence_level
+    if not 0 < target_confidence < 1:
+        raise ValueError("Target confidence must be between 0 and 1")
+    if batch_size < 1:
+        raise ValueError("Batch size must be at least 1")
+    if audit_timestamp is None:
+        audit_timestamp = datetime.now().isoformat()
+
+    auditable_blocks = selector._auditable_blocks(total_blocks, padding_blocks)
+    fixed_sample_size = selector.calculate_sample_size(auditable_blocks)
+    target_sample_size = RandomBlockSelector(target_confidence, selector.min_corruption_rate,
+                                             sizing=selector.sizing).calculate_sample_size(auditable_blocks)
+    limit = min(target_sample_size, budget) if budget is not None else target_sample_size
+    order = selector.iter_random_blocks(total_blocks, user_id, upload_id, audit_timestamp=audit_timestamp,
+                                        padding_blocks=padding_blocks)
+
+    start_time = time.time()
+    steps, tampered = [], []
+    verified = 0
+    confidence = 0.0
+    while verified < limit and not tampered:
+        batch = [next(order) for _ in range(min(batch_size, limit - verified))]
+        batch_start = time.time()
+        tampered = sorted(verify_blocks(batch))
+        verified += len(batch)
+        if verified == auditable_blocks:
+            confidence = 1.0
+        else:
+            confidence = selector.calculate_actual_confidence(verified, auditable_blocks)
+        step = {
+            'blocks_verified': verified,
+            'block_indices': batch,
+            'tampered_blocks': tampered,
+            'confidence': confidence,
+            'seconds': time.time() - batch_start,
+        }
+        steps.append(step)
+        if on_step:
+            on_step(step)
+
+    if tampered:
+        verdict = 'tampered'
+    elif verified >= target_sample_size:
+        verdict = 'clean'
+    else:
+        verdict = 'budget_exhausted'
+    return {
+        'upload_id': upload_id,
+        'audit_timestamp': audit_timestamp,
+        'cryptographic_seed': selector.random_seed.hex() if selector.random_seed else None,
+        'verdict': verdict,
+        'tampered_blocks': tampered,
+        'blocks_verified': verified,
+        'confidence': confidence,
+        'target_confidence': target_confidence,
+        'min_corruption_rate': selector.min_corruption_rate,
+        'target_sample_size': target_sample_size,
+        'fixed_sample_size': fixed_sample_size,
+        'budget': budget,
+        'seconds': time.time() - start_time,
+        'steps': steps,
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='ZK Audit System - Adaptive audit')
+    parser.add_argument('commitment_file', help='Commitment JSON or binary (.zkc) file')
+    parser.add_argument('blocks_dir', help="The upload's blocks directory")
+    parser.add_argument('--user-id', default='web_user', help='User ID for the audit seed')
+    parser.add_argument('--upload-id', help="Upload ID for the audit seed (default: the commitment's)")
+    parser.add_argument('--confidence', type=float, default=0.95,
+                       help='Target confidence level (default: 0.95)')
+    parser.add_argument('--min-corruption', type=float, default=0.05,
+                       help='Minimum corruption rate to detect (default: 0.05)')
+    parser.add_argument('--sizing', choices=SIZING_METHODS, default='hypergeometric',
+                       help='Sample sizing (default: hypergeometric)')
+    parser.add_argument('--budget', type=int, help='Most blocks to verify')
+    parser.add_argument('--batch-size', type=int,
+                       help=f'Blocks per verification call (default: {DEFAULT_BATCH_SIZE}, '
+                            f'{DEFAULT_STARK_BATCH_SIZE} with --stark)')
+    parser.add_argument('--stark', action='store_true',
+                       help='Verify with verification-rs STARK proofs instead of re-hashing in Python')
+    parser.add_argument('--audit-timestamp', help='Audit timestamp for the seed (default: now)')
+    parser.add_argument('--output', help='Save the audit report to a JSON file')
+    args = parser.parse_args()
+
+    commitment = load_commitment(args.commitment_file)
+    upload_id = args.upload_id or commitment['upload_id']
+    try:
+        if args.stark:
+            verifier = StarkVerifier(upload_id, args.commitment_file)
+            batch_size = args.batch_size or DEFAULT_STARK_BATCH_SIZE
+        else:
+            verifier = CommitmentVerifier(args.commitment_file, args.blocks_dir)
+            batch_size = args.batch_size or DEFAULT_BATCH_SIZE
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 2
+
+    print("🔁 ZK Audit System - Adaptive Audit")
+    print("=" * 50)
+    print(f"📊 {commitment['data_blocks']:,} data blocks; target {args.confidence * 100:.1f}% confidence "
+          f"of detecting {args.min_corruption * 100:.1f}% corruption"
+          + (f", budget {args.budget} blocks" if args.budget else ""))
+
+    def print_step(step):
+        status = f"🚨 tampered {step['tampered_blocks']}" if step['tampered_blocks'] else "✅"
+        print(f"  {step['blocks_verified']:>6} blocks  {step['confidence'] * 100:6.2f}%  "
+              f"{step['block_indices']} {status}")
+
+    selector = RandomBlockSelector(args.confidence, args.min_corruption, sizing=args.sizing)
+    try:
+        report = run_adaptive_audit(
+            selector, commitment['total_blocks'], args.user_id, upload_id, verifier,
+            target_confidence=args.confidence, budget=args.budget, batch_size=batch_size,
+            padding_blocks=commitment.get('padding_blocks', 0), audit_timestamp=args.audit_timestamp,
+            on_step=print_step
+        )
+    finally:
+        verifier.close()
+
+    print(f"\n📋 Verdict: {report['verdict']}")
+    for block_index, error in getattr(verifier, 'errors', {}).items():
+        print(f"⚠️  Block {block_index} could not be verified: {error}")
+    print(f"🔍 Blocks verified: {report['blocks_verified']} (fixed audit: {report['fixed_sample_size']})")
+    print(f"📈 Confidence reached: {report['confidence'] * 100:.2f}%")
+    print(f"⏱️  {report['seconds']:.2f}s")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Audit report saved to: {args.output}")
+    return 1 if report['verdict'] == 'tampered' else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Append-only ingestion for the ZK Data Integrity Audit System.
+
+Ledgers that grow all day should not be re-split, re-hashed and
+re-uploaded in full for every new batch. Here an upload is committed with a
+Merkle Mountain Range (merkle_mountain_range.py). Each append cuts blocks
+only from the bytes added since the last append, then hashes, uploads and
+stores just those blocks. It costs O(log n) parent hashes per block and
+emits a new root.
+
+Next to ``commitment_<id>.json`` sits ``commitment_<id>.peaks.json``. It
+holds the peak list plus where the next append resumes in the source file,
+and it is replaced atomically after the commitment, so an interrupted
+append is simply redone. Blocks are cut exactly like the raw engine
+(header + whole records, ``--block-size`` each); a partly filled last block
+waits for more rows unless the append is flushed.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from block_splitter import count_csv_records, iter_raw_block_data, read_csv_header, write_block_bytes
+from dynamodb_writer import DEFAULT_WRITE_CONCURRENCY, batch_write_items
+from merkle_mountain_range import MerkleMountainRange
+from s3_transfer import DEFAULT_UPLOAD_CONCURRENCY
+
+STATE_SUFFIX = '.peaks.json'
+DEFAULT_POLL_SECONDS = 5.0
+
+
+def state_file_path(commitments_dir: str, upload_id: str) -> Path:
+    return Path(commitments_dir) / f"commitment_{upload_id}{STATE_SUFFIX}"
+
+
+def load_append_state(commitments_dir: str, upload_id: str) -> Optional[Dict]:
+    """The saved append state of an upload, or None if it was never appended to."""
+    path = state_file_path(commitments_dir, upload_id)
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_json_atomic(path: Path, data: Dict, indent: Optional[int] = None):
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp_path, path)
+
+
+class AppendOnlyIngestion:
+    """
+    Grow one upload block by block, committing it with a Merkle Mountain Range.
+
+    Reuses the clients and record builders of a CloudDataIngestionPipeline.
+    Block entries carry no embedded authentication path; MMR paths are
+    derived from the leaf hashes (merkle_mountain_range.mmr_authentication_path).
+    """
+
+    def __init__(self, pipeline, source_file: Optional[str] = None,
+                 upload_id: Optional[str] = None,
+                 target_block_size_mb: float = 2.0,
+                 commitments_dir: str = 'merkle_commitments',
+                 blocks_dir: Optional[str] = None,
+                 upload_to_cloud: bool = True,
+                 upload_concurrency: int = DEFAULT_UPLOAD_CONCURRENCY,
+                 dynamodb_concurrency: int = DEFAULT_WRITE_CONCURRENCY):
+        self.pipeline = pipeline
+        self.commitments_dir = Path(commitments_dir)
+        self.commitments_dir.mkdir(parents=True, exist_ok=True)
+        self.blocks_dir = blocks_dir
+        self.upload_to_cloud = upload_to_cloud
+        self.upload_concurrency = upload_concurrency
+        self.dynamodb_concurrency = dynamodb_concurrency
+
+        self.upload_id = upload_id or str(uuid.uuid4())
+        self.commitment_file = self.commitments_dir / f"commitment_{self.upload_id}.json"
+        self.state_file = state_file_path(commitments_dir, self.upload_id)
+
+        state = load_append_state(commitments_dir, self.upload_id)
+        if state is None:
+            if source_file is None:
+                raise ValueError(f"No append state for upload {self.upload_id}; a source file is required")
+            header = read_csv_header(source_file)
+            if not header.endswith(b'\n'):
+                raise ValueError(f"{source_file} has no complete header row yet")
+            state = {
+                'upload_id': self.upload_id,
+                'user_id': pipeline.user_id,
+                'source_file': os.path.abspath(source_file),
+                'source_offset': len(header),
+                'header': header.decode('latin-1'),
+                'target_block_size_mb': target_block_size_mb,
+                'leaf_count': 0,
+                'peaks': [],
+                'root': None,
+                'appends': 0,
+            }
+            self.block_metadata: List[Dict] = []
+            self.root_history: List[Dict] = []
+        else:
+            if source_file is not None and os.path.abspath(source_file) != state['source_file']:
+                raise ValueError(f"Upload {self.upload_id} appends from {state['source_file']}, not {source_file}")
+            if state['user_id'] != pipeline.user_id:
+                raise ValueError(f"Upload {self.upload_id} belongs to user {state['user_id']}")
+            with open(self.commitment_file) as f:
+                commitment = json.load(f)
+            # The state is written last: anything past its leaf count is an unfinished append
+            self.block_metadata = commitment['block_metadata'][:state['leaf_count']]
+            self.root_history = [entry for entry in commitment.get('root_history', [])
+                                 if entry['leaf_count'] <= state['leaf_count']]
+
+        self.state = state
+        self.mmr = MerkleMountainRange(state['leaf_count'], state['peaks'])
+
+    @property
+    def source_file(self) -> str:
+        return self.state['source_file']
+
+    def _cut_new_blocks(self, flush: bool) -> List[bytes]:
+        """Whole-record blocks added to the source since the last append."""
+        header = self.state['header'].encode('latin-1')
+        budget = max(1, int(self.state['target_block_size_mb'] * 1024 * 1024) - len(header))
+
+        # A growing file may end mid-record: unless flushing, leave that record for later
+        blocks = list(iter_raw_block_data(self.source_file, budget, self.state['source_offset'],
+                                          complete_only=not flush))
+        if blocks and not flush:
+            # The last block is still filling
+            blocks.pop()
+        return blocks
+
+    def append(self, flush: bool = False) -> Optional[Dict]:
+        """
+        Commit the blocks added to the source since the last append.
+
+        Returns the updated commitment, or None when no block is complete
+        yet. ``flush`` also commits a partly filled last block and a final
+        record without a trailing newline.
+        """
+        new_blocks = self._cut_new_blocks(flush)
+        if not new_blocks:
+            return None
+
+        header = self.state['header'].encode('latin-1')
+        blocks_dir = self.blocks_dir or tempfile.mkdtemp(prefix='zk_audit_blocks_')
+        os.makedirs(blocks_dir, exist_ok=True)
+        first_index = self.mmr.leaf_count
+
+        try:
+            appended = []
+            for offset, data in enumerate(new_blocks):
+                block_id = f"block_{first_index + offset + 1:04d}"
+                block_file = os.path.join(blocks_dir, f"{block_id}.csv")
+                block_hash, size_bytes = write_block_bytes(block_file, header, data)
+                appended.append(self.pipeline._block_metadata(
+                    block_id, block_hash, count_csv_records(data), size_bytes, self.upload_id, block_file
+                ))
+
+            hashes_before = self.mmr.hash_count
+            root = self.mmr.extend(block['hash'] for block in appended)
+            self.block_metadata.extend(appended)
+            self.root_history.append({
+                'append': self.state['appends'] + 1,
+                'leaf_count': self.mmr.leaf_count,
+                'root': root,
+                'timestamp': datetime.now().isoformat(),
+            })
+            commitment_data = self._commitment()
+
+            if self.upload_to_cloud:
+                commitment_data['cloud_upload_success'] = self._upload(first_index, appended, commitment_data)
+            else:
+                commitment_data['cloud_upload_success'] = True  # Local mode
+
+            self.state.update({
+                'source_offset': self.state['source_offset'] + sum(len(data) for data in new_blocks),
+                'leaf_count': self.mmr.leaf_count,
+                'peaks': self.mmr.peaks,
+                'root': root,
+                'appends': self.state['appends'] + 1,
+            })
+            _write_json_atomic(self.commitment_file, commitment_data, indent=2)
+            _write_json_atomic(self.state_file, self.state)
+
+            print(f"➕ Append {self.state['appends']}: {len(appended)} blocks "
+                  f"({self.mmr.hash_count - hashes_before} parent hashes), "
+                  f"{self.mmr.leaf_count} total, {len(self.mmr.peaks)} peaks")
+            print(f"🌳 New root: {root}")
+            return commitment_data
+
+        finally:
+            if not self.blocks_dir:
+                shutil.rmtree(blocks_dir, ignore_errors=True)
+
+    def _upload(self, first_index: int, appended: List[Dict], commitment_data: Dict) -> bool:
+        """Upload only the new blocks, then refresh the commitment object and record."""
+        if not self.pipeline.upload_to_s3(appended, commitment_data, concurrency=self.upload_concurrency):
+            return False
+        if not self.pipeline.table:
+            print("⚠️  DynamoDB client not available, skipping metadata storage")
+            return False
+
+        try:
+            block_records = [self.pipeline._block_record(self.upload_id, first_index + offset, block)
+                             for offset, block in enumerate(appended)]
+            batch_write_items(self.pipeline.table.meta.client, self.pipeline.table.name, block_records,
+                              concurrency=self.dynamodb_concurrency)
+            self.pipeline.table.put_item(Item=self.pipeline._commitment_record(commitment_data))
+            return True
+        except Exception as e:
+            print(f"❌ DynamoDB storage failed: {e}")
+            return False
+
+    def _commitment(self) -> Dict:
+        blocks = self.block_metadata
+        sizes = [block['size_mb'] for block in blocks]
+        return {
+            "commitment_type": "merkle_mountain_range",
+            "hash_algorithm": "SHA3-256",
+            "root_hash": [self.mmr.root],
+            "total_blocks": len(blocks),
+            "data_blocks": len(blocks),
+            "empty_blocks": 0,
+            "padding_blocks": 0,
+            "padding_hash": None,
+            "blocks_power_of_2": False,
+            "target_block_size_mb": self.state['target_block_size_mb'],
+            "timestamp": datetime.now().isoformat(),
+            "upload_id": self.upload_id,
+            "user_id": self.pipeline.user_id,
+            "mmr_peaks": self.mmr.peaks,
+            "root_history": self.root_history,
+            "block_metadata": blocks,
+            "merkle_tree_structure": {
+                "height": self.mmr.height,
+                "leaf_count": len(blocks),
+                "is_complete_binary_tree": False
+            },
+            "size_statistics": {
+                "total_size_mb": sum(sizes),
+                "data_size_mb": sum(sizes),
+                "average_block_size_mb": sum(sizes) / len(sizes) if sizes else 0,
+                "min_block_size_mb": min(sizes, default=0),
+                "max_block_size_mb": max(sizes, default=0)
+            }
+        }
+
+    def tail(self, poll_seconds: float = DEFAULT_POLL_SECONDS, idle_exit: Optional[float] = None):
+        """
+        Follow the growing source, appending each time blocks fill up.
+
+        Stops on Ctrl-C, or after ``idle_exit`` seconds without the file
+        growing; either way the partly filled last block is then flushed.
+        """
+        print(f"👀 Tailing {self.source_file} every {poll_seconds:g}s (Ctrl-C to stop)")
+        last_size = os.path.getsize(self.source_file)
+        last_growth = time.monotonic()
+        try:
+            while True:
+                self.append()
+                time.sleep(poll_seconds)
+                size = os.path.getsize(self.source_file)
+                if size != last_size:
+                    last_size, last_growth = size, time.monotonic()
+                elif idle_exit is not None and time.monotonic() - last_growth >= idle_exit:
+                    print(f"💤 No growth for {idle_exit:g}s")
+                    break
+        except KeyboardInterrupt:
+            print("\n🛑 Stopping")
+        self.append(flush=True)
+
+
+def main():
+    import argparse
+
+    from cloud_data_ingestion import CloudDataIngestionPipeline
+
+    parser = argparse.ArgumentParser(description='ZK Audit System - Append-only ingestion (Merkle Mountain Range)')
+    parser.add_argument('input_file', help='CSV file to append from (optional when resuming --upload-id)', nargs='?')
+    parser.add_argument('--upload-id', help='Upload to append to (default: start a new one)')
+    parser.add_argument('--block-size', type=float, default=2.0,
+                        help='Target block size in MB for a new upload (default: 2.0)')
+    parser.add_argument('--user-id', help='User ID (default: the upload\'s, or a random UUID)')
+    parser.add_argument('--flush', action='store_true',
+                        help='Also commit a partly filled last block')
+    parser.add_argument('--tail', action='store_true',
+                        help='Keep following the file and append as blocks fill')
+    parser.add_argument('--poll-seconds', type=float, default=DEFAULT_POLL_SECONDS,
+                        help=f'Tail polling interval (default: {DEFAULT_POLL_SECONDS:g})')
+    parser.add_argument('--idle-exit', type=float,
+                        help='Stop tailing after this many seconds without growth')
+    parser.add_argument('--commitments-dir', default='merkle_commitments',
+                        help='Directory holding the commitment and its peaks file')
+    parser.add_argument('--local-only', action='store_true',
+                        help='Skip cloud upload (local processing only)')
+    parser.add_argument('--blocks-dir', help='Directory to keep block files in')
+    parser.add_argument('--upload-concurrency', type=int, default=DEFAULT_UPLOAD_CONCURRENCY,
+                        help=f'Concurrent S3 block uploads (default: {DEFAULT_UPLOAD_CONCURRENCY})')
+    parser.add_argument('--dynamodb-concurrency', type=int, default=DEFAULT_WRITE_CONCURRENCY,
+                        help=f'Parallel DynamoDB batch writers (default: {DEFAULT_WRITE_CONCURRENCY})')
+    parser.add_argument('--local-aws', metavar='DIR',
+                        help='Upload to filesystem-backed AWS stand-ins under DIR instead of AWS')
+    parser.add_argument('--s3-bucket', help='S3 bucket name')
+    parser.add_argument('--dynamodb-table', help='DynamoDB table name')
+    args = parser.parse_args()
+
+    state = load_append_state(args.commitments_dir, args.upload_id) if args.upload_id else None
+    if state is None and not args.input_file:
+        print("❌ Error: an input file is required to start a new upload")
+        return 1
+    if args.input_file and not os.path.exists(args.input_file):
+        print(f"❌ Error: Input file '{args.input_file}' not found")
+        return 1
+
+    pipeline = CloudDataIngestionPipeline(
+        user_id=args.user_id or (state['user_id'] if state else None),
+        s3_bucket=args.s3_bucket,
+        dynamodb_table=args.dynamodb_table
+    )
+    if args.local_aws:
+        pipeline.use_local_aws(args.local_aws)
+
+    try:
+        ingestion = AppendOnlyIngestion(
+            pipeline, args.input_file, args.upload_id, args.block_size,
+            commitments_dir=args.commitments_dir,
+            blocks_dir=args.blocks_dir,
+            upload_to_cloud=not args.local_only,
+            upload_concurrency=args.upload_concurrency,
+            dynamodb_concurrency=args.dynamodb_concurrency
+        )
+        print(f"🆔 Upload ID: {ingestion.upload_id}")
+        if args.tail:
+            ingestion.tail(args.poll_seconds, args.idle_exit)
+        elif ingestion.append(flush=args.flush) is None:
+            print("⏳ No complete block to append yet (use --flush to commit a partial block)")
+
+        print(f"🌳 Root after {ingestion.mmr.leaf_count} blocks: {ingestion.mmr.root}")
+        print(f"💾 Commitment: {ingestion.commitment_file}")
+        print(f"⛰️  Peaks: {ingestion.state_file}")
+        return 0
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
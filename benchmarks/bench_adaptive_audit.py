@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: blocks verified per audit by fixed audits (the whole selected
+sample) and adaptive audits (seeded order, stopping at the first tampered
+block), on an ingested upload that is left clean or has one block, 1% or
+5% of its blocks overwritten. Each verified block is one STARK proof for
+verification-rs; times are for CommitmentVerifier's re-hash and Merkle
+check. Both audits reach the same verdict on every seed. Then escalation:
+a clean upload audited towards a higher confidence under a block budget.
+
+Usage: python3 benchmarks/bench_adaptive_audit.py [--rows 40000] [--block-size 0.005] [--trials 200]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+
+from bench_utils import make_transactions_csv, quiet, timed
+
+from adaptive_audit import CommitmentVerifier, run_adaptive_audit
+from block_storage import block_id_of, open_block_reader
+from cloud_data_ingestion import CloudDataIngestionPipeline
+from random_block_selector import RandomBlockSelector, corrupted_block_count
+
+
+def fixed_audit(selector, commitment, verifier, audit_timestamp):
+    """Verify every selected block, as the fixed audit does; returns (tampered, blocks verified)."""
+    plan = selector.generate_audit_plan(commitment['total_blocks'], 'bench_user', 'bench_upload',
+                                        audit_timestamp=audit_timestamp,
+                                        padding_blocks=commitment.get('padding_blocks', 0))
+    selected = plan['selected_blocks']
+    return verifier(selected), len(selected)
+
+
+def tamper(blocks_dir, block_indices):
+    writer = open_block_reader(blocks_dir)
+    for block_index in block_indices:
+        block_id = block_id_of(block_index)
+        writer.write_block(block_id, writer.read_block(block_id).replace(b',', b';', 1))
+    writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fixed vs adaptive audits')
+    parser.add_argument('--rows', type=int, default=40_000, help='Rows in the generated dataset')
+    parser.add_argument('--block-size', type=float, default=0.005, help='Target block size in MB')
+    parser.add_argument('--trials', type=int, default=200, help='Seeded audits per scenario')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='zk_bench_adaptive_')
+    try:
+        input_file = make_transactions_csv(os.path.join(work_dir, 'input.csv'), args.rows)
+        blocks_dir = os.path.join(work_dir, 'blocks')
+        with quiet():
+            pipeline = CloudDataIngestionPipeline(user_id='bench_user')
+            pipeline.process_file(input_file, args.block_size, upload_to_cloud=False, blocks_dir=blocks_dir,
+                                  upload_id='bench_upload', engine='raw', commitments_dir=work_dir)
+        commitment_file = os.path.join(work_dir, 'commitment_bench_upload.json')
+        clean_dir = os.path.join(work_dir, 'clean')
+        shutil.copytree(blocks_dir, clean_dir)
+
+        selector = RandomBlockSelector(0.95, 0.05)
+        verifier = CommitmentVerifier(commitment_file, blocks_dir)
+        data_blocks = verifier.commitment['data_blocks']
+        print(f"📊 {data_blocks} data blocks, 95% confidence of detecting 5% corruption, "
+              f"{args.trials} seeded audits per scenario")
+        print(f"{'tampered':>10}{'detected':>10}{'fixed blocks':>14}{'adaptive':>10}{'fixed ms':>10}{'adaptive ms':>13}")
+
+        rng = random.Random(3)
+        for label, count in (('none', 0), ('1 block', 1), ('1%', corrupted_block_count(data_blocks, 0.01)),
+                             ('5%', corrupted_block_count(data_blocks, 0.05))):
+            shutil.rmtree(blocks_dir)
+            shutil.copytree(clean_dir, blocks_dir)
+            tamper(blocks_dir, rng.sample(range(data_blocks), count))
+            verifier.close()
+            verifier = CommitmentVerifier(commitment_file, blocks_dir)
+
+            fixed_blocks, adaptive_blocks, fixed_times, adaptive_times = [], [], [], []
+            detected = 0
+            for trial in range(args.trials):
+                audit_timestamp = f'2024-01-01T00:00:{trial:04d}'
+                (tampered, verified), elapsed = timed(fixed_audit, selector, verifier.commitment, verifier,
+                                                      audit_timestamp)
+                fixed_blocks.append(verified)
+                fixed_times.append(elapsed)
+                report, elapsed = timed(run_adaptive_audit, selector, verifier.commitment['total_blocks'],
+                                        'bench_user', 'bench_upload', verifier, audit_timestamp=audit_timestamp,
+                                        padding_blocks=verifier.commitment.get('padding_blocks', 0))
+                adaptive_blocks.append(report['blocks_verified'])
+                adaptive_times.append(elapsed)
+                assert (report['verdict'] == 'tampered') == bool(tampered)
+                detected += bool(tampered)
+            print(f"{label:>10}{detected / args.trials:>10.1%}{statistics.mean(fixed_blocks):>14.1f}"
+                  f"{statistics.mean(adaptive_blocks):>10.1f}{statistics.mean(fixed_times) * 1e3:>10.2f}"
+                  f"{statistics.mean(adaptive_times) * 1e3:>13.2f}")
+
+        shutil.rmtree(blocks_dir)
+        shutil.copytree(clean_dir, blocks_dir)
+        verifier.close()
+        verifier = CommitmentVerifier(commitment_file, blocks_dir)
+        print("\n📈 Escalating a clean audit (budget 150 blocks):")
+        for target in (0.95, 0.99, 0.999, 0.9999):
+            report = run_adaptive_audit(selector, verifier.commitment['total_blocks'], 'bench_user', 'bench_upload',
+                                        verifier, target_confidence=target, budget=150, batch_size=10,
+                                        padding_blocks=verifier.commitment.get('padding_blocks', 0),
+                                        audit_timestamp='2024-01-01T00:00:00')
+            print(f"  target {target:.2%}: {report['verdict']:>16}, {report['blocks_verified']:>4} blocks, "
+                  f"{report['confidence']:.4%} reached over {len(report['steps'])} steps")
+        verifier.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
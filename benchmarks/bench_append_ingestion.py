@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark: growing a ledger by re-running process_file over the whole file
+vs appending only the new rows to a Merkle Mountain Range commitment.
+Local only; reports seconds and parent hashes per batch.
+
+Usage: python3 benchmarks/bench_append_ingestion.py [--rows 200000] [--batches 5] [--batch-rows 20000]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+from bench_utils import make_transactions_csv, quiet, timed
+
+from append_ingestion import AppendOnlyIngestion
+from cloud_data_ingestion import CloudDataIngestionPipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Full re-ingestion vs MMR append')
+    parser.add_argument('--rows', type=int, default=200_000, help='Rows already in the ledger')
+    parser.add_argument('--batches', type=int, default=5, help='Batches appended')
+    parser.add_argument('--batch-rows', type=int, default=20_000, help='Rows per appended batch')
+    parser.add_argument('--block-size', type=float, default=0.25, help='Target block size in MB')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='zk_bench_append_')
+    cwd = os.getcwd()
+    try:
+        # process_file saves its commitment under the working directory
+        os.chdir(work_dir)
+        total_rows = args.rows + args.batches * args.batch_rows
+        source = make_transactions_csv(os.path.join(work_dir, 'full.csv'), total_rows)
+        with open(source, 'rb') as f:
+            lines = f.read().splitlines(keepends=True)
+        ledger = os.path.join(work_dir, 'ledger.csv')
+        with open(ledger, 'wb') as f:
+            f.writelines(lines[:1 + args.rows])
+
+        with quiet():
+            pipeline = CloudDataIngestionPipeline(user_id='bench_user')
+            ingestion = AppendOnlyIngestion(pipeline, ledger, 'bench_append', args.block_size,
+                                            commitments_dir=os.path.join(work_dir, 'mmr'),
+                                            upload_to_cloud=False)
+            _, initial = timed(ingestion.append, flush=True)
+        print(f"📊 Initial ledger: {args.rows:,} rows, {ingestion.mmr.leaf_count} blocks ({initial:.2f}s)")
+        print(f"{'batch':>6}{'blocks':>8}{'full s':>9}{'append s':>10}{'speedup':>9}{'hashes':>8}")
+
+        for batch in range(args.batches):
+            start = 1 + args.rows + batch * args.batch_rows
+            with open(ledger, 'ab') as f:
+                f.writelines(lines[start:start + args.batch_rows])
+
+            with quiet():
+                full, full_time = timed(pipeline.process_file, ledger, args.block_size, upload_to_cloud=False,
+                                        upload_id=f'bench_full_{batch}', engine='raw')
+                hashes_before = ingestion.mmr.hash_count
+                _, append_time = timed(ingestion.append, flush=True)
+            hashes = ingestion.mmr.hash_count - hashes_before
+            print(f"{batch + 1:>6}{ingestion.mmr.leaf_count:>8}{full_time:>9.2f}{append_time:>10.3f}"
+                  f"{full_time / append_time:>8.1f}x{hashes:>8}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
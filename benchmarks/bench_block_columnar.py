@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: loading blocks for the block viewer from the CSV with
+pd.read_csv vs from the columnar sidecars (Arrow IPC and Parquet), for
+all columns and for a two-column subset. Each reader runs in a fresh
+process that keeps every loaded frame, so its resident memory growth
+per block is measured on its own; the time is the mean per block.
+
+Usage: python3 benchmarks/bench_block_columnar.py [--rows 200000] [--block-size 2.0]
+"""
+
+import argparse
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_utils import make_transactions_csv, quiet
+
+from block_columnar import COLUMNAR_DIR, PYARROW_AVAILABLE, read_block_frame
+from block_storage import open_block_reader
+from cloud_data_ingestion import CloudDataIngestionPipeline
+
+READERS = ('csv', 'arrow', 'parquet')
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process (Linux)."""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+
+
+def child(reader_name, blocks_dir, commitment_file, columns):
+    """Load every block, keeping the frames; prints the mean seconds and RSS growth per block."""
+    import pandas as pd
+
+    with open(commitment_file) as f:
+        blocks = [b for b in json.load(f)['block_metadata'] if not b.get('is_padding', False)]
+    columns = columns.split(',') if columns else None
+    reader = open_block_reader(blocks_dir)
+    baseline = rss_mb()
+
+    frames = []
+    start = time.perf_counter()
+    for block in blocks:
+        if reader_name == 'csv':
+            df = pd.read_csv(io.BytesIO(reader.read_block(block['block_id'])), usecols=columns)
+        else:
+            df = read_block_frame(blocks_dir, block['block_id'], block['hash'], columns)
+            assert df is not None, f"{block['block_id']} has no usable sidecar"
+        frames.append(df)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'seconds': elapsed / len(blocks), 'rss_mb': (rss_mb() - baseline) / len(blocks)}))
+
+
+def ingest(work_dir, export, block_size, columnar):
+    blocks_dir = os.path.join(work_dir, f'blocks_{columnar}')
+    with quiet():
+        pipeline = CloudDataIngestionPipeline(user_id='bench_user')
+        pipeline.process_file(export, block_size, upload_to_cloud=False, blocks_dir=blocks_dir,
+                              upload_id=columnar, engine='raw', columnar=columnar)
+    commitment_file = os.path.join(work_dir, 'merkle_commitments', f'commitment_{columnar}.json')
+    sidecar_dir = os.path.join(blocks_dir, COLUMNAR_DIR)
+    sidecar_bytes = sum(os.path.getsize(os.path.join(sidecar_dir, name))
+                        for name in os.listdir(sidecar_dir)) if os.path.isdir(sidecar_dir) else 0
+    return blocks_dir, commitment_file, sidecar_bytes
+
+
+def measure(reader_name, blocks_dir, commitment_file, columns):
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', reader_name, blocks_dir, commitment_file, columns or ''],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(*sys.argv[2:6])
+        return
+
+    parser = argparse.ArgumentParser(description='Block viewer reads: pd.read_csv vs columnar sidecars')
+    parser.add_argument('--rows', type=int, default=200_000, help='Rows in the generated export')
+    parser.add_argument('--block-size', type=float, default=2.0, help='Target block size in MB')
+    args = parser.parse_args()
+
+    if not PYARROW_AVAILABLE:
+        print("❌ pyarrow is not installed")
+        return
+
+    work_dir = tempfile.mkdtemp(prefix='zk_bench_columnar_')
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        export = make_transactions_csv(os.path.join(work_dir, 'export.csv'), args.rows)
+        with open(export) as f:
+            subset = ','.join(f.readline().strip().split(',')[:2])
+        print(f"📊 {args.rows:,} rows, {args.block_size} MB blocks; subset columns: {subset}")
+        print(f"{'reader':>8}{'columns':>9}{'ms/block':>10}{'RSS MB/block':>14}{'on disk MB':>12}")
+        for reader_name in READERS:
+            blocks_dir, commitment_file, sidecar_bytes = ingest(
+                work_dir, export, args.block_size, 'none' if reader_name == 'csv' else reader_name)
+            disk_mb = (os.path.getsize(export) if reader_name == 'csv' else sidecar_bytes) / 2**20
+            for columns in (None, subset):
+                result = measure(reader_name, blocks_dir, commitment_file, columns)
+                print(f"{reader_name:>8}{'all' if columns is None else 2:>9}{result['seconds'] * 1000:>10.1f}"
+                      f"{result['rss_mb']:>14.2f}{disk_mb:>12.2f}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
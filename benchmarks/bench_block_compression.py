@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: block compression codecs on a generated transactions export.
+For each codec reports the ingest time, bytes stored on disk, bytes
+shipped to S3 (local stand-in with simulated per-request latency and
+bandwidth), and the time to read every block back as the server and
+verification do. The Merkle root must be the same for every codec.
+
+zstd is skipped when the zstandard package is not installed.
+
+Usage: python3 benchmarks/bench_block_compression.py [--rows 400000] [--block-size 0.5] [--s3-mbps 100]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from bench_utils import make_transactions_csv, quiet, timed
+
+from block_compression import COMPRESSIONS, ZSTD_AVAILABLE
+from block_storage import open_block_reader
+from cloud_data_ingestion import CloudDataIngestionPipeline
+from local_aws import LocalDynamoTable, LocalS3Client
+
+
+def dir_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+
+
+class BandwidthS3Client(LocalS3Client):
+    """LocalS3Client that also charges each object's bytes at a fixed bandwidth."""
+
+    def __init__(self, root_dir, latency_ms, mbps):
+        super().__init__(root_dir, latency_ms=latency_ms)
+        self.bytes_per_second = mbps * 1e6 / 8
+
+    def _transfer(self, kwargs):
+        body = kwargs['Body']
+        kwargs['Body'] = body = body.read() if hasattr(body, 'read') else bytes(body)
+        time.sleep(len(body) / self.bytes_per_second)
+        return kwargs
+
+    def put_object(self, **kwargs):
+        return super().put_object(**self._transfer(kwargs))
+
+    def upload_part(self, **kwargs):
+        return super().upload_part(**self._transfer(kwargs))
+
+
+def read_all(blocks_dir):
+    reader = open_block_reader(blocks_dir)
+    total = 0
+    for block in reader.list_blocks():
+        with reader.open_block(block['block_id']) as stream:
+            while chunk := stream.read(1 << 20):
+                total += len(chunk)
+    reader.close()
+    return total
+
+
+def run_codec(work_dir, export, args, compression, storage):
+    root = os.path.join(work_dir, f"{storage}_{compression}")
+    with quiet():
+        pipeline = CloudDataIngestionPipeline(user_id='bench_user')
+    s3_root = os.path.join(root, 's3')
+    pipeline.s3_client = BandwidthS3Client(s3_root, args.s3_latency_ms, args.s3_mbps)
+    pipeline.table = LocalDynamoTable(pipeline.dynamodb_table)
+    blocks_dir = os.path.join(root, 'blocks')
+
+    cwd = os.getcwd()
+    os.makedirs(root, exist_ok=True)
+    os.chdir(root)
+    try:
+        with quiet():
+            result, ingest_time = timed(pipeline.process_file, export, args.block_size, blocks_dir=blocks_dir,
+                                        upload_id='bench', engine='raw', storage=storage,
+                                        compression=compression)
+    finally:
+        os.chdir(cwd)
+    read_bytes, read_time = timed(read_all, blocks_dir)
+    return result['root_hash'][0], ingest_time, dir_bytes(blocks_dir), dir_bytes(s3_root), read_bytes, read_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Block compression codecs')
+    parser.add_argument('--rows', type=int, default=400_000, help='Rows in the generated export')
+    parser.add_argument('--block-size', type=float, default=0.5, help='Target block size in MB')
+    parser.add_argument('--s3-latency-ms', type=float, default=20.0, help='Simulated latency per S3 request')
+    parser.add_argument('--s3-mbps', type=float, default=100.0, help='Simulated S3 upload bandwidth in Mbit/s')
+    args = parser.parse_args()
+
+    codecs = [c for c in COMPRESSIONS if c != 'zstd' or ZSTD_AVAILABLE]
+    work_dir = tempfile.mkdtemp(prefix='zk_bench_compression_')
+    try:
+        export = make_transactions_csv(os.path.join(work_dir, 'export.csv'), args.rows)
+        print(f"📊 {args.rows:,} rows ({os.path.getsize(export) / 2**20:.1f} MB), {args.block_size} MB raw blocks, "
+              f"S3 {args.s3_latency_ms:.0f} ms per request at {args.s3_mbps:.0f} Mbit/s")
+        if not ZSTD_AVAILABLE:
+            print("⚠️  zstandard not installed; skipping zstd")
+        print(f"{'storage':>8}{'codec':>7}{'ingest s':>10}{'disk MB':>9}{'S3 MB':>8}{'read s':>8}{'read MB/s':>11}")
+        roots = set()
+        for storage in ('files', 'pack'):
+            for compression in codecs:
+                root, ingest_time, disk, shipped, read_bytes, read_time = run_codec(
+                    work_dir, export, args, compression, storage)
+                roots.add(root)
+                print(f"{storage:>8}{compression:>7}{ingest_time:>10.2f}{disk / 2**20:>9.2f}{shipped / 2**20:>8.2f}"
+                      f"{read_time:>8.2f}{read_bytes / 2**20 / read_time:>11.0f}")
+        assert len(roots) == 1, f"Merkle roots differ across codecs: {roots}"
+        print(f"✅ Same Merkle root for every codec: {roots.pop()}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: one file per block vs pack storage (segment files plus an
+index) for many small blocks. Reports the write time, files created, the
+time to list the blocks as the server's block listing does, and the time
+to read a random sample of blocks as verification does.
+
+Usage: python3 benchmarks/bench_block_storage.py [--blocks 100000] [--block-kb 4] [--sample 1000]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+
+from bench_utils import timed
+
+from block_splitter import write_block_bytes
+from block_storage import PackWriter, open_block_reader
+
+
+def write_files(blocks_dir, blocks):
+    os.makedirs(blocks_dir)
+    for i, data in enumerate(blocks):
+        write_block_bytes(os.path.join(blocks_dir, f"block_{i + 1:04d}.csv"), data)
+
+
+def write_pack(blocks_dir, blocks):
+    with PackWriter(blocks_dir) as pack:
+        for i, data in enumerate(blocks):
+            pack.write(i, lambda f, data=data: write_block_bytes(f, data))
+
+
+def list_blocks(blocks_dir):
+    reader = open_block_reader(blocks_dir)
+    blocks = reader.list_blocks()
+    reader.close()
+    return blocks
+
+
+def read_sample(blocks_dir, block_ids):
+    reader = open_block_reader(blocks_dir)
+    total = sum(len(reader.read_block(block_id)) for block_id in block_ids)
+    reader.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Block files vs pack storage')
+    parser.add_argument('--blocks', type=int, default=100_000, help='Blocks written')
+    parser.add_argument('--block-kb', type=int, default=4, help='Block size in KB')
+    parser.add_argument('--sample', type=int, default=1000, help='Blocks read back at random')
+    args = parser.parse_args()
+
+    header = b'transaction_id,amount\n'
+    row = b'TXN_00000000,42.00\n'
+    rows = max(1, (args.block_kb * 1024 - len(header)) // len(row))
+    blocks = [header + row * rows for _ in range(args.blocks)]
+    sample = [f"block_{i + 1:04d}" for i in random.Random(42).sample(range(args.blocks), min(args.sample, args.blocks))]
+
+    work_dir = tempfile.mkdtemp(prefix='zk_bench_storage_')
+    try:
+        print(f"📦 {args.blocks:,} blocks of {args.block_kb} KB, reading {len(sample)} at random")
+        print(f"{'storage':>8}{'write s':>9}{'files':>9}{'list s':>9}{'read ms':>9}")
+        for storage, write in (('files', write_files), ('pack', write_pack)):
+            blocks_dir = os.path.join(work_dir, storage)
+            _, write_time = timed(write, blocks_dir, blocks)
+            listed, list_time = timed(list_blocks, blocks_dir)
+            _, read_time = timed(read_sample, blocks_dir, sample)
+            assert len(listed) == args.blocks
+            print(f"{storage:>8}{write_time:>9.2f}{len(os.listdir(blocks_dir)):>9,}{list_time:>9.2f}"
+                  f"{read_time * 1000:>9.1f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
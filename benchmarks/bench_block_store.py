@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: re-uploading the same monthly export, then the export with 1%
+more rows, with per-upload block copies vs the shared content-addressed
+block store. Runs against the local AWS stand-ins with simulated S3
+latency and reports the time, S3 bytes shipped and local bytes kept per
+upload.
+
+Usage: python3 benchmarks/bench_block_store.py [--rows 200000] [--block-size 0.25] [--s3-latency-ms 150]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+from bench_utils import make_transactions_csv, quiet, timed
+
+from cloud_data_ingestion import CloudDataIngestionPipeline
+from local_aws import LocalDynamoTable, LocalS3Client
+
+
+def disk_bytes(path: str) -> int:
+    """Bytes held by the files under ``path``, counting hard-linked files once."""
+    seen, total = set(), 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            info = os.stat(os.path.join(root, name))
+            if (info.st_dev, info.st_ino) not in seen:
+                seen.add((info.st_dev, info.st_ino))
+                total += info.st_size
+    return total
+
+
+def run_uploads(work_dir, inputs, args, use_store):
+    mode = 'store' if use_store else 'copies'
+    root = os.path.join(work_dir, mode)
+    with quiet():
+        pipeline = CloudDataIngestionPipeline(user_id='bench_user')
+    s3 = pipeline.s3_client = LocalS3Client(os.path.join(root, 's3'), latency_ms=args.s3_latency_ms)
+    pipeline.table = LocalDynamoTable(pipeline.dynamodb_table)
+    if use_store:
+        with quiet():
+            pipeline.use_block_store(os.path.join(root, 'block_store'))
+
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        for i, (name, input_file) in enumerate(inputs):
+            s3_before, disk_before = disk_bytes(os.path.join(root, 's3')), disk_bytes(root)
+            with quiet():
+                result, elapsed = timed(pipeline.process_file, input_file, args.block_size,
+                                        blocks_dir=os.path.join(root, 'upload_blocks', f'upload_{i}'),
+                                        upload_id=f'upload_{i}', engine='cdc',
+                                        upload_concurrency=args.upload_concurrency)
+            shipped = disk_bytes(os.path.join(root, 's3')) - s3_before
+            kept = disk_bytes(root) - disk_before - shipped
+            saved = result.get('deduplication', {}).get('upload_seconds_saved')
+            print(f"{mode:>7}{name:>12}{elapsed:>9.2f}{shipped / 2**20:>11.2f}{kept / 2**20:>10.2f}"
+                  f"{s3.request_count:>10}" + (f"{saved:>10.2f}" if saved is not None else f"{'-':>10}"))
+    finally:
+        os.chdir(cwd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-upload block copies vs the shared block store')
+    parser.add_argument('--rows', type=int, default=200_000, help='Rows in the generated export')
+    parser.add_argument('--block-size', type=float, default=0.25, help='Target block size in MB')
+    parser.add_argument('--s3-latency-ms', type=float, default=150.0, help='Simulated latency per S3 request')
+    parser.add_argument('--upload-concurrency', type=int, default=8, help='Concurrent S3 uploads')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='zk_bench_store_')
+    try:
+        export = make_transactions_csv(os.path.join(work_dir, 'export.csv'), args.rows)
+        with open(export, 'rb') as f:
+            lines = f.read().splitlines(keepends=True)
+        grown = os.path.join(work_dir, 'export_grown.csv')
+        with open(grown, 'wb') as f:
+            f.writelines(lines + lines[1:1 + len(lines) // 100])
+        inputs = [('first', export), ('same again', export), ('+1% rows', grown)]
+
+        print(f"📊 {args.rows:,} rows, {args.block_size} MB cdc blocks, S3 {args.s3_latency_ms:.0f} ms per request")
+        print(f"{'mode':>7}{'upload':>12}{'total s':>9}{'S3 MB':>11}{'disk MB':>10}{'S3 reqs':>10}{'saved s':>10}")
+        for use_store in (False, True):
+            run_uploads(work_dir, inputs, args, use_store)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
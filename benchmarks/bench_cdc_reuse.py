@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: how many block hashes survive a small edit to the source file,
+for the row-count (pandas), fixed-size (raw) and content-defined (cdc)
+chunking engines. A reused hash means the block's S3 object and DynamoDB
+item are unchanged too.
+
+Usage: python3 benchmarks/bench_cdc_reuse.py [--rows 300000] [--block-size 0.25]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+
+from bench_utils import make_transactions_csv, quiet, timed
+
+from block_splitter import ENGINES
+from cloud_data_ingestion import CloudDataIngestionPipeline
+
+
+def insert_top(lines, rng):
+    return lines[:11] + [lines[5]] + lines[11:]
+
+
+def delete_middle(lines, rng):
+    middle = len(lines) // 2
+    return lines[:middle] + lines[middle + 1:]
+
+
+def update_middle(lines, rng):
+    middle = len(lines) // 2
+    fields = lines[middle].split(b',')
+    fields[5] = b'%.2f' % (rng.random() * 100000)
+    return lines[:middle] + [b','.join(fields)] + lines[middle + 1:]
+
+
+def scattered_inserts(lines, rng):
+    """100 rows inserted at 10 random places."""
+    edited = list(lines)
+    for _ in range(10):
+        at = rng.randrange(1, len(edited))
+        edited[at:at] = rng.sample(lines[1:], 10)
+    return edited
+
+
+def append_rows(lines, rng):
+    """1% more rows at the end, as a daily ledger grows."""
+    return lines + lines[1:1 + len(lines) // 100]
+
+
+EDITS = {
+    'insert top': insert_top,
+    'delete mid': delete_middle,
+    'update mid': update_middle,
+    'scattered': scattered_inserts,
+    'append 1%': append_rows,
+}
+
+
+def block_hashes(pipeline, input_file, block_size, blocks_dir, engine):
+    with quiet():
+        (block_metadata, _, _), elapsed = timed(pipeline.split_into_blocks, input_file, block_size, blocks_dir,
+                                                'bench', engine=engine)
+    shutil.rmtree(blocks_dir, ignore_errors=True)
+    return [block['hash'] for block in block_metadata if not block.get('is_padding', False)], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Block reuse after small edits, per chunking engine')
+    parser.add_argument('--rows', type=int, default=300_000, help='Rows in the generated dataset')
+    parser.add_argument('--block-size', type=float, default=0.25, help='Target block size in MB')
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES), help='Engines to compare')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='zk_bench_cdc_')
+    try:
+        original = make_transactions_csv(os.path.join(work_dir, 'original.csv'), args.rows)
+        with open(original, 'rb') as f:
+            lines = f.read().splitlines(keepends=True)
+        with quiet():
+            pipeline = CloudDataIngestionPipeline(user_id='bench_user')
+
+        edited_files = {}
+        for name, edit in EDITS.items():
+            edited_files[name] = os.path.join(work_dir, f"{name.replace(' ', '_')}.csv")
+            with open(edited_files[name], 'wb') as f:
+                f.writelines(edit(lines, random.Random(7)))
+
+        print(f"📊 {args.rows:,} rows, {args.block_size} MB target blocks; reused / blocks after the edit")
+        print(f"{'engine':>8}{'blocks':>8}{'split s':>9}" + ''.join(f"{name:>15}" for name in EDITS))
+
+        for engine in args.engines:
+            base, elapsed = block_hashes(pipeline, original, args.block_size, os.path.join(work_dir, 'blocks'), engine)
+            base_set = set(base)
+            row = f"{engine:>8}{len(base):>8}{elapsed:>9.2f}"
+            for name in EDITS:
+                hashes, _ = block_hashes(pipeline, edited_files[name], args.block_size,
+                                         os.path.join(work_dir, 'blocks'), engine)
+                reused = sum(1 for h in hashes if h in base_set)
+                row += f"{f'{reused}/{len(hashes)} ({reused / len(hashes):.0%})':>15}"
+            print(row)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
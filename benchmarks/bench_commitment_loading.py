@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: time to read one block's hash, metadata and authentication
+path from a JSON commitment (full parse) vs a memory-mapped binary one.
+
+Usage: python3 benchmarks/bench_commitment_loading.py [--blocks 100000] [--lookups 100]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+from datetime import datetime
+
+from bench_utils import timed
+
+from binary_commitment import BinaryCommitment, write_binary_commitment
+from compact_merkle import CompactMerkleTree
+
+
+def make_commitment(total_blocks: int) -> dict:
+    """A commitment shaped like cloud_data_ingestion.py's, with embedded paths."""
+    blocks = [{
+        "block_id": f"block_{i:06d}",
+        "hash": os.urandom(32).hex(),
+        "row_count": 5000,
+        "size_bytes": 2 * 1024 * 1024,
+        "size_mb": 2.0,
+        "is_empty": False,
+        "timestamp": datetime.now().isoformat(),
+        "upload_id": "bench",
+        "user_id": "bench",
+    } for i in range(total_blocks)]
+    tree = CompactMerkleTree([b['hash'] for b in blocks])
+    for i, block in enumerate(blocks):
+        block['authentication_path'] = tree.get_authentication_path(i)
+    return {
+        "commitment_type": "merkle_tree",
+        "hash_algorithm": "sha3_256",
+        "root_hash": [tree.root],
+        "total_blocks": total_blocks,
+        "block_metadata": blocks,
+    }
+
+
+def json_lookup(path, indices):
+    with open(path) as f:
+        commitment = json.load(f)
+    return [commitment['block_metadata'][i] for i in indices]
+
+
+def binary_lookup(path, indices):
+    with BinaryCommitment(path) as commitment:
+        return [commitment.block_metadata(i) for i in indices]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Commitment loading microbenchmark')
+    parser.add_argument('--blocks', type=int, default=100_000, help='Blocks in the commitment')
+    parser.add_argument('--lookups', type=int, default=100, help='Blocks read per audit')
+    args = parser.parse_args()
+
+    commitment = make_commitment(args.blocks)
+    indices = random.sample(range(args.blocks), min(args.lookups, args.blocks))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'commitment.json')
+        binary_path = os.path.join(tmp, 'commitment.zkc')
+        with open(json_path, 'w') as f:
+            json.dump(commitment, f, indent=2)
+        write_binary_commitment(commitment, binary_path)
+
+        json_blocks, json_time = timed(json_lookup, json_path, indices)
+        binary_blocks, binary_time = timed(binary_lookup, binary_path, indices)
+        assert json_blocks == binary_blocks, "binary commitment disagrees with JSON"
+
+        print(f"📦 {args.blocks:,} blocks, {len(indices)} lookups")
+        print(f"{'format':>8}{'size MB':>10}{'load+lookup s':>15}")
+        print(f"{'json':>8}{os.path.getsize(json_path) / 2**20:>10.1f}{json_time:>15.4f}")
+        print(f"{'binary':>8}{os.path.getsize(binary_path) / 2**20:>10.1f}{binary_time:>15.4f}")
+        print(f"⚡ Speedup: {json_time / binary_time:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pandas-engine ingestion with inferred dtypes vs compact dtypes
+(narrow integers, categoricals, pyarrow strings) on create_sample_dataset.py's
+1.5M-row dataset, loaded whole and streamed. Each mode runs in a fresh
+process so its peak RSS is its own; reports seconds, peak RSS and the
+loaded frame's size, and checks every mode produces the same Merkle root.
+First checks the same on object columns pandas reads as Python bools (a
+bool column with blanks) or as ints mixed with strings.
+
+Usage: python3 benchmarks/bench_compact_dtypes.py [--input sample_financial_dataset.csv] [--block-size 2.0]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from bench_utils import quiet
+
+import create_sample_dataset
+from block_splitter import scan_csv_schema
+from cloud_data_ingestion import CloudDataIngestionPipeline
+
+# (label, streaming, compact_dtypes)
+MODES = (
+    ('inferred', False, False),
+    ('compact', False, True),
+    ('stream', True, False),
+    ('stream+compact', True, True),
+)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (Linux; unlike ru_maxrss, reset by exec)."""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("VmHWM not found in /proc/self/status")
+
+
+def child(input_file, block_size, streaming, compact):
+    """Ingest locally; prints seconds, peak RSS, the loaded frame's size and the Merkle root."""
+    streaming, compact = streaming == '1', compact == '1'
+    with quiet():
+        pipeline = CloudDataIngestionPipeline(user_id='bench_user')
+        start = time.perf_counter()
+        commitment = pipeline.process_file(input_file, block_size, upload_to_cloud=False,
+                                           blocks_dir=os.path.join(os.getcwd(), 'blocks'), upload_id='bench',
+                                           streaming=streaming, compact_dtypes=compact)
+        elapsed = time.perf_counter() - start
+    peak_mb = peak_rss_mb()
+
+    frame_mb = None
+    if not streaming:
+        # Measured after the peak was taken, so this read does not count towards it
+        dtype = scan_csv_schema(input_file, compact=True)[1] if compact else None
+        frame_mb = pd.read_csv(input_file, dtype=dtype).memory_usage(deep=True).sum() / 2**20
+    print(json.dumps({'seconds': elapsed, 'frame_mb': frame_mb, 'peak_rss_mb': peak_mb,
+                      'root': commitment['root_hash'][0]}))
+
+
+def object_column_root(input_file, blocks_dir, compact, chunk_rows):
+    with quiet():
+        pipeline = CloudDataIngestionPipeline(user_id='bench_user')
+        commitment = pipeline.process_file(input_file, 0.5, upload_to_cloud=False, blocks_dir=blocks_dir,
+                                           upload_id='bench', streaming=True, stream_chunk_rows=chunk_rows,
+                                           compact_dtypes=compact, commitments_dir=os.path.dirname(blocks_dir))
+    return commitment['root_hash'][0]
+
+
+def check_object_columns(work_dir):
+    """Compact dtypes leave non-string object columns inferred, with the same Merkle root."""
+    rows = 300_000
+    cases = {
+        # Python bools and NaN in one object column
+        'bool/NaN': ('flag', ['True' if i % 3 == 0 else '' if i % 3 == 1 else 'False' for i in range(rows)]),
+        # One read chunk: ints, then strings from the parser's last internal chunk
+        'int/str': ('code', [str(i) if i < rows - 10 else f'x{i}' for i in range(rows)]),
+    }
+    for label, (column, values) in cases.items():
+        input_file = os.path.join(work_dir, f"{column}.csv")
+        with open(input_file, 'w') as f:
+            f.write(f"id,{column}\n")
+            f.writelines(f"{i},{value}\n" for i, value in enumerate(values))
+        schema = scan_csv_schema(input_file, rows, compact=True)[1]
+        roots = {object_column_root(input_file, os.path.join(work_dir, f"{column}_{compact}"), compact, rows)
+                 for compact in (False, True)}
+        ok = column not in schema and len(roots) == 1
+        print(f"{'✅' if ok else '❌'} {label} object column: {schema.get(column, 'inferred')}")
+        if not ok:
+            raise SystemExit(1)
+
+
+def measure(work_dir, input_file, block_size, streaming, compact):
+    run_dir = tempfile.mkdtemp(dir=work_dir)
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', input_file, str(block_size), str(int(streaming)), str(int(compact))],
+        check=True, capture_output=True, text=True, cwd=run_dir
+    ).stdout
+    shutil.rmtree(run_dir, ignore_errors=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(sys.argv[2], float(sys.argv[3]), *sys.argv[4:6])
+        return
+
+    parser = argparse.ArgumentParser(description='Inferred vs compact dtypes for pandas-engine ingestion')
+    parser.add_argument('--input', help="Existing CSV instead of generating create_sample_dataset.py's")
+    parser.add_argument('--block-size', type=float, default=2.0, help='Target block size in MB')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='zk_bench_dtypes_')
+    cwd = os.getcwd()
+    try:
+        check_object_columns(work_dir)
+        if args.input:
+            input_file = os.path.abspath(args.input)
+        else:
+            os.chdir(work_dir)
+            with quiet():
+                input_file = os.path.abspath(create_sample_dataset.create_sample_dataset())
+            os.chdir(cwd)
+        print(f"📊 {input_file}: {os.path.getsize(input_file) / 2**20:.1f} MB, {args.block_size} MB blocks, "
+              f"pandas {pd.__version__}")
+        print(f"{'mode':>15}{'seconds':>9}{'peak RSS MB':>13}{'frame MB':>10}{'root':>7}")
+
+        roots = set()
+        for label, streaming, compact in MODES:
+            result = measure(work_dir, input_file, args.block_size, streaming, compact)
+            roots.add(result['root'])
+            frame = f"{result['frame_mb']:.0f}" if result['frame_mb'] is not None else '-'
+            print(f"{label:>15}{result['seconds']:>9.1f}{result['peak_rss_mb']:>13.0f}{frame:>10}"
+                  f"{'✅' if len(roots) == 1 else '❌':>6}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
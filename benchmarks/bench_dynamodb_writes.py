@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: one put_item per block record vs batched, parallel BatchWriteItem,
+against the sqlite-backed LocalDynamoTable with simulated request latency.
+Reports items/s; no network or credentials needed.
+
+Usage: python3 benchmarks/bench_dynamodb_writes.py [--items 4096] [--latency-ms 10]
+                                                   [--concurrency 1 4 8] [--unprocessed-rate 0.0]
+"""
+
+import argparse
+import os
+from datetime import datetime
+
+from bench_utils import timed
+
+from dynamodb_writer import batch_write_items, to_dynamodb_item
+from local_aws import LocalDynamoTable
+
+
+def make_block_records(count: int):
+    """Block records shaped like store_metadata_dynamodb's."""
+    return [to_dynamodb_item({
+        'pk': "UPLOAD#bench",
+        'sk': f"BLOCK#{i:04d}",
+        'entity_type': 'block',
+        'block_id': f"block_{i + 1:04d}",
+        'block_index': i,
+        'hash': os.urandom(32).hex(),
+        'size_mb': 2.0,
+        'is_empty': False,
+        's3_bucket': 'zk-audit-bench',
+        's3_key': f"uploads/bench/blocks/block_{i + 1:04d}.csv",
+        'upload_id': 'bench',
+        'user_id': 'bench',
+        'timestamp': datetime.now().isoformat(),
+    }) for i in range(count)]
+
+
+def put_item_loop(table, records):
+    """The original one-put_item-per-block loop, kept here as the baseline."""
+    for record in records:
+        table.put_item(Item=record)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DynamoDB block metadata write benchmark')
+    parser.add_argument('--items', type=int, default=4096, help='Block records to write')
+    parser.add_argument('--latency-ms', type=float, default=10.0, help='Simulated latency per request')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8],
+                        help='Parallel batch writers to measure')
+    parser.add_argument('--unprocessed-rate', type=float, default=0.0,
+                        help='Fraction of batched items the stand-in hands back unprocessed')
+    args = parser.parse_args()
+
+    records = make_block_records(args.items)
+
+    print(f"📦 {args.items} block records, {args.latency_ms:.0f} ms per request")
+    print(f"{'mode':>14}{'seconds':>10}{'items/s':>11}{'requests':>10}")
+
+    table = LocalDynamoTable('bench', latency_ms=args.latency_ms)
+    _, elapsed = timed(put_item_loop, table, records)
+    print(f"{'put_item':>14}{elapsed:>10.2f}{args.items / elapsed:>11.0f}{table.request_count:>10}")
+
+    for concurrency in args.concurrency:
+        table = LocalDynamoTable('bench', latency_ms=args.latency_ms,
+                                 unprocessed_rate=args.unprocessed_rate, seed=concurrency)
+        _, elapsed = timed(batch_write_items, table.meta.client, table.name, records, concurrency)
+        assert table.item_count == args.items, "some records were not written"
+        print(f"{f'batch x{concurrency}':>14}{elapsed:>10.2f}{args.items / elapsed:>11.0f}"
+              f"{table.request_count:>10}")
+
+
+if __name__ == "__main__":
+    main()
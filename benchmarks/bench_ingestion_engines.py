@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pandas vs raw block splitting engines.
+
+Usage: python3 benchmarks/bench_ingestion_engines.py [--rows 500000] [--input file.csv]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+from bench_utils import make_transactions_csv, quiet, timed
+
+from cloud_data_ingestion import CloudDataIngestionPipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare block splitting engines')
+    parser.add_argument('--rows', type=int, default=500_000, help='Rows in the generated dataset')
+    parser.add_argument('--input', help='Existing CSV to split instead of a generated one')
+    parser.add_argument('--block-size', type=float, default=2.0, help='Target block size in MB')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='zk_bench_engines_')
+    try:
+        input_file = args.input or make_transactions_csv(os.path.join(work_dir, 'input.csv'), args.rows)
+        file_size_mb = os.path.getsize(input_file) / (1024 * 1024)
+        with quiet():
+            pipeline = CloudDataIngestionPipeline(user_id='bench_user')
+
+        print(f"📊 Input: {input_file} ({file_size_mb:.1f} MB)")
+        print(f"{'engine':<18}{'blocks':>8}{'seconds':>10}{'MB/s':>10}")
+
+        runs = [('pandas', {}), ('pandas streaming', {'streaming': True}), ('raw', {'engine': 'raw'})]
+        for name, options in runs:
+            blocks_dir = os.path.join(work_dir, name.replace(' ', '_'))
+            with quiet():
+                (block_metadata, total_blocks, _), elapsed = timed(
+                    pipeline.split_into_blocks, input_file, args.block_size, blocks_dir, 'bench', **options
+                )
+            print(f"{name:<18}{total_blocks:>8}{elapsed:>10.2f}{file_size_mb / elapsed:>10.1f}")
+            shutil.rmtree(blocks_dir, ignore_errors=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
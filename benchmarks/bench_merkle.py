@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: hex-string Merkle tree vs compact packed-digest tree.
+Reports build time and the memory each tree keeps alive (leaves included).
+
+Usage: python3 benchmarks/bench_merkle.py [--min-exp 10] [--max-exp 20] [--legacy-max-exp 20]
+"""
+
+import argparse
+import hashlib
+import os
+import tracemalloc
+
+from bench_utils import timed
+
+from compact_merkle import CompactMerkleTree
+
+
+def legacy_build(leaves):
+    """The original list-of-hex-strings build, kept here as the baseline."""
+    tree = [leaves]
+    current_level = leaves
+    while len(current_level) > 1:
+        next_level = []
+        for i in range(0, len(current_level), 2):
+            hasher = hashlib.sha3_256()
+            hasher.update((current_level[i] + current_level[i + 1]).encode('utf-8'))
+            next_level.append(hasher.hexdigest())
+        tree.insert(0, next_level)
+        current_level = next_level
+    return tree
+
+
+def build_legacy(leaf_bytes):
+    leaves = [leaf_bytes[i:i + 32].hex() for i in range(0, len(leaf_bytes), 32)]
+    return legacy_build(leaves)
+
+
+def measure(build, leaf_bytes):
+    """Return (result, seconds, retained traced bytes) for one build from raw leaf digests."""
+    tracemalloc.start()
+    result, elapsed = timed(build, leaf_bytes)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merkle tree build microbenchmark')
+    parser.add_argument('--min-exp', type=int, default=10, help='Smallest tree: 2^min-exp leaves')
+    parser.add_argument('--max-exp', type=int, default=20, help='Largest tree: 2^max-exp leaves (up to 24)')
+    parser.add_argument('--legacy-max-exp', type=int, default=20,
+                        help='Skip the hex-string baseline above 2^legacy-max-exp leaves')
+    args = parser.parse_args()
+
+    print(f"{'leaves':>10}{'legacy s':>10}{'legacy MB':>11}{'compact s':>11}{'compact MB':>12}"
+          f"{'speedup':>9}{'mem x':>7}")
+
+    for exp in range(args.min_exp, args.max_exp + 1):
+        leaf_bytes = os.urandom(32 * (1 << exp))
+
+        compact, compact_time, compact_peak = measure(CompactMerkleTree, leaf_bytes)
+
+        if exp <= args.legacy_max_exp:
+            legacy, legacy_time, legacy_peak = measure(build_legacy, leaf_bytes)
+            assert legacy[0][0] == compact.root, "root mismatch"
+            del legacy
+            print(f"{1 << exp:>10}{legacy_time:>10.3f}{legacy_peak / 2**20:>11.1f}"
+                  f"{compact_time:>11.3f}{compact_peak / 2**20:>12.1f}"
+                  f"{legacy_time / compact_time:>8.1f}x{legacy_peak / compact_peak:>6.1f}x")
+        else:
+            print(f"{1 << exp:>10}{'-':>10}{'-':>11}{compact_time:>11.3f}{compact_peak / 2**20:>12.1f}"
+                  f"{'-':>9}{'-':>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark: raw engine block creation with 1..N worker processes.
+
+Usage: python3 benchmarks/bench_parallel_ingestion.py [--rows 1000000] [--max-workers 8]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+from bench_utils import make_transactions_csv, quiet, timed
+
+from cloud_data_ingestion import CloudDataIngestionPipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scaling of parallel raw block creation')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Rows in the generated dataset')
+    parser.add_argument('--input', help='Existing CSV to split instead of a generated one')
+    parser.add_argument('--block-size', type=float, default=2.0, help='Target block size in MB')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1,
+                        help='Largest worker count to try (default: CPU count)')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='zk_bench_parallel_')
+    try:
+        input_file = args.input or make_transactions_csv(os.path.join(work_dir, 'input.csv'), args.rows)
+        file_size_mb = os.path.getsize(input_file) / (1024 * 1024)
+        with quiet():
+            pipeline = CloudDataIngestionPipeline(user_id='bench_user')
+
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= args.max_workers:
+            worker_counts.append(worker_counts[-1] * 2)
+        if worker_counts[-1] != args.max_workers:
+            worker_counts.append(args.max_workers)
+
+        print(f"📊 Input: {input_file} ({file_size_mb:.1f} MB)")
+        print(f"{'workers':>8}{'blocks':>8}{'seconds':>10}{'MB/s':>10}{'speedup':>10}  identical")
+
+        baseline_time = None
+        baseline_hashes = None
+        for workers in worker_counts:
+            blocks_dir = os.path.join(work_dir, f'blocks_{workers}')
+            with quiet():
+                (block_metadata, total_blocks, _), elapsed = timed(
+                    pipeline.split_into_blocks, input_file, args.block_size, blocks_dir, 'bench',
+                    engine='raw', workers=workers
+                )
+            hashes = [block['hash'] for block in block_metadata]
+            if baseline_time is None:
+                baseline_time, baseline_hashes = elapsed, hashes
+            print(f"{workers:>8}{total_blocks:>8}{elapsed:>10.2f}{file_size_mb / elapsed:>10.1f}"
+                  f"{baseline_time / elapsed:>9.2f}x  {'✅' if hashes == baseline_hashes else '❌'}")
+            shutil.rmtree(blocks_dir, ignore_errors=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sequential stages (split, commit, upload, metadata) vs the
+pipelined ingestion that overlaps them, against the local AWS stand-ins
+with simulated request latency. Reports per-stage time and utilization
+and checks both produce the same Merkle root.
+
+Usage: python3 benchmarks/bench_pipelined_ingestion.py [--rows 300000] [--block-size 0.5]
+                                                       [--s3-latency-ms 150] [--dynamodb-latency-ms 10]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+from bench_utils import make_transactions_csv, quiet, timed
+
+from cloud_data_ingestion import CloudDataIngestionPipeline
+from local_aws import LocalDynamoTable, LocalS3Client
+from pipelined_ingestion import DEFAULT_QUEUE_DEPTH, DEFAULT_WRITE_WORKERS, PipelinedIngestion
+
+
+def make_pipeline(aws_dir: str, args) -> CloudDataIngestionPipeline:
+    with quiet():
+        pipeline = CloudDataIngestionPipeline(user_id='bench_user')
+    pipeline.s3_client = LocalS3Client(os.path.join(aws_dir, 's3'), latency_ms=args.s3_latency_ms)
+    pipeline.table = LocalDynamoTable(pipeline.dynamodb_table, latency_ms=args.dynamodb_latency_ms)
+    return pipeline
+
+
+def sequential(pipeline, input_file, blocks_dir, args):
+    """process_file's stages one after another, each timed."""
+    stages = {}
+    (block_metadata, _, _), stages['split'] = timed(
+        pipeline.split_into_blocks, input_file, args.block_size, blocks_dir, 'bench', engine=args.engine
+    )
+    commitment_data, stages['commit'] = timed(pipeline.create_merkle_commitment, block_metadata, args.block_size)
+    _, stages['upload'] = timed(pipeline.upload_to_s3, block_metadata, commitment_data,
+                                concurrency=args.upload_concurrency)
+    _, stages['metadata'] = timed(pipeline.store_metadata_dynamodb, commitment_data,
+                                  concurrency=args.dynamodb_concurrency)
+    return commitment_data, stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sequential vs pipelined ingestion')
+    parser.add_argument('--rows', type=int, default=300_000, help='Rows in the generated dataset')
+    parser.add_argument('--input', help='Existing CSV to ingest instead of a generated one')
+    parser.add_argument('--block-size', type=float, default=0.5, help='Target block size in MB')
+    parser.add_argument('--engine', choices=('pandas', 'raw'), default='pandas', help='Block splitting engine')
+    parser.add_argument('--s3-latency-ms', type=float, default=150.0, help='Simulated latency per S3 request')
+    parser.add_argument('--dynamodb-latency-ms', type=float, default=10.0,
+                        help='Simulated latency per DynamoDB request')
+    parser.add_argument('--upload-concurrency', type=int, default=8, help='Concurrent S3 uploads')
+    parser.add_argument('--dynamodb-concurrency', type=int, default=4, help='Parallel DynamoDB batch writers')
+    parser.add_argument('--write-workers', type=int, default=DEFAULT_WRITE_WORKERS,
+                        help='Pipelined block writer threads')
+    parser.add_argument('--queue-depth', type=int, default=DEFAULT_QUEUE_DEPTH, help='Blocks per stage queue')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='zk_bench_pipelined_')
+    try:
+        input_file = args.input or make_transactions_csv(os.path.join(work_dir, 'input.csv'), args.rows)
+        file_size_mb = os.path.getsize(input_file) / (1024 * 1024)
+        print(f"📊 Input: {input_file} ({file_size_mb:.1f} MB), S3 {args.s3_latency_ms:.0f} ms, "
+              f"DynamoDB {args.dynamodb_latency_ms:.0f} ms per request")
+
+        pipeline = make_pipeline(os.path.join(work_dir, 'aws_sequential'), args)
+        with quiet():
+            (sequential_commitment, stages), sequential_time = timed(
+                sequential, pipeline, input_file, os.path.join(work_dir, 'blocks_sequential'), args
+            )
+
+        pipeline = make_pipeline(os.path.join(work_dir, 'aws_pipelined'), args)
+        ingestion = PipelinedIngestion(pipeline, write_workers=args.write_workers,
+                                       upload_concurrency=args.upload_concurrency,
+                                       dynamodb_concurrency=args.dynamodb_concurrency,
+                                       queue_depth=args.queue_depth)
+        with quiet():
+            pipelined_commitment = ingestion.run(input_file, args.block_size,
+                                                 os.path.join(work_dir, 'blocks_pipelined'), 'bench',
+                                                 engine=args.engine)
+        report = ingestion.report()
+
+        print(f"\n🐢 Sequential: {sequential_time:.2f}s ({sequential_commitment['data_blocks']} data blocks)")
+        for stage, seconds in stages.items():
+            print(f"   {stage:<12}{seconds:>8.2f}s{seconds / sequential_time * 100:>6.0f}% of wall")
+
+        print(f"\n🔀 Pipelined: {report['wall_seconds']:.2f}s")
+        print(f"   {'stage':<12}{'workers':>8}{'items':>8}{'busy s':>9}{'util':>7}")
+        for stage in report['stages']:
+            print(f"   {stage['stage']:<12}{stage['workers']:>8}{stage['items']:>8}"
+                  f"{stage['busy_seconds']:>9.2f}{stage['utilization'] * 100:>6.0f}%")
+
+        identical = sequential_commitment['root_hash'] == pipelined_commitment['root_hash']
+        print(f"\n⚡ Speedup: {sequential_time / report['wall_seconds']:.2f}x  "
+              f"identical root: {'✅' if identical else '❌'}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
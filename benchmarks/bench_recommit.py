@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: committing a one-block edit by rebuilding the whole commitment
+vs the incremental O(log n) re-commit, in memory and as a new file version
+(JSON and binary). Checks the incremental root against the rebuild.
+
+Usage: python3 benchmarks/bench_recommit.py [--blocks 100000]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+from pathlib import Path
+
+from bench_utils import quiet, timed
+
+from binary_commitment import write_binary_commitment
+from cloud_data_ingestion import CloudDataIngestionPipeline
+from incremental_commit import recommit_block, recommit_commitment_file
+
+
+def make_block_metadata(count: int):
+    rng = random.Random(42)
+    sizes = [rng.randint(1_900_000, 2_097_152) for _ in range(count)]
+    return [{
+        'block_id': f"block_{i + 1:04d}",
+        'hash': os.urandom(32).hex(),
+        'row_count': 1000,
+        'size_bytes': sizes[i],
+        'size_mb': sizes[i] / (1024 * 1024),
+        'is_empty': False,
+        'timestamp': '2024-01-01T00:00:00',
+        'upload_id': 'bench',
+        'user_id': 'bench_user',
+    } for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Full rebuild vs incremental re-commit of one block')
+    parser.add_argument('--blocks', type=int, default=100_000, help='Blocks in the commitment')
+    args = parser.parse_args()
+
+    with quiet():
+        pipeline = CloudDataIngestionPipeline(user_id='bench_user')
+
+    work_dir = Path(tempfile.mkdtemp(prefix='zk_bench_recommit_'))
+    try:
+        edited_block = work_dir / 'block_edit.csv'
+        edited_block.write_text('transaction_id,amount\n' + 'TXN_1,42.00\n' * 100_000)
+        block_index = args.blocks // 3
+        block_id = f"block_{block_index + 1:04d}"
+
+        print(f"📦 {args.blocks:,} blocks, editing {block_id}")
+        print(f"{'mode':>10}{'rebuild s':>11}{'recommit ms':>13}{'json ms':>10}{'zkc ms':>9}  identical")
+
+        for path_mode in ('embedded', 'on_demand'):
+            with quiet():
+                commitment = pipeline.create_merkle_commitment(make_block_metadata(args.blocks), 2.0, path_mode)
+            json_file = work_dir / f'commitment_{path_mode}.json'
+            with open(json_file, 'w') as f:
+                json.dump(commitment, f)
+            zkc_file = write_binary_commitment(commitment, work_dir / f'commitment_{path_mode}.zkc')
+
+            # Baseline: rebuild the tree and commitment from every block hash
+            edited = [dict(block) for block in commitment['block_metadata']]
+            edited[block_index]['hash'] = 'ab' * 32
+            for block in edited:
+                block.pop('authentication_path', None)
+            with quiet():
+                rebuilt, rebuild_time = timed(pipeline.create_merkle_commitment, edited, 2.0, path_mode)
+
+            _, recommit_time = timed(recommit_block, commitment, block_index, 'ab' * 32, 2_000_000, 1000)
+            json_result, json_time = timed(recommit_commitment_file, str(json_file), block_id, str(edited_block))
+            zkc_result, zkc_time = timed(recommit_commitment_file, zkc_file, block_id, str(edited_block))
+
+            identical = (commitment['root_hash'] == rebuilt['root_hash']
+                         and json_result['root_hash'] == zkc_result['root_hash'])
+            print(f"{path_mode:>10}{rebuild_time:>11.2f}{recommit_time * 1000:>13.1f}{json_time * 1000:>10.0f}"
+                  f"{zkc_time * 1000:>9.1f}  {'✅' if identical else '❌'}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: kill a checkpointed ingestion part-way with SIGKILL, then rerun
+it with the same upload id. Interrupts once while blocks are being written
+and once while they are being uploaded to the local S3 stand-in (with
+simulated latency). Reports the time of a full run against the resumed
+run, the blocks reused and the uploads skipped, and checks the resumed
+commitment has the same Merkle root as an uninterrupted run.
+
+Usage: python3 benchmarks/bench_resumable_ingestion.py [--rows 300000] [--block-size 0.1]
+                                                       [--engine raw] [--kill-at 0.5]
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import time
+
+from bench_utils import make_transactions_csv, quiet, timed
+
+from cloud_data_ingestion import CloudDataIngestionPipeline
+from ingestion_journal import JOURNAL_FILE
+from local_aws import LocalDynamoTable, LocalS3Client
+
+
+def make_pipeline(aws_dir: str, args) -> CloudDataIngestionPipeline:
+    with quiet():
+        pipeline = CloudDataIngestionPipeline(user_id='bench_user')
+    pipeline.s3_client = LocalS3Client(os.path.join(aws_dir, 's3'), latency_ms=args.s3_latency_ms)
+    pipeline.table = LocalDynamoTable(pipeline.dynamodb_table)
+    return pipeline
+
+
+def ingest(input_file: str, blocks_dir: str, aws_dir: str, upload_id: str, args):
+    """Checkpointed process_file; returns the commitment and the S3 requests it made."""
+    pipeline = make_pipeline(aws_dir, args)
+    with quiet():
+        commitment = pipeline.process_file(input_file, args.block_size, blocks_dir=blocks_dir, upload_id=upload_id,
+                                           engine=args.engine, workers=args.workers, checkpoint=True)
+    return commitment, pipeline.s3_client.request_count
+
+
+def killable_ingest(*args):
+    """``ingest`` in its own process group, so a kill also takes down its block writer processes."""
+    os.setpgrp()
+    ingest(*args)
+
+
+def journal_counts(blocks_dir: str):
+    """Blocks and uploads journaled so far."""
+    try:
+        with open(os.path.join(blocks_dir, JOURNAL_FILE), 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return 0, 0
+    return data.count(b'"type":"block"'), data.count(b'"type":"uploaded"')
+
+
+def run_and_kill(input_file: str, blocks_dir: str, aws_dir: str, upload_id: str, args, phase: str, target: int):
+    """Run the ingestion in a child process and SIGKILL it once ``target`` blocks reach ``phase``."""
+    process = multiprocessing.Process(target=killable_ingest, args=(input_file, blocks_dir, aws_dir, upload_id, args))
+    process.start()
+    while process.is_alive():
+        blocks, uploads = journal_counts(blocks_dir)
+        if (blocks if phase == 'split' else uploads) >= target:
+            os.killpg(process.pid, signal.SIGKILL)
+            break
+        time.sleep(0.005)
+    process.join()
+    return journal_counts(blocks_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Kill-and-restart checkpointed ingestion')
+    parser.add_argument('--rows', type=int, default=300_000, help='Rows in the generated dataset')
+    parser.add_argument('--block-size', type=float, default=0.1, help='Target block size in MB')
+    parser.add_argument('--engine', choices=('pandas', 'raw', 'cdc'), default='raw', help='Block splitting engine')
+    parser.add_argument('--workers', type=int, default=1, help='Raw engine worker processes')
+    parser.add_argument('--s3-latency-ms', type=float, default=20.0, help='Simulated latency per S3 request')
+    parser.add_argument('--kill-at', type=float, default=0.5, help='Fraction of blocks done when killed')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='zk_bench_resume_')
+    cwd = os.getcwd()
+    try:
+        # process_file saves its commitment under the working directory
+        os.chdir(work_dir)
+        input_file = make_transactions_csv(os.path.join(work_dir, 'input.csv'), args.rows)
+        print(f"📊 Dataset: {args.rows:,} rows, {os.path.getsize(input_file) / 2**20:.1f} MB, "
+              f"engine {args.engine}")
+
+        (reference, full_puts), full_time = timed(ingest, input_file, os.path.join(work_dir, 'full'),
+                                                  os.path.join(work_dir, 'aws_full'), 'bench_full', args)
+        data_blocks = reference['data_blocks']
+        print(f"⏱️  Uninterrupted: {full_time:.2f}s, {data_blocks} data blocks, {full_puts} S3 requests")
+        print(f"{'killed in':>10}{'written':>9}{'uploaded':>10}{'resume s':>10}{'S3 reqs':>9}{'root':>7}")
+
+        for phase in ('split', 'upload'):
+            blocks_dir = os.path.join(work_dir, f'resume_{phase}')
+            aws_dir = os.path.join(work_dir, f'aws_{phase}')
+            upload_id = f'bench_{phase}'
+            written, uploaded = run_and_kill(input_file, blocks_dir, aws_dir, upload_id, args, phase,
+                                             max(1, int(data_blocks * args.kill_at)))
+            (resumed, puts), resume_time = timed(ingest, input_file, blocks_dir, aws_dir, upload_id, args)
+            same = resumed['root_hash'] == reference['root_hash']
+            print(f"{phase:>10}{written:>9}{uploaded:>10}{resume_time:>10.2f}{puts:>9}{'✅' if same else '❌':>6}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sequential put_object loop vs the concurrent upload stage,
+against the filesystem-backed LocalS3Client with simulated request latency.
+Reports blocks/s and MB/s; no network or credentials needed.
+
+Usage: python3 benchmarks/bench_s3_upload.py [--blocks 256] [--block-kb 512] [--latency-ms 20]
+                                             [--concurrency 1 4 16 32] [--failure-rate 0.0]
+"""
+
+import argparse
+import os
+import tempfile
+
+from bench_utils import timed
+
+from local_aws import LocalS3Client
+from s3_transfer import BlockUpload, upload_blocks_concurrently
+
+BUCKET = 'zk-audit-bench'
+
+
+def make_block_files(blocks_dir: str, count: int, size_bytes: int):
+    uploads = []
+    for i in range(count):
+        path = os.path.join(blocks_dir, f"block_{i + 1:04d}.csv")
+        with open(path, 'wb') as f:
+            f.write(os.urandom(size_bytes))
+        uploads.append(BlockUpload(f"bench/blocks/block_{i + 1:04d}.csv", path, {'block_id': str(i)}))
+    return uploads
+
+
+def sequential_upload(client, uploads):
+    """The original one-put_object-at-a-time loop, kept here as the baseline."""
+    for upload in uploads:
+        with open(upload.path, 'rb') as f:
+            client.put_object(Bucket=BUCKET, Key=upload.key, Body=f, Metadata=upload.metadata)
+
+
+def concurrent_upload(client, uploads, concurrency, multipart_threshold):
+    for _ in upload_blocks_concurrently(client, BUCKET, uploads, concurrency=concurrency,
+                                        multipart_threshold=multipart_threshold, progress=False):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='S3 upload stage benchmark')
+    parser.add_argument('--blocks', type=int, default=256, help='Blocks to upload')
+    parser.add_argument('--block-kb', type=int, default=512, help='Block size in KiB')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='Simulated latency per request')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 32],
+                        help='Concurrency levels to measure')
+    parser.add_argument('--multipart-threshold-mb', type=float, default=16.0,
+                        help='Blocks at least this large use multipart upload')
+    parser.add_argument('--failure-rate', type=float, default=0.0,
+                        help='Fraction of requests the stand-in fails, to exercise retries')
+    args = parser.parse_args()
+
+    total_mb = args.blocks * args.block_kb / 1024
+    multipart_threshold = int(args.multipart_threshold_mb * 1024 * 1024)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        blocks_dir = os.path.join(tmp, 'blocks')
+        os.makedirs(blocks_dir)
+        uploads = make_block_files(blocks_dir, args.blocks, args.block_kb * 1024)
+
+        print(f"📦 {args.blocks} blocks x {args.block_kb} KiB, {args.latency_ms:.0f} ms per request")
+        print(f"{'mode':>16}{'seconds':>10}{'blocks/s':>11}{'MB/s':>9}{'requests':>10}")
+
+        if args.failure_rate == 0:
+            client = LocalS3Client(os.path.join(tmp, 's3-sequential'), latency_ms=args.latency_ms)
+            _, elapsed = timed(sequential_upload, client, uploads)
+            print(f"{'sequential':>16}{elapsed:>10.2f}{args.blocks / elapsed:>11.1f}"
+                  f"{total_mb / elapsed:>9.1f}{client.request_count:>10}")
+
+        for concurrency in args.concurrency:
+            client = LocalS3Client(os.path.join(tmp, f's3-{concurrency}'), latency_ms=args.latency_ms,
+                                   failure_rate=args.failure_rate, seed=concurrency)
+            _, elapsed = timed(concurrent_upload, client, uploads, concurrency, multipart_threshold)
+            stored = sum(1 for upload in uploads
+                         if os.path.exists(os.path.join(client.root, BUCKET, upload.key)))
+            assert stored == len(uploads), "some blocks were not uploaded"
+            print(f"{f'concurrent x{concurrency}':>16}{elapsed:>10.2f}{args.blocks / elapsed:>11.1f}"
+                  f"{total_mb / elapsed:>9.1f}{client.request_count:>10}")
+
+
+if __name__ == "__main__":
+    main()
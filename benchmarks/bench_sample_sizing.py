@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark: audit sample sizes from the binomial bound vs exact
+hypergeometric sizing for realistic upload sizes. Every sampled block is
+one STARK prove plus verify, so the difference is proofs saved per audit.
+Also reports the time to size one audit, cold and memoized.
+
+Usage: python3 benchmarks/bench_sample_sizing.py [--blocks 64,256,1024,4096,65536]
+"""
+
+import argparse
+
+from bench_utils import timed
+
+from random_block_selector import RandomBlockSelector, hypergeometric_miss_probability, hypergeometric_sample_size
+
+# (confidence, minimum corruption rate) pairs an auditor would ask for
+TARGETS = ((0.95, 0.05), (0.99, 0.05), (0.95, 0.01), (0.99, 0.01), (0.999, 0.10))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Binomial vs hypergeometric audit sample sizes')
+    parser.add_argument('--blocks', default='64,128,256,512,1024,2048,4096,65536',
+                        help='Comma-separated upload sizes in blocks')
+    args = parser.parse_args()
+    block_counts = [int(n) for n in args.blocks.split(',')]
+
+    print(f"{'confidence':>10}{'corrupt':>9}{'blocks':>8}{'binomial':>10}{'exact':>7}{'saved':>7}{'saved %':>9}")
+    for confidence, rate in TARGETS:
+        binomial = RandomBlockSelector(confidence, rate)
+        exact = RandomBlockSelector(confidence, rate, sizing='hypergeometric')
+        for total_blocks in block_counts:
+            n_binomial = binomial.calculate_sample_size(total_blocks)
+            n_exact = exact.calculate_sample_size(total_blocks)
+            saved = n_binomial - n_exact
+            print(f"{confidence:>10.3f}{rate:>9.2f}{total_blocks:>8}{n_binomial:>10}{n_exact:>7}{saved:>7}"
+                  f"{saved / n_binomial * 100:>8.1f}%")
+
+    # Sizing cost per request: first call per (N, rate, confidence), then memoized
+    sizes = [2 ** k for k in range(6, 33)]
+    exact = RandomBlockSelector(0.99, 0.01, sizing='hypergeometric')
+    hypergeometric_sample_size.cache_clear()
+    hypergeometric_miss_probability.cache_clear()
+    _, cold = timed(lambda: [exact.calculate_sample_size(n) for n in sizes])
+    _, warm = timed(lambda: [exact.calculate_sample_size(n) for _ in range(100) for n in sizes])
+    cold, warm = cold / len(sizes), warm / (100 * len(sizes))
+    print(f"\n⏱️  Sizing one audit (N = 2^6 .. 2^32): {cold * 1e6:.1f} µs cold, {warm * 1e6:.2f} µs memoized")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request latency of the server's upload and audit start
+endpoints, called through FastAPI's test client on a generated dataset.
+Both endpoints run the ingestion pipeline and the block selector; this
+measures what a client waits for, interpreter starts and imports included.
+Uploads are removed from upload_blocks/ and merkle_commitments/ afterwards.
+
+Usage: python3 benchmarks/bench_server_latency.py [--rows 20000] [--repeat 5]
+"""
+
+import argparse
+import importlib.util
+import os
+import shutil
+import statistics
+import tempfile
+
+from bench_utils import PROJECT_ROOT, make_transactions_csv, quiet, timed
+
+from fastapi.testclient import TestClient
+
+
+def load_server():
+    spec = importlib.util.spec_from_file_location('fastapi_server', os.path.join(PROJECT_ROOT, 'fastapi-server.py'))
+    server = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(server)
+    return server
+
+
+def remove_upload(upload_id: str, created_dirs):
+    shutil.rmtree(os.path.join(PROJECT_ROOT, 'upload_blocks', upload_id), ignore_errors=True)
+    for suffix in ('json', 'zkc'):
+        path = os.path.join(PROJECT_ROOT, 'merkle_commitments', f'commitment_{upload_id}.{suffix}')
+        if os.path.exists(path):
+            os.remove(path)
+    for directory in created_dirs:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Server upload and audit start latency')
+    parser.add_argument('--rows', type=int, default=20_000, help='Rows in the generated dataset')
+    parser.add_argument('--repeat', type=int, default=5, help='Requests per endpoint')
+    args = parser.parse_args()
+
+    # Directories the server creates on first use, removed again afterwards
+    created_dirs = [os.path.join(PROJECT_ROOT, name) for name in ('upload_blocks', 'merkle_commitments')
+                    if not os.path.exists(os.path.join(PROJECT_ROOT, name))]
+    work_dir = tempfile.mkdtemp(prefix='zk_bench_server_')
+    upload_ids = []
+    try:
+        input_file = make_transactions_csv(os.path.join(work_dir, 'input.csv'), args.rows)
+        with quiet():
+            client = TestClient(load_server().app)
+        print(f"📊 Dataset: {args.rows:,} rows, {os.path.getsize(input_file) / 2**20:.1f} MB")
+
+        upload_times, audit_times = [], []
+        for _ in range(args.repeat):
+            with open(input_file, 'rb') as f, quiet():
+                response, elapsed = timed(client.post, '/api/upload', files={'file': ('input.csv', f, 'text/csv')})
+            response.raise_for_status()
+            upload = response.json()['upload_data']
+            upload_ids.append(upload['upload_id'])
+            upload_times.append(elapsed)
+
+            with quiet():
+                response, elapsed = timed(client.post, '/api/audit/start', json={'upload_id': upload['upload_id']})
+            response.raise_for_status()
+            audit_times.append(elapsed)
+        audit = response.json()['audit_data']
+
+        print(f"🌳 Root reported: {upload['root_hash']}, {upload['total_blocks']} blocks, "
+              f"{audit['sample_size']} selected")
+        for label, times in (('upload', upload_times), ('audit start', audit_times)):
+            print(f"⏱️  {label:>11}: median {statistics.median(times) * 1e3:8.1f} ms, "
+                  f"min {min(times) * 1e3:8.1f} ms over {len(times)}")
+    finally:
+        for upload_id in upload_ids:
+            remove_upload(upload_id, created_dirs)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
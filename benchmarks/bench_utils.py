@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the ZK Audit System benchmarks.
+"""
+
+import contextlib
+import csv
+import io
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Benchmarks import the pipeline modules from the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+def make_transactions_csv(path: str, rows: int, seed: int = 42) -> str:
+    """Write a synthetic transaction CSV shaped like create_sample_dataset.py's output."""
+    rng = random.Random(seed)
+    start_date = datetime(2024, 1, 1)
+    descriptions = ["Online purchase", "ATM withdrawal", "Bank transfer", "Bill payment", "Salary deposit"]
+
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['transaction_id', 'timestamp', 'user_id', 'account_from', 'account_to', 'amount',
+                         'currency', 'transaction_type', 'status', 'fee', 'merchant_id', 'description'])
+        for i in range(rows):
+            writer.writerow([
+                f'TXN_{i + 1:08d}',
+                (start_date + timedelta(days=rng.randint(0, 365))).strftime('%Y-%m-%d %H:%M:%S'),
+                f'USER_{rng.randint(1000, 9999)}',
+                f'ACC_{rng.randint(100000, 999999)}',
+                f'ACC_{rng.randint(100000, 999999)}',
+                round(rng.lognormvariate(3, 1.5), 2),
+                rng.choices(['USD', 'EUR', 'GBP', 'JPY'], weights=[50, 25, 15, 10])[0],
+                rng.choices(['transfer', 'payment', 'withdrawal', 'deposit'], weights=[40, 30, 15, 15])[0],
+                rng.choices(['completed', 'pending', 'failed'], weights=[85, 10, 5])[0],
+                round(rng.uniform(0.1, 5.0), 2),
+                f'MERCH_{rng.randint(1000, 9999)}' if rng.random() < 0.6 else '',
+                f'Transaction {i} - {rng.choice(descriptions)}',
+            ])
+    return path
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the pipeline's progress output while timing it."""
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+def timed(fn, *args, **kwargs):
+    """Run ``fn`` and return (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
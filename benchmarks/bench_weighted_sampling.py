@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: detection chance per threat for uniform audits (exact
+hypergeometric) and risk-weighted audits with the same expected number of
+STARK verifications, on a synthetic upload with log-normal block sizes, a
+few blocks edited through the block endpoint and a recently appended tail.
+Each threat is the tampered set hardest to catch within its category (its
+lightest blocks). Weighted detection is given exactly and as the share of
+seeded audits that hit the tampered set.
+
+Usage: python3 benchmarks/bench_weighted_sampling.py [--blocks 1024] [--edited 16] [--recent 64] [--trials 2000]
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta
+
+import bench_utils  # noqa: F401  (puts the project root on sys.path)
+
+from random_block_selector import (RandomBlockSelector, block_risk_weights, corrupted_block_count,
+                                   hypergeometric_miss_probability, hypergeometric_sample_size,
+                                   inclusion_probabilities)
+
+CONFIDENCE = 0.95
+
+
+def weight_share_for_budget(weights, budget: float) -> float:
+    """Weight share whose risk-weighted audit expects ``budget`` blocks (bisection)."""
+    low, high = 1e-9, 1 - 1e-9
+    for _ in range(100):
+        mid = (low + high) / 2
+        if sum(inclusion_probabilities(weights, CONFIDENCE, mid)) > budget:
+            low = mid
+        else:
+            high = mid
+    return high
+
+
+def synthetic_metadata(blocks: int, recent: int, seed: int = 7):
+    """Block entries with log-normal sizes; the last ``recent`` blocks were appended a day later."""
+    rng = random.Random(seed)
+    ingested = datetime(2024, 1, 1)
+    return [{
+        'block_id': f'block_{i + 1:04d}',
+        'size_bytes': int(rng.lognormvariate(14, 0.4)),
+        'timestamp': (ingested + timedelta(days=1 if i >= blocks - recent else 0)).isoformat(),
+    } for i in range(blocks)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Uniform vs risk-weighted audit sampling')
+    parser.add_argument('--blocks', type=int, default=1024, help='Data blocks in the upload')
+    parser.add_argument('--edited', type=int, default=16, help='Blocks edited through the block endpoint')
+    parser.add_argument('--recent', type=int, default=64, help='Recently appended blocks')
+    parser.add_argument('--trials', type=int, default=2000, help='Seeded audits per threat for the empirical check')
+    args = parser.parse_args()
+
+    metadata = synthetic_metadata(args.blocks, args.recent)
+    rng = random.Random(11)
+    edited = sorted(rng.sample(range(args.blocks - args.recent), args.edited))
+    recent = list(range(args.blocks - args.recent, args.blocks))
+    weights = block_risk_weights(metadata, edited_blocks=[metadata[i]['block_id'] for i in edited],
+                                 recent_since=datetime(2024, 1, 2).isoformat())
+
+    def lightest(indices, count):
+        return sorted(indices, key=lambda i: weights[i])[:count]
+
+    threats = (
+        ('1 edited block', lightest(edited, 1)),
+        ('4 recent blocks', lightest(recent, 4)),
+        ('1% of all blocks', lightest(range(args.blocks), corrupted_block_count(args.blocks, 0.01))),
+        ('5% of all blocks', lightest(range(args.blocks), corrupted_block_count(args.blocks, 0.05))),
+    )
+
+    print(f"📊 {args.blocks} blocks, {args.edited} edited (x8), {args.recent} recent (x4), worst-placed tampering")
+    for rate in (0.05, 0.01):
+        budget = hypergeometric_sample_size(args.blocks, corrupted_block_count(args.blocks, rate), CONFIDENCE)
+        share = weight_share_for_budget(weights, budget)
+        selector = RandomBlockSelector(CONFIDENCE, share)
+        probabilities = inclusion_probabilities(weights, CONFIDENCE, share)
+        audits = [set(selector.select_weighted_blocks(weights, 'bench_user', 'bench_upload', audit_timestamp=str(trial)))
+                  for trial in range(args.trials)]
+        print(f"\n⚖️  {budget} proofs (uniform sized for {rate:.0%} corruption at {CONFIDENCE:.0%}); weighted: "
+              f"{share:.2%} of the risk weight at {CONFIDENCE:.0%}, {sum(map(len, audits)) / len(audits):.1f} proofs")
+        print(f"{'threat':>18}{'uniform':>9}{'weighted':>10}{'seeded':>8}")
+        for label, tampered in threats:
+            uniform = 1 - hypergeometric_miss_probability(budget, args.blocks, len(tampered))
+            miss = 1.0
+            for i in tampered:
+                miss *= 1 - probabilities[i]
+            seeded = sum(not audit.isdisjoint(tampered) for audit in audits) / len(audits)
+            print(f"{label:>18}{uniform:>9.1%}{1 - miss:>10.1%}{seeded:>8.1%}")
+
+    # Audit each block with chance proportional to its weight, scaled until the lightest edited block hits 95%
+    lightest_edited = weights[threats[0][1][0]]
+    weighted = sum(min(1.0, CONFIDENCE * weight / lightest_edited) for weight in weights)
+    print(f"\n✏️  Proofs for {CONFIDENCE:.0%} detection of any one edited block: "
+          f"uniform {hypergeometric_sample_size(args.blocks, 1, CONFIDENCE)}, weighted {weighted:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Random-access binary commitment format for the ZK Data Integrity Audit System.
+
+A ``.zkc`` file holds the same commitment as merkle_commitment.json, laid
+out so that a memory-mapped reader can fetch block i, its hash and its
+authentication path without parsing the rest of the file:
+
+    header    fixed 64 bytes (magic, version, counts, section offsets)
+    tree      every Merkle level as packed 32-byte digests, leaves first
+    index     (leaf_count + 1) little-endian u64 offsets into records
+    records   one compact JSON object per block (hash and path excluded)
+    info      compact JSON of the commitment-level fields
+
+Usage:
+    python binary_commitment.py convert merkle_commitments/commitment_<id>.json
+    python binary_commitment.py show merkle_commitments/commitment_<id>.zkc --block 3
+"""
+
+import binascii
+import json
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from compact_merkle import DIGEST_SIZE, PATH_MODES, CompactMerkleTree
+
+MAGIC = b'ZKCOMMIT'
+FORMAT_VERSION = 1
+BINARY_SUFFIX = '.zkc'
+
+# magic, version, digest size, leaf count, height,
+# tree / index / records / info offsets, info length
+HEADER = struct.Struct('<8sHHII5Q4x')
+INDEX_ENTRY = struct.Struct('<Q')
+
+# Block fields carried by the tree rather than the per-block record
+_TREE_FIELDS = ('hash', 'authentication_path')
+# Commitment fields rebuilt from the tree and records on load
+_DERIVED_FIELDS = ('block_metadata', 'root_hash', 'merkle_levels', 'path_mode')
+
+
+def _compact_json(value) -> bytes:
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+def _commitment_levels(commitment: Dict) -> List[bytes]:
+    """Packed tree levels for a commitment, reusing stored levels when present."""
+    leaves = binascii.unhexlify(''.join(block['hash'] for block in commitment['block_metadata']))
+    if commitment.get('merkle_levels') is not None:
+        return [leaves] + [binascii.unhexlify(level) for level in commitment['merkle_levels']]
+    return [bytes(level) for level in CompactMerkleTree(leaves).levels]
+
+
+def write_binary_commitment(commitment: Dict, output_file: str) -> str:
+    """
+    Write a commitment dictionary in the binary format.
+
+    Works for both embedded and on-demand path modes; the stored tree must
+    reproduce ``root_hash`` or a ValueError is raised.
+    """
+    blocks = commitment['block_metadata']
+    if not blocks:
+        raise ValueError("Cannot write a binary commitment without blocks")
+
+    levels = _commitment_levels(commitment)
+    root = levels[-1].hex()
+    if root != commitment['root_hash'][0]:
+        raise ValueError(f"Block hashes do not reproduce the committed root {commitment['root_hash'][0]}")
+
+    records = [_compact_json({k: v for k, v in block.items() if k not in _TREE_FIELDS})
+               for block in blocks]
+    index = bytearray()
+    offset = 0
+    for record in records:
+        index += INDEX_ENTRY.pack(offset)
+        offset += len(record)
+    index += INDEX_ENTRY.pack(offset)
+
+    info = _compact_json({k: v for k, v in commitment.items() if k not in _DERIVED_FIELDS})
+
+    tree_offset = HEADER.size
+    index_offset = tree_offset + sum(len(level) for level in levels)
+    records_offset = index_offset + len(index)
+    info_offset = records_offset + offset
+
+    with open(output_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, DIGEST_SIZE, len(blocks), len(levels),
+                            tree_offset, index_offset, records_offset, info_offset, len(info)))
+        for level in levels:
+            f.write(level)
+        f.write(index)
+        for record in records:
+            f.write(record)
+        f.write(info)
+
+    return str(output_file)
+
+
+def patch_binary_commitment(reader: 'BinaryCommitment', block_index: int, nodes: List[bytes],
+                            block: Dict, info: Dict, output_file: str) -> str:
+    """
+    Write a copy of ``reader``'s file with one block changed.
+
+    ``nodes`` are the new digests on the block's root path, leaf first.
+    ``block`` and ``info`` replace its record and the commitment-level
+    fields. Everything else is copied as raw bytes; only the index entries
+    after the block shift when its record changes length.
+    """
+    mm = reader._mm
+    tree = bytearray(mm[reader._tree_offset:reader._index_offset])
+    for level, node in enumerate(nodes):
+        offset = reader._levels[level][0] - reader._tree_offset + (block_index >> level) * DIGEST_SIZE
+        tree[offset:offset + DIGEST_SIZE] = node
+
+    record = _compact_json({k: v for k, v in block.items() if k not in _TREE_FIELDS})
+    index = np.frombuffer(mm[reader._index_offset:reader._records_offset], dtype='<i8').copy()
+    start, end = int(index[block_index]), int(index[block_index + 1])
+    index[block_index + 1:] += len(record) - (end - start)
+
+    info_bytes = _compact_json(info)
+    info_offset = reader._records_offset + int(index[-1])
+
+    with open(output_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, DIGEST_SIZE, reader.leaf_count, reader.height,
+                            reader._tree_offset, reader._index_offset, reader._records_offset,
+                            info_offset, len(info_bytes)))
+        f.write(tree)
+        f.write(index.tobytes())
+        f.write(mm[reader._records_offset:reader._records_offset + start])
+        f.write(record)
+        f.write(mm[reader._records_offset + end:reader._info_offset])
+        f.write(info_bytes)
+        f.flush()
+        os.fsync(f.fileno())
+
+    return str(output_file)
+
+
+def is_binary_commitment(path: str) -> bool:
+    """True if ``path`` starts with the binary commitment magic."""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class BinaryCommitment:
+    """
+    Memory-mapped reader for binary commitment files.
+
+    Block hashes, metadata and authentication paths are sliced straight out
+    of the mapping; nothing is parsed until it is asked for.
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty commitment file: {self.path}")
+
+        if len(self._mm) < HEADER.size:
+            self.close()
+            raise ValueError(f"Truncated commitment file: {self.path}")
+
+        (magic, version, digest_size, self.leaf_count, self.height, self._tree_offset,
+         self._index_offset, self._records_offset, self._info_offset,
+         self._info_length) = HEADER.unpack_from(self._mm, 0)
+
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a binary commitment file: {self.path}")
+        if version != FORMAT_VERSION or digest_size != DIGEST_SIZE:
+            self.close()
+            raise ValueError(f"Unsupported commitment format version {version} (digest size {digest_size})")
+
+        # Start offset and node count of every level, leaves first
+        self._levels = []
+        offset, size = self._tree_offset, self.leaf_count
+        for _ in range(self.height):
+            self._levels.append((offset, size))
+            offset += size * DIGEST_SIZE
+            size = (size + 1) // 2
+
+        self._info = None
+
+    def close(self):
+        if getattr(self, '_mm', None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.leaf_count
+
+    def _check_index(self, block_index: int):
+        if not 0 <= block_index < self.leaf_count:
+            raise IndexError(f"Block index {block_index} out of range (0-{self.leaf_count - 1})")
+
+    def node_digest(self, level: int, index: int) -> bytes:
+        offset = self._levels[level][0] + index * DIGEST_SIZE
+        return self._mm[offset:offset + DIGEST_SIZE]
+
+    @property
+    def root(self) -> str:
+        return self.node_digest(self.height - 1, 0).hex()
+
+    def block_hash(self, block_index: int) -> str:
+        self._check_index(block_index)
+        return self.node_digest(0, block_index).hex()
+
+    def authentication_path(self, block_index: int) -> List[str]:
+        """Authentication path for one block, leaf level first."""
+        self._check_index(block_index)
+        auth_path = []
+        current_index = block_index
+        for level in range(self.height - 1):
+            sibling_index = current_index ^ 1
+            if sibling_index >= self._levels[level][1]:
+                sibling_index = current_index  # odd level: node is its own sibling
+            auth_path.append(self.node_digest(level, sibling_index).hex())
+            current_index //= 2
+        return auth_path
+
+    def block_metadata(self, block_index: int, include_path: bool = True) -> Dict:
+        """Metadata record for one block, with its hash (and path) filled in."""
+        self._check_index(block_index)
+        start, end = struct.unpack_from('<2Q', self._mm, self._index_offset + block_index * INDEX_ENTRY.size)
+        record = json.loads(self._mm[self._records_offset + start:self._records_offset + end])
+
+        block = {'block_id': record.pop('block_id'), 'hash': self.block_hash(block_index)}
+        block.update(record)
+        if include_path:
+            block['authentication_path'] = self.authentication_path(block_index)
+        return block
+
+    @property
+    def info(self) -> Dict:
+        """Commitment-level fields (everything except the per-block data)."""
+        if self._info is None:
+            self._info = json.loads(self._mm[self._info_offset:self._info_offset + self._info_length])
+        return self._info
+
+    def to_dict(self, path_mode: str = 'embedded') -> Dict:
+        """Rebuild the full JSON commitment dictionary."""
+        if path_mode not in PATH_MODES:
+            raise ValueError(f"Unknown path mode '{path_mode}' (expected one of {PATH_MODES})")
+
+        embedded = path_mode == 'embedded'
+        commitment = {'root_hash': [self.root]}
+        commitment.update(self.info)
+        commitment['block_metadata'] = [self.block_metadata(i, include_path=embedded)
+                                        for i in range(self.leaf_count)]
+        if not embedded:
+            commitment['path_mode'] = path_mode
+            commitment['merkle_levels'] = [
+                self._mm[offset:offset + size * DIGEST_SIZE].hex()
+                for offset, size in self._levels[1:]
+            ]
+        return commitment
+
+
+def load_commitment(path: str) -> Dict:
+    """Load a commitment dictionary from either the JSON or the binary format."""
+    if is_binary_commitment(path):
+        with BinaryCommitment(path) as commitment:
+            return commitment.to_dict()
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def convert_json_commitment(json_file: str, output_file: Optional[str] = None) -> str:
+    """Convert an existing merkle_commitment JSON file to the binary format."""
+    if output_file is None:
+        output_file = str(Path(json_file).with_suffix(BINARY_SUFFIX))
+    with open(json_file, 'r') as f:
+        commitment = json.load(f)
+    return write_binary_commitment(commitment, output_file)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='ZK Audit System - Binary Commitment Tool')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert_parser = subparsers.add_parser('convert', help='Convert a JSON commitment to the binary format')
+    convert_parser.add_argument('json_file', help='Path to merkle commitment JSON file')
+    convert_parser.add_argument('-o', '--output', help=f'Output path (default: input with {BINARY_SUFFIX} suffix)')
+
+    show_parser = subparsers.add_parser('show', help='Print the header, or one block, of a binary commitment')
+    show_parser.add_argument('commitment_file', help='Path to binary commitment file')
+    show_parser.add_argument('--block', type=int, help='Block index to print')
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'convert':
+            json_size = Path(args.json_file).stat().st_size
+            output_file = convert_json_commitment(args.json_file, args.output)
+            binary_size = Path(output_file).stat().st_size
+            print(f"✅ Binary commitment written: {output_file}")
+            print(f"📊 Size: {json_size:,} bytes JSON -> {binary_size:,} bytes binary")
+        else:
+            with BinaryCommitment(args.commitment_file) as commitment:
+                if args.block is None:
+                    print(f"🌳 Merkle root: {commitment.root}")
+                    print(f"📦 Total blocks: {commitment.leaf_count}")
+                    print(f"🌲 Tree height: {commitment.height}")
+                else:
+                    print(json.dumps(commitment.block_metadata(args.block), indent=2))
+    except (OSError, ValueError, IndexError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Columnar block sidecars for the ZK Data Integrity Audit System.
+
+A block can get a columnar copy (Arrow IPC or Parquet) next to its CSV:
+
+    <blocks_dir>/columnar/block_NNNN.arrow | .parquet
+
+The CSV stays the committed and audited form. Each sidecar records the
+SHA3-256 of the canonical CSV bytes it was converted from in its schema
+metadata, and readers only use it when that digest matches the hash the
+caller expects (the committed block hash). A sidecar left behind by an
+edited or re-committed block is ignored rather than served.
+
+Columns are typed as ``pd.read_csv`` would type them, so the sidecar
+loads to the same DataFrame without parsing. Arrow IPC files are memory
+mapped (zero-copy); Parquet files are smaller and read only the columns
+asked for. Requires pyarrow.
+
+Usage:
+    python block_columnar.py build upload_blocks/<id> [--format parquet]   # backfill sidecars
+    python block_columnar.py list upload_blocks/<id>
+"""
+
+import hashlib
+import io
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from block_storage import open_block_reader
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+COLUMNAR_FORMATS = ('none', 'arrow', 'parquet')
+COLUMNAR_DIR = 'columnar'
+EXTENSIONS = {'arrow': '.arrow', 'parquet': '.parquet'}
+
+# Schema metadata key binding a sidecar to the CSV bytes it came from
+CSV_HASH_KEY = b'zk_csv_sha3'
+
+
+def check_columnar(columnar: str):
+    """Raise ValueError for an unknown sidecar format, or any format without pyarrow."""
+    if columnar not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unknown columnar format '{columnar}' (expected one of {COLUMNAR_FORMATS})")
+    if columnar != 'none' and not PYARROW_AVAILABLE:
+        raise ValueError("Columnar block sidecars require the pyarrow package (pip install pyarrow)")
+
+
+def sidecar_path(blocks_dir, block_id: str, columnar: str) -> Path:
+    return Path(blocks_dir) / COLUMNAR_DIR / f"{block_id}{EXTENSIONS[columnar]}"
+
+
+def find_sidecar(blocks_dir, block_id: str) -> Optional[Path]:
+    """The block's sidecar in either format, if there is one."""
+    for columnar in EXTENSIONS:
+        path = sidecar_path(blocks_dir, block_id, columnar)
+        if path.exists():
+            return path
+    return None
+
+
+def write_sidecar(blocks_dir, block_id: str, data: bytes, columnar: str) -> Path:
+    """
+    Convert a block's canonical CSV bytes to a sidecar bound to their hash.
+
+    Any sidecar of the block in the other format is removed, so a block
+    never has two. The file is written then renamed into place.
+    """
+    check_columnar(columnar)
+    table = pa.Table.from_pandas(pd.read_csv(io.BytesIO(data)), preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        CSV_HASH_KEY: hashlib.sha3_256(data).hexdigest().encode(),
+    })
+
+    path = sidecar_path(blocks_dir, block_id, columnar)
+    path.parent.mkdir(exist_ok=True)
+    tmp_file = path.with_name(f".{path.name}.tmp")
+    if columnar == 'arrow':
+        with pa.OSFile(str(tmp_file), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pa.parquet.write_table(table, str(tmp_file))
+    os.replace(tmp_file, path)
+
+    for other in EXTENSIONS:
+        if other != columnar:
+            sidecar_path(blocks_dir, block_id, other).unlink(missing_ok=True)
+    return path
+
+
+def sidecar_csv_hash(path: Path) -> Optional[str]:
+    """CSV digest recorded in a sidecar, read from its schema only."""
+    if path.suffix == EXTENSIONS['arrow']:
+        with pa.memory_map(str(path)) as source:
+            schema = pa.ipc.open_file(source).schema
+    else:
+        schema = pa.parquet.read_schema(str(path))
+    digest = (schema.metadata or {}).get(CSV_HASH_KEY)
+    return digest.decode() if digest else None
+
+
+def read_sidecar(blocks_dir, block_id: str, expected_hash: str,
+                 columns: Optional[Sequence[str]] = None) -> Optional['pa.Table']:
+    """
+    The block's columnar copy, or None when it has none, pyarrow is not
+    installed, or the sidecar was converted from CSV bytes other than
+    ``expected_hash``. ``columns`` selects a subset.
+    """
+    if not PYARROW_AVAILABLE:
+        return None
+    path = find_sidecar(blocks_dir, block_id)
+    if path is None:
+        return None
+
+    if path.suffix == EXTENSIONS['arrow']:
+        # Buffers point into the mapping; nothing is copied until converted
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            if (reader.schema.metadata or {}).get(CSV_HASH_KEY, b'').decode() != expected_hash:
+                return None
+            table = reader.read_all()
+        return table.select(list(columns)) if columns is not None else table
+
+    parquet_file = pa.parquet.ParquetFile(str(path), memory_map=True)
+    if (parquet_file.schema_arrow.metadata or {}).get(CSV_HASH_KEY, b'').decode() != expected_hash:
+        return None
+    return parquet_file.read(columns=list(columns) if columns is not None else None)
+
+
+def read_block_frame(blocks_dir, block_id: str, expected_hash: str,
+                     columns: Optional[Sequence[str]] = None) -> Optional[pd.DataFrame]:
+    """The block as ``pd.read_csv`` would load it, from its sidecar (None if unusable)."""
+    table = read_sidecar(blocks_dir, block_id, expected_hash, columns)
+    return table.to_pandas() if table is not None else None
+
+
+def build_sidecars(blocks_dir, block_metadata: List[Dict], columnar: str) -> int:
+    """Write a sidecar for every data block of an upload; returns the sidecars written."""
+    check_columnar(columnar)
+    reader = open_block_reader(blocks_dir)
+    written = 0
+    try:
+        for block in block_metadata:
+            if block.get('is_padding', False):
+                continue
+            write_sidecar(blocks_dir, block['block_id'], reader.read_block(block['block_id']), columnar)
+            written += 1
+    finally:
+        reader.close()
+    return written
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='ZK Audit System - Columnar block sidecars')
+    parser.add_argument('command', choices=('build', 'list'))
+    parser.add_argument('blocks_dir', help='Blocks directory of an upload')
+    parser.add_argument('--format', choices=COLUMNAR_FORMATS[1:], default='parquet',
+                        help='Sidecar format to build (default: parquet)')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.blocks_dir):
+        print(f"❌ Error: Blocks directory '{args.blocks_dir}' not found")
+        sys.exit(1)
+    if not PYARROW_AVAILABLE:
+        print("❌ Error: pyarrow is not installed")
+        sys.exit(1)
+
+    reader = open_block_reader(args.blocks_dir)
+    blocks = reader.list_blocks()
+    reader.close()
+    if args.command == 'build':
+        count = build_sidecars(args.blocks_dir, blocks, args.format)
+        print(f"🧱 Wrote {count} {args.format} sidecars to {Path(args.blocks_dir) / COLUMNAR_DIR}")
+    else:
+        for block in blocks:
+            path = find_sidecar(args.blocks_dir, block['block_id'])
+            digest = sidecar_csv_hash(path) if path else None
+            print(f"{block['block_id']}  {path.name if path else '-':>22}  {digest or '-'}")
+
+
+if __name__ == "__main__":
+    main()
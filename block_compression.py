@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Block compression for the ZK Data Integrity Audit System.
+
+Blocks can be stored gzip- or zstd-compressed, chosen per upload. The
+hash, size and row count recorded for a block always describe its
+canonical uncompressed CSV bytes, so Merkle roots do not depend on the
+codec. Stored blocks keep their usual names: readers recognise compressed
+data by its magic bytes and decompress it as a stream.
+"""
+
+import contextlib
+import gzip
+import io
+from typing import BinaryIO, Iterator
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+COMPRESSIONS = ('none', 'gzip', 'zstd')
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Bytes pulled from a stored block per read while decompressing
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def check_compression(compression: str):
+    """Raise ValueError for an unknown codec, or zstd without the zstandard package."""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown block compression '{compression}' (expected one of {COMPRESSIONS})")
+    if compression == 'zstd' and not ZSTD_AVAILABLE:
+        raise ValueError("zstd block compression requires the zstandard package (pip install zstandard)")
+
+
+def detect_compression(head: bytes) -> str:
+    """Codec of stored block data from its first bytes (CSV text never starts with either magic)."""
+    if head.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if head.startswith(ZSTD_MAGIC):
+        return 'zstd'
+    return 'none'
+
+
+@contextlib.contextmanager
+def compressing_writer(f: BinaryIO, compression: str) -> Iterator[BinaryIO]:
+    """
+    Binary writer that compresses into the open file ``f``.
+
+    ``write`` returns the uncompressed bytes consumed, so a HashingWriter on
+    top hashes canonical content. ``f`` is left open.
+    """
+    if compression == 'none':
+        yield f
+    elif compression == 'gzip':
+        # mtime=0 keeps the stored bytes reproducible
+        with gzip.GzipFile(fileobj=f, mode='wb', compresslevel=GZIP_LEVEL, mtime=0) as writer:
+            yield writer
+    else:
+        check_compression(compression)
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        with compressor.stream_writer(f, closefd=False, write_return_read=True) as writer:
+            yield writer
+
+
+def open_decompressed(stored: BinaryIO) -> BinaryIO:
+    """
+    Stream of a stored block's canonical bytes.
+
+    ``stored`` must support ``peek`` (io.BufferedReader); closing the stream
+    closes it.
+    """
+    compression = detect_compression(stored.peek(len(ZSTD_MAGIC)))
+    if compression == 'gzip':
+        return _Owning(gzip.GzipFile(fileobj=stored, mode='rb'), stored)
+    if compression == 'zstd':
+        check_compression(compression)
+        return zstandard.ZstdDecompressor().stream_reader(stored, read_size=READ_CHUNK_SIZE, closefd=True)
+    return stored
+
+
+def open_block_file(path: str) -> BinaryIO:
+    """Stream of a block file's canonical bytes, whether it is stored compressed or not."""
+    return open_decompressed(open(path, 'rb', buffering=READ_CHUNK_SIZE))
+
+
+def decompress_bytes(data: bytes) -> bytes:
+    """Canonical bytes of stored block data."""
+    with open_decompressed(io.BufferedReader(io.BytesIO(data))) as stream:
+        return stream.read()
+
+
+class _Owning(io.BufferedIOBase):
+    """A decompressing reader that also closes the stored stream under it."""
+
+    def __init__(self, reader: BinaryIO, stored: BinaryIO):
+        super().__init__()
+        self._reader = reader
+        self._stored = stored
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        return self._reader.read(size)
+
+    def read1(self, size: int = -1) -> bytes:
+        return self._reader.read1(size)
+
+    def readinto(self, b) -> int:
+        return self._reader.readinto(b)
+
+    def close(self):
+        if not self.closed:
+            self._reader.close()
+            self._stored.close()
+        super().close()
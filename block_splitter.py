@@ -0,0 +1,701 @@
+#!/usr/bin/env python3
+"""
+Block splitting engines for the ZK Data Integrity Audit System.
+Shared by cloud_data_ingestion.py and standalone_audit.py.
+"""
+
+import contextlib
+import hashlib
+import importlib.util
+import io
+import math
+import os
+import zlib
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from block_compression import compressing_writer
+
+# Block splitting engines selectable from the CLIs
+ENGINES = ('pandas', 'raw', 'cdc')
+
+# Engines that cut blocks from the source bytes instead of re-serializing rows
+BYTE_ENGINES = ('raw', 'cdc')
+
+# Content-defined chunking keeps blocks within these fractions of the target
+CDC_MIN_FRACTION = 0.5
+CDC_MAX_FRACTION = 2.0
+
+# Rows used to estimate bytes per row before cutting each block
+ROW_SAMPLE_SIZE = 1000
+
+# Rows pulled from the CSV per read in streaming mode
+DEFAULT_STREAM_CHUNK_ROWS = 50_000
+
+# Compact schemas load string columns with at most this many distinct
+# values (and at most half as many as rows) as categoricals
+CATEGORY_MAX_VALUES = 10_000
+
+# Strings pandas parses as booleans when a whole column chunk holds them
+BOOL_STRINGS = ('True', 'TRUE', 'true', 'False', 'FALSE', 'false')
+
+# Cheap pre-filter for strings that may parse as a number or boolean
+SCALAR_PREFIX = r'\s*(?:[-+]?(?:\d|\.\d|inf)|true|false)'
+
+# Bytes pulled from the CSV per read while looking for a record end
+RAW_READ_SIZE = 1024 * 1024
+
+# Size of the reusable buffer between block serialization and disk
+WRITE_BUFFER_SIZE = 256 * 1024
+
+
+class HashingWriter(io.RawIOBase):
+    """
+    Raw binary sink that tees every byte written to a file into SHA3-256.
+
+    The digest and size describe exactly the bytes that reached the file,
+    so block files never need to be read back to be hashed.
+    """
+
+    def __init__(self, file: BinaryIO):
+        super().__init__()
+        self._file = file
+        self._hasher = hashlib.sha3_256()
+        self.size_bytes = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        written = self._file.write(data)
+        if written is None:
+            written = len(data)
+        self._hasher.update(memoryview(data)[:written])
+        self.size_bytes += written
+        return written
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+
+def _open_block(block_file: Union[str, BinaryIO]):
+    """An unbuffered binary file for a block path, or an already open one (a pack segment) left open."""
+    if hasattr(block_file, 'write'):
+        return contextlib.nullcontext(block_file)
+    return open(block_file, 'wb', buffering=0)
+
+
+def write_block_frame(block_data: pd.DataFrame, block_file: Union[str, BinaryIO],
+                      compression: str = 'none') -> Tuple[str, int]:
+    """
+    Write a block as CSV and return ``(sha3_hash, size_bytes)`` from the same pass.
+
+    Produces the same bytes as ``block_data.to_csv(block_file, index=False)``.
+    ``block_file`` is a path or an open binary file the block is appended to.
+    With ``compression`` the stored bytes are compressed; the hash and size
+    are still those of the CSV bytes.
+    """
+    with _open_block(block_file) as f, compressing_writer(f, compression) as out:
+        sink = HashingWriter(out)
+        buffered = io.BufferedWriter(sink, buffer_size=WRITE_BUFFER_SIZE)
+        with io.TextIOWrapper(buffered, encoding='utf-8', newline='') as text:
+            block_data.to_csv(text, index=False)
+    return sink.hexdigest(), sink.size_bytes
+
+
+def write_block_bytes(block_file: Union[str, BinaryIO], *parts: bytes,
+                      compression: str = 'none') -> Tuple[str, int]:
+    """
+    Write raw byte parts to a block file (path or open file) and return
+    ``(sha3_hash, size_bytes)`` of the uncompressed parts.
+    """
+    with _open_block(block_file) as f, compressing_writer(f, compression) as out:
+        sink = HashingWriter(out)
+        with io.BufferedWriter(sink, buffer_size=WRITE_BUFFER_SIZE) as buffered:
+            for part in parts:
+                buffered.write(part)
+    return sink.hexdigest(), sink.size_bytes
+
+
+def plan_block_count(file_size_bytes: int, target_block_size_mb: float) -> Tuple[int, int]:
+    """Estimated block count for a file and that count rounded up to a power of two."""
+    estimated_blocks = math.ceil(file_size_bytes / (1024 * 1024) / target_block_size_mb)
+    return estimated_blocks, 2 ** math.ceil(math.log2(estimated_blocks))
+
+
+def frame_header_bytes(columns) -> bytes:
+    """Bytes ``write_block_frame`` writes for a header-only block with these columns."""
+    return pd.DataFrame(columns=columns).to_csv(index=False).encode('utf-8')
+
+
+def padding_block_digest(header: bytes) -> Tuple[str, int]:
+    """
+    Hash and size of a header-only padding block, without writing it.
+
+    Padding leaves only round the tree up to a power of two; their content
+    is fully determined by the header, so they are committed but never
+    materialized.
+    """
+    return hashlib.sha3_256(header).hexdigest(), len(header)
+
+
+def iter_block_frames(df: pd.DataFrame,
+                      power_of_2_blocks: int,
+                      target_block_size_bytes: int) -> Iterator[pd.DataFrame]:
+    """Yield one DataFrame per block from a fully loaded dataset."""
+    total_rows = len(df)
+    current_row = 0
+
+    for _ in range(power_of_2_blocks):
+        if current_row >= total_rows:
+            # Create empty block
+            yield pd.DataFrame(columns=df.columns)
+            continue
+
+        # Estimate rows for target size
+        sample_data = df.iloc[current_row:current_row + ROW_SAMPLE_SIZE]
+        target_rows = _estimate_target_rows(sample_data, target_block_size_bytes)
+
+        end_row = min(current_row + target_rows, total_rows)
+        yield df.iloc[current_row:end_row]
+        current_row = end_row
+
+
+def scan_csv_schema(input_file: str,
+                    chunk_rows: int = DEFAULT_STREAM_CHUNK_ROWS,
+                    compact: bool = False) -> Tuple[List[str], Dict[str, np.dtype], int]:
+    """
+    Stream the CSV once to learn its columns, row count and unified dtypes.
+
+    Reading in chunks lets pandas infer a different dtype per chunk (an int
+    column with a gap in one chunk comes back as float only there). A full
+    ``pd.read_csv`` would upcast the whole column, so numeric columns whose
+    chunk dtypes disagree are returned here to be forced on the second pass.
+
+    With ``compact`` the returned dtypes also shrink the loaded frame
+    without changing a byte of its CSV write-out (see ``_compact_dtypes``).
+    """
+    columns: List[str] = []
+    chunk_dtypes: Dict[str, set] = {}
+    total_rows = 0
+    profile = _ColumnProfile() if compact else None
+
+    for chunk in pd.read_csv(input_file, chunksize=chunk_rows):
+        if not columns:
+            columns = list(chunk.columns)
+        total_rows += len(chunk)
+        for column, dtype in chunk.dtypes.items():
+            chunk_dtypes.setdefault(column, set()).add(dtype)
+        if profile is not None:
+            profile.add(chunk)
+
+    if not columns:
+        # Header-only file: pandas yields no chunks
+        columns = list(pd.read_csv(input_file, nrows=0).columns)
+
+    forced_dtypes = {}
+    for column, dtypes in chunk_dtypes.items():
+        if len(dtypes) < 2:
+            continue
+        if not all(isinstance(d, np.dtype) and d.kind in 'if' for d in dtypes):
+            # Mixed non-numeric chunks become object columns, which
+            # serialize each value exactly as its own chunk parsed it
+            continue
+        forced_dtypes[column] = np.result_type(*dtypes)
+
+    if profile is not None:
+        forced_dtypes.update(_compact_dtypes(chunk_dtypes, profile, total_rows))
+
+    return columns, forced_dtypes, total_rows
+
+
+class _ColumnProfile:
+    """Integer ranges and distinct strings per column, gathered chunk by chunk."""
+
+    def __init__(self):
+        self.int_ranges: Dict[str, Tuple[int, int]] = {}
+        self.distinct: Dict[str, Optional[set]] = {}
+        self.scalar_like: set = set()
+
+    def add(self, chunk: pd.DataFrame):
+        for column, values in chunk.items():
+            if values.dtype.kind == 'i' and len(values):
+                low, high = int(values.min()), int(values.max())
+                if column in self.int_ranges:
+                    low, high = min(low, self.int_ranges[column][0]), max(high, self.int_ranges[column][1])
+                self.int_ranges[column] = (low, high)
+            elif _is_string_dtype(values.dtype) and column not in self.scalar_like:
+                values = pd.Series(values.dropna().unique())
+                # Object columns also hold bools (a bool column with blanks)
+                # or numbers mixed with strings; pandas keeps inferring those
+                if not values.map(lambda value: isinstance(value, str)).all() or _parses_as_scalar(values):
+                    self.scalar_like.add(column)
+                    continue
+                distinct = self.distinct.setdefault(column, set())
+                if distinct is not None:
+                    distinct.update(values)
+                    if len(distinct) > CATEGORY_MAX_VALUES:
+                        self.distinct[column] = None
+
+
+def _is_string_dtype(dtype) -> bool:
+    return dtype == object or isinstance(dtype, pd.StringDtype)
+
+
+def _parses_as_scalar(values: pd.Series) -> bool:
+    """
+    Whether any string (``values`` holds only strings) would parse as a
+    number or boolean on its own.
+
+    ``pd.read_csv`` types each internal chunk separately, so such a value
+    can come back as a float or bool inside an otherwise string column and
+    be written out differently from its source text.
+    """
+    values = values[values.str.match(SCALAR_PREFIX, case=False, na=True)]
+    return bool(values.isin(BOOL_STRINGS).any() or pd.to_numeric(values, errors='coerce').notna().any())
+
+
+def _compact_dtypes(chunk_dtypes: Dict[str, set], profile: _ColumnProfile, total_rows: int) -> Dict:
+    """
+    Dtypes that hold the same values in less memory.
+
+    Integer columns get the narrowest integer type that fits their range.
+    String columns become categoricals with fixed categories (so frames cut
+    across read chunks still concatenate as categoricals) when they have
+    few distinct values, and pyarrow-backed strings otherwise when pyarrow
+    is installed. Floats are left at float64, whose values narrower floats
+    would print differently; columns whose chunks disagree on a kind, or
+    whose strings look like numbers or booleans, are left as inferred.
+    """
+    dtypes = {}
+    for column, kinds in chunk_dtypes.items():
+        if all(isinstance(d, np.dtype) and d.kind == 'i' for d in kinds) and column in profile.int_ranges:
+            low, high = profile.int_ranges[column]
+            for candidate in (np.int8, np.int16, np.int32):
+                info = np.iinfo(candidate)
+                if info.min <= low and high <= info.max:
+                    dtypes[column] = np.dtype(candidate)
+                    break
+        elif (all(_is_string_dtype(d) for d in kinds) and column in profile.distinct
+              and column not in profile.scalar_like):
+            distinct = profile.distinct[column]
+            if distinct is not None and len(distinct) <= total_rows // 2:
+                dtypes[column] = pd.CategoricalDtype(sorted(distinct))
+            elif importlib.util.find_spec('pyarrow') is not None:
+                dtypes[column] = pd.StringDtype('pyarrow')
+    return dtypes
+
+
+def iter_block_frames_streaming(input_file: str,
+                                power_of_2_blocks: int,
+                                target_block_size_bytes: int,
+                                columns: List[str],
+                                dtype: Optional[Dict[str, np.dtype]] = None,
+                                chunk_rows: int = DEFAULT_STREAM_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Yield the same blocks as ``iter_block_frames`` without loading the file.
+
+    Only the rows of the block being cut (plus at most one read chunk) are
+    held in memory. ``columns`` and ``dtype`` come from ``scan_csv_schema``.
+    """
+    reader = pd.read_csv(input_file, chunksize=chunk_rows, dtype=dtype)
+    buffer = _RowBuffer(iter(reader))
+
+    for _ in range(power_of_2_blocks):
+        if not buffer.fill(ROW_SAMPLE_SIZE):
+            # Create empty block
+            yield pd.DataFrame(columns=columns)
+            continue
+
+        # Estimate rows for target size
+        sample_data = buffer.peek(ROW_SAMPLE_SIZE)
+        target_rows = _estimate_target_rows(sample_data, target_block_size_bytes)
+
+        buffer.fill(target_rows)
+        yield buffer.take(target_rows)
+
+    reader.close()
+
+
+def _estimate_target_rows(sample_data: pd.DataFrame, target_block_size_bytes: int) -> int:
+    """Estimate how many rows fit in a block from a sample's CSV size."""
+    sample_csv = sample_data.to_csv(index=False)
+    bytes_per_row = len(sample_csv.encode('utf-8')) / len(sample_data)
+    return max(1, int(target_block_size_bytes / bytes_per_row))
+
+
+class _RowBuffer:
+    """FIFO of parsed CSV chunks that hands out row ranges across chunk edges."""
+
+    def __init__(self, chunks: Iterator[pd.DataFrame]):
+        self._chunks = chunks
+        self._frames: List[pd.DataFrame] = []
+        self._offset = 0  # rows already consumed from self._frames[0]
+        self._rows = 0
+        self._exhausted = False
+
+    def fill(self, rows: int) -> int:
+        """Read until ``rows`` rows are buffered or the file ends."""
+        while self._rows < rows and not self._exhausted:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._exhausted = True
+            elif len(chunk) > 0:
+                self._frames.append(chunk)
+                self._rows += len(chunk)
+        return min(rows, self._rows)
+
+    def peek(self, rows: int) -> pd.DataFrame:
+        return self._slice(rows, consume=False)
+
+    def take(self, rows: int) -> pd.DataFrame:
+        return self._slice(rows, consume=True)
+
+    def _slice(self, rows: int, consume: bool) -> pd.DataFrame:
+        pieces = []
+        needed = min(rows, self._rows)
+        offset = self._offset
+        frame_index = 0
+
+        while needed > 0:
+            frame = self._frames[frame_index]
+            piece = frame.iloc[offset:offset + needed]
+            pieces.append(piece)
+            needed -= len(piece)
+            offset = 0
+            frame_index += 1
+
+        if consume:
+            taken = sum(len(p) for p in pieces)
+            self._rows -= taken
+            while taken > 0:
+                available = len(self._frames[0]) - self._offset
+                if taken >= available:
+                    taken -= available
+                    self._frames.pop(0)
+                    self._offset = 0
+                else:
+                    self._offset += taken
+                    taken = 0
+
+        return pieces[0] if len(pieces) == 1 else pd.concat(pieces)
+
+
+# ---------------------------------------------------------------------------
+# Raw engine: cut blocks on record boundaries in the original bytes
+# ---------------------------------------------------------------------------
+
+def next_power_of_2(n: int) -> int:
+    """Smallest power of two >= n (and >= 1)."""
+    return 1 << max(0, n - 1).bit_length()
+
+
+def read_csv_header(input_file: str) -> bytes:
+    """Return the raw header record of a CSV file, including its line ending."""
+    with open(input_file, 'rb') as f:
+        data = b''
+        while True:
+            chunk = f.read(RAW_READ_SIZE)
+            data += chunk
+            end = _first_record_end(data)
+            if end > 0:
+                return data[:end]
+            if not chunk:
+                return data
+
+
+def iter_raw_blocks(input_file: str, target_block_size_bytes: int,
+                    start: Optional[int] = None, start_block: int = 0) -> Iterator[Tuple[bytes, int]]:
+    """
+    Yield ``(data, row_count)`` per block straight from the file's bytes.
+
+    Each block holds whole records (quoted newlines are respected) and is
+    at most ``target_block_size_bytes`` including the repeated header, unless
+    a single record is larger than that. ``data`` excludes the header. After
+    the last data block, header-only padding blocks (``b''``, 0) are yielded
+    up to the next power of two.
+
+    ``start`` and ``start_block`` resume after ``start_block`` blocks already
+    cut, at the input offset where the next one begins; the remaining blocks
+    are the same as those of a full run.
+    """
+    with open(input_file, 'rb') as f:
+        header = read_csv_header(input_file)
+        f.seek(len(header) if start is None else start)
+        budget = max(1, target_block_size_bytes - len(header))
+
+        block_count = start_block
+        for data in _iter_raw_block_data(f, budget):
+            block_count += 1
+            yield data, count_csv_records(data)
+
+    for _ in range(next_power_of_2(block_count) - block_count):
+        yield b'', 0
+
+
+def count_csv_records(data: bytes) -> int:
+    """Count CSV records in ``data``, which must start on a record boundary."""
+    if not data:
+        return 0
+
+    if b'"' not in data:
+        records = data.count(b'\n')
+    else:
+        records = 0
+        in_quotes = False
+        for line in data.split(b'\n')[:-1]:
+            if line.count(b'"') % 2:
+                in_quotes = not in_quotes
+            if not in_quotes:
+                records += 1
+
+    if not data.endswith(b'\n'):
+        records += 1  # final record without a trailing newline
+    return records
+
+
+def iter_cdc_blocks(input_file: str, target_block_size_bytes: int,
+                    start: Optional[int] = None, start_block: int = 0) -> Iterator[Tuple[bytes, int]]:
+    """
+    Yield ``(data, row_count)`` per block, placing boundaries by content.
+
+    Like ``iter_raw_blocks`` blocks hold whole source records after the
+    header, followed by header-only padding. A block may end after any
+    record once it reaches ``CDC_MIN_FRACTION`` of the target. It ends there
+    when the record's CRC-32 falls below a threshold proportional to the
+    record's length, so on average one boundary appears per
+    ``target - min`` bytes past the minimum. Each decision depends only on
+    the record itself. An inserted, deleted or edited row therefore moves
+    boundaries only until the next boundary-marking record, and later
+    blocks hash the same as before. Blocks are cut at ``CDC_MAX_FRACTION``
+    of the target regardless. ``start`` and ``start_block`` resume as in
+    ``iter_raw_blocks``: a boundary depends only on the records after the
+    previous one.
+    """
+    header = read_csv_header(input_file)
+    min_size = max(1, int(target_block_size_bytes * CDC_MIN_FRACTION) - len(header))
+    max_size = max(min_size, int(target_block_size_bytes * CDC_MAX_FRACTION) - len(header))
+    spread = max(1, target_block_size_bytes - len(header) - min_size)
+
+    block_count = start_block
+    records: List[bytes] = []
+    size = 0
+    with open(input_file, 'rb') as f:
+        f.seek(len(header) if start is None else start)
+        for record in _iter_records(f):
+            if records and size + len(record) > max_size:
+                block_count += 1
+                yield b''.join(records), len(records)
+                records, size = [], 0
+
+            records.append(record)
+            size += len(record)
+            if size >= min_size and zlib.crc32(record) * spread < len(record) << 32:
+                block_count += 1
+                yield b''.join(records), len(records)
+                records, size = [], 0
+
+    if records:
+        block_count += 1
+        yield b''.join(records), len(records)
+
+    for _ in range(next_power_of_2(block_count) - block_count):
+        yield b'', 0
+
+
+def _iter_records(f: BinaryIO) -> Iterator[bytes]:
+    """Yield whole CSV records (newline included) from the current position."""
+    carry = b''
+    pending = b''  # lines of a record whose quoted field spans newlines
+    while True:
+        chunk = f.read(RAW_READ_SIZE)
+        if not chunk:
+            break
+        data = carry + chunk
+        lines = data.split(b'\n')
+        carry = lines.pop()
+        # The carried partial line may hold a quote that opens a multi-line field
+        if not pending and b'"' not in data:
+            for line in lines:
+                yield line + b'\n'
+            continue
+        for line in lines:
+            pending += line + b'\n'
+            if pending.count(b'"') % 2 == 0:
+                yield pending
+                pending = b''
+
+    if pending or carry:
+        # Final record without a trailing newline
+        yield pending + carry
+
+
+def iter_byte_blocks(input_file: str, target_block_size_bytes: int, engine: str = 'raw',
+                     start: Optional[int] = None, start_block: int = 0) -> Iterator[Tuple[bytes, int]]:
+    """Blocks of one of the ``BYTE_ENGINES``, as ``(data, row_count)`` pairs."""
+    if engine == 'cdc':
+        return iter_cdc_blocks(input_file, target_block_size_bytes, start, start_block)
+    return iter_raw_blocks(input_file, target_block_size_bytes, start, start_block)
+
+
+def iter_raw_block_data(input_file: str, budget: int, start: int = 0,
+                        complete_only: bool = False) -> Iterator[bytes]:
+    """
+    Consecutive runs of whole records, each at most ``budget`` bytes (a
+    longer record is kept whole), from offset ``start`` to the end of the
+    file. With ``complete_only`` a final record that is not yet terminated,
+    as in a file still being written, is left out.
+    """
+    with open(input_file, 'rb') as f:
+        f.seek(start)
+        source = f
+        if complete_only:
+            data = f.read()
+            source = io.BytesIO(data[:max(0, _last_record_end(data, len(data)))])
+        yield from _iter_raw_block_data(source, budget)
+
+
+def _iter_raw_block_data(f: BinaryIO, budget: int) -> Iterator[bytes]:
+    """Yield consecutive runs of whole records, each at most ``budget`` bytes."""
+    carry = b''
+    while True:
+        need = budget - len(carry)
+        chunk = f.read(need) if need > 0 else b''
+        window = carry + chunk
+        if not window:
+            return
+        if need > 0 and len(chunk) < need:
+            # End of file: whatever is left is the last block
+            yield window
+            return
+
+        cut = _last_record_end(window, budget)
+        if cut <= 0:
+            # A single record is longer than the budget: keep it whole
+            cut = _first_record_end(window)
+        while cut <= 0:
+            more = f.read(RAW_READ_SIZE)
+            if not more:
+                cut = len(window)
+                break
+            window += more
+            cut = _first_record_end(window)
+
+        yield window[:cut]
+        carry = window[cut:]
+
+
+def _first_record_end(data: bytes) -> int:
+    """Offset just past the first record-terminating newline, or -1."""
+    quotes = 0
+    pos = 0
+    while True:
+        newline = data.find(b'\n', pos)
+        if newline == -1:
+            return -1
+        quotes += data.count(b'"', pos, newline)
+        if quotes % 2 == 0:
+            return newline + 1
+        pos = newline + 1
+
+
+def _last_record_end(data: bytes, limit: int) -> int:
+    """Offset just past the last record-terminating newline before ``limit``, or -1."""
+    newline = data.rfind(b'\n', 0, limit)
+    if newline == -1:
+        return -1
+
+    quotes = data.count(b'"', 0, newline)
+    while quotes % 2:
+        # Newline sits inside a quoted field; step back to the previous one
+        previous = data.rfind(b'\n', 0, newline)
+        if previous == -1:
+            return -1
+        quotes -= data.count(b'"', previous, newline)
+        newline = previous
+    return newline + 1
+
+
+# ---------------------------------------------------------------------------
+# Parallel raw engine: scan boundaries once, materialize blocks in a pool
+# ---------------------------------------------------------------------------
+
+def scan_raw_block_ranges(input_file: str, target_block_size_bytes: int,
+                          start: Optional[int] = None) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Return the header and the ``(start, end)`` byte range of every data block
+    (from offset ``start`` on, when given).
+
+    The ranges are exactly the blocks ``iter_raw_blocks`` would cut, so they
+    can be written out of order and still reproduce the sequential result.
+    """
+    header = read_csv_header(input_file)
+    budget = max(1, target_block_size_bytes - len(header))
+    ranges = []
+
+    with open(input_file, 'rb') as f:
+        start = len(header) if start is None else start
+        f.seek(start)
+        for data in _iter_raw_block_data(f, budget):
+            ranges.append((start, start + len(data)))
+            start += len(data)
+
+    return header, ranges
+
+
+def materialize_raw_blocks_parallel(input_file: str,
+                                    target_block_size_bytes: int,
+                                    blocks_dir: str,
+                                    workers: int,
+                                    compression: str = 'none') -> List[Tuple[str, str, int, int, str]]:
+    """
+    Write and hash raw blocks with a process pool.
+
+    Returns ``(block_id, hash, row_count, size_bytes, block_file)`` per data
+    block in block order, identical to the sequential raw engine. Padding
+    blocks are left to the caller (see ``padding_block_digest``).
+    """
+    return [block for block, _ in iter_raw_blocks_parallel(input_file, target_block_size_bytes, blocks_dir,
+                                                           workers, compression)]
+
+
+def iter_raw_blocks_parallel(input_file: str,
+                             target_block_size_bytes: int,
+                             blocks_dir: str,
+                             workers: int,
+                             compression: str = 'none',
+                             start: Optional[int] = None,
+                             start_block: int = 0) -> Iterator[Tuple[Tuple[str, str, int, int, str], int]]:
+    """
+    Like ``materialize_raw_blocks_parallel`` but yield each block in order
+    as soon as it and its predecessors are written, paired with the input
+    offset where the next block starts. ``start`` and ``start_block``
+    resume as in ``iter_raw_blocks``.
+    """
+    header, ranges = scan_raw_block_ranges(input_file, target_block_size_bytes, start)
+
+    tasks = [
+        (input_file, header, begin, end,
+         os.path.join(blocks_dir, f"block_{start_block + index + 1:04d}.csv"), compression)
+        for index, (begin, end) in enumerate(ranges)
+    ]
+    chunksize = max(1, len(tasks) // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_materialize_raw_block, tasks, chunksize=chunksize)
+        for index, (block_hash, row_count, size_bytes, block_file) in enumerate(results, start_block):
+            yield (f"block_{index + 1:04d}", block_hash, row_count, size_bytes, block_file), \
+                ranges[index - start_block][1]
+
+
+def _materialize_raw_block(task: Tuple[str, bytes, int, int, str, str]) -> Tuple[str, int, int, str]:
+    """Pool worker: copy one byte range into its block file and hash it."""
+    input_file, header, start, end, block_file, compression = task
+    with open(input_file, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    block_hash, size_bytes = write_block_bytes(block_file, header, data, compression=compression)
+    return block_hash, count_csv_records(data), size_bytes, block_file
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Block storage backends for the ZK Data Integrity Audit System.
+
+``files`` keeps one CSV per block (``block_NNNN.csv``). ``pack`` appends
+blocks to a few large segment files and locates them through one
+fixed-width index, so a million-block upload is a handful of files:
+
+    pack_00000.seg ...   block bytes, back to back
+    pack.idx             header (magic, version, entry size, entry count),
+                         then one entry per block index: segment, offset,
+                         length, modification time and SHA3-256 digest
+
+Entry i describes ``block_{i+1:04d}``; a zero length means no stored
+block (a virtual padding leaf). Lengths are of the stored (possibly
+compressed) bytes; digests are of the canonical CSV bytes. An edited
+block is appended to the last segment and its entry is repointed; the
+old bytes stay until the upload is rewritten.
+
+open_block_reader picks the backend of an existing blocks directory. Both
+readers list, read and replace blocks by id, decompressing compressed
+blocks (see block_compression.py) as they are read.
+
+Usage:
+    python block_storage.py pack upload_blocks/<id>      # convert block files to a pack
+    python block_storage.py list upload_blocks/<id>
+"""
+
+import io
+import os
+import re
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from block_compression import (
+    READ_CHUNK_SIZE, ZSTD_MAGIC, decompress_bytes, detect_compression, open_block_file, open_decompressed
+)
+from block_splitter import write_block_bytes
+
+STORAGE_BACKENDS = ('files', 'pack')
+
+PACK_INDEX = 'pack.idx'
+SEGMENT_PATTERN = 'pack_*.seg'
+DEFAULT_SEGMENT_BYTES = 1 << 30
+BLOCK_FILE_RE = re.compile(r'block_\d+\.csv')
+
+MAGIC = b'ZKBLKPAK'
+FORMAT_VERSION = 1
+# magic, version, entry size, entry count
+HEADER = struct.Struct('<8sHHI')
+# segment, offset, length, mtime, sha3-256 digest
+ENTRY = struct.Struct('<IQQd32s')
+
+
+def block_index_of(block_id: str) -> int:
+    """0-based leaf index of ``block_NNNN``."""
+    return int(block_id.rsplit('_', 1)[-1]) - 1
+
+
+def block_id_of(block_index: int) -> str:
+    return f"block_{block_index + 1:04d}"
+
+
+def segment_path(blocks_dir, segment: int) -> Path:
+    return Path(blocks_dir) / f"pack_{segment:05d}.seg"
+
+
+def is_pack_dir(blocks_dir) -> bool:
+    return (Path(blocks_dir) / PACK_INDEX).exists()
+
+
+def _write_index(blocks_dir: Path, entries: bytearray, count: int):
+    """Atomically replace the pack index with ``count`` entries."""
+    index_file = blocks_dir / PACK_INDEX
+    tmp_file = index_file.with_name(f".{PACK_INDEX}.tmp")
+    with open(tmp_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, ENTRY.size, count))
+        f.write(memoryview(entries)[:count * ENTRY.size])
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, index_file)
+
+
+def _read_index(blocks_dir: Path) -> Tuple[bytes, int]:
+    data = (blocks_dir / PACK_INDEX).read_bytes()
+    magic, version, entry_size, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{blocks_dir / PACK_INDEX} is not a block pack index")
+    if version != FORMAT_VERSION or entry_size != ENTRY.size:
+        raise ValueError(f"Unsupported block pack version {version} (entry size {entry_size})")
+    return data[HEADER.size:HEADER.size + count * ENTRY.size], count
+
+
+class PackWriter:
+    """
+    Appends blocks to segment files and writes the pack index on close.
+
+    Blocks are written sequentially; a new segment starts once the current
+    one holds ``segment_bytes``. Any earlier pack in ``blocks_dir`` is
+    replaced.
+    """
+
+    def __init__(self, blocks_dir: str, segment_bytes: int = DEFAULT_SEGMENT_BYTES):
+        self.blocks_dir = Path(blocks_dir)
+        self.blocks_dir.mkdir(parents=True, exist_ok=True)
+        for stale in [self.blocks_dir / PACK_INDEX, *self.blocks_dir.glob(SEGMENT_PATTERN)]:
+            stale.unlink(missing_ok=True)
+        self.segment_bytes = segment_bytes
+        self._entries = bytearray()
+        self._count = 0
+        self._segment = -1
+        self._file: Optional[BinaryIO] = None
+        self._next_segment()
+
+    def _next_segment(self):
+        if self._file:
+            os.fsync(self._file.fileno())
+            self._file.close()
+        self._segment += 1
+        self._segment_file = str(segment_path(self.blocks_dir, self._segment))
+        self._file = open(self._segment_file, 'wb', buffering=0)
+
+    def write(self, block_index: int, write_fn: Callable[[BinaryIO], Tuple[str, int]]) -> Dict:
+        """
+        Append one block: ``write_fn`` writes it to the open segment and
+        returns ``(sha3_hash, size_bytes)`` (see block_splitter.write_block_*).
+
+        Returns the block's hash and size, and its location: segment file,
+        offset and stored length.
+        """
+        offset = self._file.tell()
+        if offset >= self.segment_bytes:
+            self._next_segment()
+            offset = 0
+        block_hash, size_bytes = write_fn(self._file)
+        stored_bytes = self._file.tell() - offset
+
+        if block_index >= self._count:
+            self._entries.extend(bytes((block_index + 1 - self._count) * ENTRY.size))
+            self._count = block_index + 1
+        ENTRY.pack_into(self._entries, block_index * ENTRY.size, self._segment, offset, stored_bytes,
+                        time.time(), bytes.fromhex(block_hash))
+        return {'hash': block_hash, 'size_bytes': size_bytes, 'stored_bytes': stored_bytes,
+                'pack_segment': self._segment_file, 'pack_offset': offset}
+
+    def close(self):
+        """Sync the last segment and write the index."""
+        if self._file is None:
+            return
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        _write_index(self.blocks_dir, self._entries, self._count)
+
+    def abort(self):
+        """Stop writing without an index, so the partial pack is never read."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is not None:
+            self.abort()
+        self.close()
+
+
+class PackBlocks:
+    """Reader (and editor) for a pack blocks directory; one open handle per segment."""
+
+    def __init__(self, blocks_dir: str):
+        self.blocks_dir = Path(blocks_dir)
+        self._entries, self.block_count = _read_index(self.blocks_dir)
+        self._handles: Dict[int, int] = {}
+
+    def entry(self, block_index: int) -> Optional[Dict]:
+        """Location, size, time and hash of a stored block, or None."""
+        if not 0 <= block_index < self.block_count:
+            return None
+        segment, offset, length, mtime, digest = ENTRY.unpack_from(self._entries, block_index * ENTRY.size)
+        if not length:
+            return None
+        return {'segment': segment, 'offset': offset, 'length': length, 'modified': mtime, 'hash': digest.hex()}
+
+    def exists(self, block_id: str) -> bool:
+        return self.entry(block_index_of(block_id)) is not None
+
+    def list_blocks(self) -> List[Dict]:
+        """Every stored block, from the index alone (no per-block stat)."""
+        segments = {}
+        blocks = []
+        for block_index, (segment, offset, length, mtime, digest) in enumerate(ENTRY.iter_unpack(self._entries)):
+            if not length:
+                continue
+            if segment not in segments:
+                segments[segment] = str(segment_path(self.blocks_dir, segment))
+            blocks.append({
+                'block_id': block_id_of(block_index),
+                'file_path': f"{segments[segment]}@{offset}",
+                'size_bytes': length,
+                'modified': datetime.fromtimestamp(mtime).isoformat(),
+                'hash': digest.hex(),
+            })
+        return blocks
+
+    def _stored(self, block_id: str) -> '_SegmentRange':
+        entry = self.entry(block_index_of(block_id))
+        if entry is None:
+            raise FileNotFoundError(f"{block_id} is not stored in {self.blocks_dir}")
+        handle = self._handles.get(entry['segment'])
+        if handle is None:
+            handle = os.open(segment_path(self.blocks_dir, entry['segment']), os.O_RDONLY)
+            self._handles[entry['segment']] = handle
+        return _SegmentRange(handle, entry['offset'], entry['length'])
+
+    def open_block(self, block_id: str) -> BinaryIO:
+        """Stream of a block's CSV bytes, decompressed as it is read."""
+        return open_decompressed(io.BufferedReader(self._stored(block_id), READ_CHUNK_SIZE))
+
+    def read_block(self, block_id: str) -> bytes:
+        return decompress_bytes(self._stored(block_id).readall())
+
+    def write_block(self, block_id: str, data: bytes) -> str:
+        """
+        Append a new version of a block to the last segment, compressed like
+        the version it replaces, and repoint its entry; returns its hash.
+        """
+        block_index = block_index_of(block_id)
+        if not 0 <= block_index < self.block_count:
+            raise IndexError(f"{block_id} is outside this pack ({self.block_count} blocks)")
+        compression = detect_compression(self._stored(block_id).read(len(ZSTD_MAGIC)))
+        segment = max(int(p.stem.rsplit('_', 1)[-1]) for p in self.blocks_dir.glob(SEGMENT_PATTERN))
+        with open(segment_path(self.blocks_dir, segment), 'ab', buffering=0) as f:
+            offset = f.tell()
+            block_hash, _ = write_block_bytes(f, data, compression=compression)
+            stored_bytes = f.tell() - offset
+            os.fsync(f.fileno())
+        self.close()
+
+        entries = bytearray(self._entries)
+        ENTRY.pack_into(entries, block_index * ENTRY.size, segment, offset, stored_bytes,
+                        time.time(), bytes.fromhex(block_hash))
+        _write_index(self.blocks_dir, entries, self.block_count)
+        self._entries = bytes(entries)
+        return block_hash
+
+    def close(self):
+        for handle in self._handles.values():
+            os.close(handle)
+        self._handles.clear()
+
+
+class _SegmentRange(io.RawIOBase):
+    """One block's byte range of a segment file, read with pread on a shared handle."""
+
+    def __init__(self, handle: int, offset: int, length: int):
+        super().__init__()
+        self._handle = handle
+        self._position = offset
+        self._end = offset + length
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        size = min(len(b), self._end - self._position)
+        if size <= 0:
+            return 0
+        data = os.pread(self._handle, size, self._position)
+        b[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+
+class FileBlocks:
+    """Reader (and editor) for a directory of ``block_NNNN.csv`` files."""
+
+    def __init__(self, blocks_dir: str):
+        self.blocks_dir = Path(blocks_dir)
+
+    def block_file(self, block_id: str) -> Path:
+        return self.blocks_dir / f"{block_id}.csv"
+
+    def exists(self, block_id: str) -> bool:
+        return self.block_file(block_id).exists()
+
+    def list_blocks(self) -> List[Dict]:
+        blocks = []
+        for block_file in sorted(self.blocks_dir.glob("block_*.csv")):
+            info = block_file.stat()
+            blocks.append({
+                'block_id': block_file.stem,
+                'file_path': str(block_file),
+                'size_bytes': info.st_size,
+                'modified': datetime.fromtimestamp(info.st_mtime).isoformat(),
+            })
+        return blocks
+
+    def open_block(self, block_id: str) -> BinaryIO:
+        """Stream of a block's CSV bytes, decompressed as it is read."""
+        return open_block_file(str(self.block_file(block_id)))
+
+    def read_block(self, block_id: str) -> bytes:
+        with self.open_block(block_id) as stream:
+            return stream.read()
+
+    def write_block(self, block_id: str, data: bytes) -> str:
+        """
+        Replace a block file, compressed like the file it replaces, and
+        return its hash. Write-then-rename also leaves any hard-linked
+        block store object untouched.
+        """
+        block_file = self.block_file(block_id)
+        with open(block_file, 'rb') as f:
+            compression = detect_compression(f.read(len(ZSTD_MAGIC)))
+        tmp_file = block_file.with_name(f".{block_file.name}.tmp")
+        block_hash, _ = write_block_bytes(str(tmp_file), data, compression=compression)
+        os.replace(tmp_file, block_file)
+        return block_hash
+
+    def close(self):
+        pass
+
+
+def open_block_reader(blocks_dir: str):
+    """The reader for whichever backend ``blocks_dir`` was written with."""
+    return PackBlocks(blocks_dir) if is_pack_dir(blocks_dir) else FileBlocks(blocks_dir)
+
+
+def pack_block_files(blocks_dir: str, segment_bytes: int = DEFAULT_SEGMENT_BYTES) -> int:
+    """Convert a directory of block files into a pack; returns the blocks packed."""
+    blocks_dir = Path(blocks_dir)
+    block_files = sorted(p for p in blocks_dir.glob("block_*.csv") if BLOCK_FILE_RE.fullmatch(p.name))
+    with PackWriter(blocks_dir, segment_bytes) as writer:
+        for block_file in block_files:
+            stored = block_file.read_bytes()
+            compression = detect_compression(stored)
+            data = decompress_bytes(stored)
+            writer.write(block_index_of(block_file.stem),
+                         lambda f: write_block_bytes(f, data, compression=compression))
+    for block_file in block_files:
+        block_file.unlink()
+    return len(block_files)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='ZK Audit System - Block storage')
+    parser.add_argument('command', choices=('pack', 'list'))
+    parser.add_argument('blocks_dir', help='Blocks directory of an upload')
+    parser.add_argument('--segment-mb', type=int, default=DEFAULT_SEGMENT_BYTES >> 20,
+                        help=f'Segment file size in MB (default: {DEFAULT_SEGMENT_BYTES >> 20})')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.blocks_dir):
+        print(f"❌ Error: Blocks directory '{args.blocks_dir}' not found")
+        sys.exit(1)
+
+    if args.command == 'pack':
+        count = pack_block_files(args.blocks_dir, args.segment_mb << 20)
+        print(f"📦 Packed {count} blocks into {len(list(Path(args.blocks_dir).glob(SEGMENT_PATTERN)))} segments")
+    else:
+        reader = open_block_reader(args.blocks_dir)
+        for block in reader.list_blocks():
+            print(f"{block['block_id']}  {block['size_bytes']:>10}  {block['file_path']}")
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Content-addressed block store shared across uploads.
+
+Block files are kept once, under ``objects/<aa>/<sha3-256>.csv``, keyed by
+the digest ingestion already computes. An upload's blocks directory holds
+hard links to those objects, so the server's block endpoints and the
+verifiers see the usual ``block_NNNN.csv`` files. A sqlite index records,
+per object, its size and reference count, and per upload, which object
+each block index refers to. It also records which objects are already in
+which S3 bucket, so re-uploads of an identical block are skipped.
+
+An object keeps the codec it was first stored with: a block reused from it
+takes the object's codec and stored size in its metadata, whatever
+compression the upload asked for.
+
+Objects are read-only. Editing a block through an upload's directory must
+replace the link (see ``detach``), never write through it.
+
+Usage:
+    python block_store.py block_store stats [upload_id]
+    python block_store.py block_store which <block_hash>
+    python block_store.py block_store release <upload_id>
+    python block_store.py block_store gc
+"""
+
+import os
+import shutil
+import sqlite3
+import stat
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from block_compression import ZSTD_MAGIC, detect_compression
+
+INDEX_FILE = 'index.sqlite'
+OBJECT_MODE = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY, size_bytes INTEGER NOT NULL, refcount INTEGER NOT NULL, created TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (
+    upload_id TEXT NOT NULL, block_index INTEGER NOT NULL, block_id TEXT NOT NULL, hash TEXT NOT NULL,
+    PRIMARY KEY (upload_id, block_index)
+);
+CREATE INDEX IF NOT EXISTS refs_by_hash ON refs (hash);
+CREATE TABLE IF NOT EXISTS remote (
+    hash TEXT NOT NULL, bucket TEXT NOT NULL, s3_key TEXT NOT NULL, PRIMARY KEY (hash, bucket)
+);
+CREATE TABLE IF NOT EXISTS upload_stats (
+    upload_id TEXT PRIMARY KEY, blocks INTEGER, new_blocks INTEGER, reused_blocks INTEGER,
+    bytes_stored INTEGER, bytes_saved INTEGER, uploaded_bytes INTEGER, upload_bytes_skipped INTEGER,
+    upload_seconds REAL, upload_seconds_saved REAL, timestamp TEXT
+);
+"""
+
+
+def content_key(block_hash: str) -> str:
+    """S3 key of a block object shared by every upload that contains it."""
+    return f"blocks/sha3/{block_hash[:2]}/{block_hash}.csv"
+
+
+def set_block_storage(block: Dict, storage: Dict):
+    """Record a block's stored codec and size in its metadata (plain CSV blocks record neither)."""
+    block.pop('compression', None)
+    block.pop('stored_bytes', None)
+    if storage['compression'] != 'none':
+        block.update(storage)
+
+
+def _link_or_copy(source: Path, target: Path):
+    """Hard-link ``source`` to ``target``, copying when they are on different filesystems."""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+class BlockStore:
+    """A directory of content-addressed block objects with a sqlite reference index."""
+
+    def __init__(self, root_dir: str):
+        self.root = Path(root_dir)
+        (self.root / 'objects').mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.root / INDEX_FILE), check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def object_path(self, block_hash: str) -> Path:
+        return self.root / 'objects' / block_hash[:2] / f"{block_hash}.csv"
+
+    def contains(self, block_hash: str) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM objects WHERE hash = ?", (block_hash,)).fetchone() is not None
+
+    def object_storage(self, block_hash: str) -> Dict:
+        """Codec and on-disk size of a stored object."""
+        object_path = self.object_path(block_hash)
+        with open(object_path, 'rb') as f:
+            compression = detect_compression(f.read(len(ZSTD_MAGIC)))
+        return {'compression': compression, 'stored_bytes': object_path.stat().st_size}
+
+    def link_existing(self, block_hash: str, block_file: str) -> Optional[Dict]:
+        """
+        Link ``block_file`` to the stored object with this hash, so a block the
+        store already holds is not written again. Returns the object's codec
+        and size (see ``object_storage``), or None when it is not stored.
+        """
+        if not self.contains(block_hash):
+            return None
+        block_file = Path(block_file)
+        block_file.unlink(missing_ok=True)
+        _link_or_copy(self.object_path(block_hash), block_file)
+        return self.object_storage(block_hash)
+
+    def add_upload_blocks(self, upload_id: str, block_metadata: List[Dict]) -> Dict:
+        """
+        Move an upload's block files into the store, or drop them in favour
+        of the identical object already there, and link them back in place.
+        Blocks already linked to their object (``link_existing``) are kept.
+        A reused block's metadata takes the object's codec and stored size.
+
+        Returns the upload's block, new/reused and byte counts.
+        """
+        stats = {'upload_id': upload_id, 'blocks': 0, 'new_blocks': 0, 'reused_blocks': 0,
+                 'bytes_stored': 0, 'bytes_saved': 0}
+        now = datetime.now().isoformat()
+
+        with self._lock, self._db:
+            for block_index, block in enumerate(block_metadata):
+                if block.get('is_padding', False) or 'local_path' not in block:
+                    continue
+                block_hash, local_path = block['hash'], Path(block['local_path'])
+                object_path = self.object_path(block_hash)
+                stats['blocks'] += 1
+
+                # Disk accounting uses the stored (possibly compressed) size
+                stored = self._db.execute("SELECT size_bytes FROM objects WHERE hash = ?", (block_hash,)).fetchone()
+                if stored:
+                    if not os.path.samefile(local_path, object_path):
+                        local_path.unlink()
+                        _link_or_copy(object_path, local_path)
+                    set_block_storage(block, self.object_storage(block_hash))
+                    stats['reused_blocks'] += 1
+                    stats['bytes_saved'] += stored[0]
+                else:
+                    stored_bytes = block.get('stored_bytes', block['size_bytes'])
+                    object_path.parent.mkdir(exist_ok=True)
+                    shutil.move(str(local_path), str(object_path))
+                    os.chmod(object_path, OBJECT_MODE)
+                    self._db.execute("INSERT INTO objects VALUES (?, ?, 0, ?)",
+                                     (block_hash, stored_bytes, now))
+                    stats['new_blocks'] += 1
+                    stats['bytes_stored'] += stored_bytes
+                    _link_or_copy(object_path, local_path)
+                self._set_ref(upload_id, block_index, block['block_id'], block_hash)
+
+        return stats
+
+    def _set_ref(self, upload_id: str, block_index: int, block_id: str, block_hash: str):
+        """Point one block of an upload at an object, moving the reference counts."""
+        previous = self._db.execute("SELECT hash FROM refs WHERE upload_id = ? AND block_index = ?",
+                                    (upload_id, block_index)).fetchone()
+        if previous and previous[0] == block_hash:
+            return
+        if previous:
+            self._db.execute("UPDATE objects SET refcount = refcount - 1 WHERE hash = ?", previous)
+        self._db.execute("INSERT OR REPLACE INTO refs VALUES (?, ?, ?, ?)",
+                         (upload_id, block_index, block_id, block_hash))
+        self._db.execute("UPDATE objects SET refcount = refcount + 1 WHERE hash = ?", (block_hash,))
+
+    @staticmethod
+    def detach(block_file: str):
+        """
+        Replace a linked block file with a private writable copy, so it can be
+        edited without changing the shared object.
+        """
+        block_file = Path(block_file)
+        if block_file.stat().st_nlink < 2:
+            return
+        tmp_file = block_file.with_name(f".{block_file.name}.detach")
+        shutil.copyfile(block_file, tmp_file)
+        os.replace(tmp_file, block_file)
+
+    @staticmethod
+    def unlink_blocks(blocks_dir: str):
+        """Remove linked block files from ``blocks_dir`` before blocks are written there again."""
+        blocks_dir = Path(blocks_dir)
+        if not blocks_dir.is_dir():
+            return
+        for block_file in blocks_dir.glob('block_*.csv'):
+            if block_file.stat().st_nlink > 1:
+                block_file.unlink()
+
+    def uploads_containing(self, block_hash: str) -> List[Dict]:
+        """Every (upload, block) that refers to the object with this hash."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT upload_id, block_index, block_id FROM refs WHERE hash = ? ORDER BY upload_id, block_index",
+                (block_hash,)
+            ).fetchall()
+        return [{'upload_id': u, 'block_index': i, 'block_id': b} for u, i, b in rows]
+
+    def remote_key(self, block_hash: str, bucket: str) -> Optional[str]:
+        """S3 key the object was already uploaded to in ``bucket``, if any."""
+        with self._lock:
+            row = self._db.execute("SELECT s3_key FROM remote WHERE hash = ? AND bucket = ?",
+                                   (block_hash, bucket)).fetchone()
+        return row[0] if row else None
+
+    def mark_uploaded(self, block_hash: str, bucket: str, s3_key: str):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO remote VALUES (?, ?, ?)", (block_hash, bucket, s3_key))
+
+    def record_upload_stats(self, stats: Dict):
+        """Store an upload's deduplication report (see ``upload_stats``)."""
+        columns = ('upload_id', 'blocks', 'new_blocks', 'reused_blocks', 'bytes_stored', 'bytes_saved',
+                   'uploaded_bytes', 'upload_bytes_skipped', 'upload_seconds', 'upload_seconds_saved')
+        with self._lock, self._db:
+            self._db.execute(f"INSERT OR REPLACE INTO upload_stats VALUES ({', '.join('?' * (len(columns) + 1))})",
+                             [stats.get(column) for column in columns] + [datetime.now().isoformat()])
+
+    def upload_throughput(self, uploaded_bytes: int = 0, upload_seconds: float = 0.0) -> Optional[float]:
+        """
+        Bytes per second over every recorded block upload plus the given
+        one, if any were timed. A single small upload is dominated by
+        request latency, so the history gives the steadier estimate.
+        """
+        with self._lock:
+            past_bytes, past_seconds = self._db.execute(
+                "SELECT COALESCE(SUM(uploaded_bytes), 0), COALESCE(SUM(upload_seconds), 0) "
+                "FROM upload_stats WHERE uploaded_bytes > 0"
+            ).fetchone()
+        uploaded_bytes += past_bytes
+        upload_seconds += past_seconds
+        return uploaded_bytes / upload_seconds if uploaded_bytes and upload_seconds else None
+
+    def upload_stats(self, upload_id: Optional[str] = None) -> List[Dict]:
+        """Deduplication reports, for one upload or all of them."""
+        query = "SELECT * FROM upload_stats"
+        params = ()
+        if upload_id:
+            query += " WHERE upload_id = ?"
+            params = (upload_id,)
+        with self._lock:
+            cursor = self._db.execute(query + " ORDER BY timestamp", params)
+            names = [column[0] for column in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def release_upload(self, upload_id: str) -> int:
+        """Drop an upload's references; returns how many were released."""
+        with self._lock, self._db:
+            hashes = self._db.execute("SELECT hash FROM refs WHERE upload_id = ?", (upload_id,)).fetchall()
+            self._db.executemany("UPDATE objects SET refcount = refcount - 1 WHERE hash = ?", hashes)
+            self._db.execute("DELETE FROM refs WHERE upload_id = ?", (upload_id,))
+        return len(hashes)
+
+    def collect_garbage(self) -> Dict:
+        """Delete objects no upload refers to any more; returns the count and bytes freed."""
+        with self._lock, self._db:
+            unreferenced = self._db.execute("SELECT hash, size_bytes FROM objects WHERE refcount <= 0").fetchall()
+            for block_hash, _ in unreferenced:
+                object_path = self.object_path(block_hash)
+                if object_path.exists():
+                    object_path.unlink()
+            self._db.executemany("DELETE FROM objects WHERE hash = ?", [(h,) for h, _ in unreferenced])
+        return {'objects': len(unreferenced), 'bytes_freed': sum(size for _, size in unreferenced)}
+
+    def summary(self) -> Dict:
+        with self._lock:
+            objects, stored, live = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), COALESCE(SUM(refcount > 0), 0) FROM objects"
+            ).fetchone()
+            refs, referenced = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(o.size_bytes), 0) FROM refs r JOIN objects o ON o.hash = r.hash"
+            ).fetchone()
+        return {'objects': objects, 'live_objects': live, 'references': refs,
+                'bytes_stored': stored, 'bytes_referenced': referenced}
+
+
+def format_upload_stats(stats: Dict) -> List[str]:
+    """Summary lines for one upload's deduplication report."""
+    lines = [f"♻️  Block store: {stats['new_blocks']} new, {stats['reused_blocks']} reused of {stats['blocks']} blocks",
+             f"💽 Storage saved: {stats['bytes_saved'] / (1024 * 1024):.2f} MB "
+             f"({stats['bytes_stored'] / (1024 * 1024):.2f} MB stored)"]
+    if stats.get('upload_bytes_skipped') is not None:
+        saved = stats.get('upload_seconds_saved')
+        lines.append(f"⏱️  Upload skipped: {stats['upload_bytes_skipped'] / (1024 * 1024):.2f} MB"
+                     + (f", ~{saved:.1f}s saved" if saved is not None else ""))
+    return lines
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='ZK Audit System - Content-addressed block store')
+    parser.add_argument('store_dir', help='Block store directory')
+    commands = parser.add_subparsers(dest='command', required=True)
+    stats_parser = commands.add_parser('stats', help='Store totals and per-upload deduplication reports')
+    stats_parser.add_argument('upload_id', nargs='?')
+    which_parser = commands.add_parser('which', help='Uploads that contain a block')
+    which_parser.add_argument('block_hash')
+    release_parser = commands.add_parser('release', help="Drop an upload's block references")
+    release_parser.add_argument('upload_id')
+    commands.add_parser('gc', help='Delete objects no upload refers to')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.store_dir):
+        print(f"❌ Error: Block store '{args.store_dir}' not found")
+        sys.exit(1)
+    store = BlockStore(args.store_dir)
+
+    if args.command == 'stats':
+        totals = store.summary()
+        print(f"📦 {totals['objects']} objects ({totals['bytes_stored'] / (1024 * 1024):.2f} MB) "
+              f"behind {totals['references']} block references "
+              f"({totals['bytes_referenced'] / (1024 * 1024):.2f} MB)")
+        for stats in store.upload_stats(args.upload_id):
+            print(f"\n🆔 {stats['upload_id']}")
+            for line in format_upload_stats(stats):
+                print(f"   {line}")
+    elif args.command == 'which':
+        for ref in store.uploads_containing(args.block_hash):
+            print(f"{ref['upload_id']}  {ref['block_id']}")
+    elif args.command == 'release':
+        print(f"🔓 Released {store.release_upload(args.upload_id)} block references")
+    elif args.command == 'gc':
+        freed = store.collect_garbage()
+        print(f"🧹 Deleted {freed['objects']} objects, {freed['bytes_freed'] / (1024 * 1024):.2f} MB freed")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
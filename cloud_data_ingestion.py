@@ -9,6 +9,7 @@ import pandas as pd
 import hashlib
 import json
 import math
+import time
 import uuid
 from datetime import datetime
 from tqdm import tqdm
@@ -17,72 +18,44 @@ import tempfile
 import shutil
 from pathlib import Path
 
+from compact_merkle import PATH_MODES, CompactMerkleTree
+from binary_commitment import write_binary_commitment
+from block_columnar import COLUMNAR_FORMATS, build_sidecars, check_columnar
+from block_compression import COMPRESSIONS, check_compression
+from block_store import BlockStore, content_key, format_upload_stats
+from block_storage import STORAGE_BACKENDS, PackWriter
+from dynamodb_writer import DEFAULT_WRITE_CONCURRENCY, batch_write_items, to_dynamodb_item
+from ingestion_journal import IngestionJournal, checkpoint_params
+from pipelined_ingestion import PipelinedIngestion
+from s3_transfer import (
+    DEFAULT_MULTIPART_THRESHOLD, DEFAULT_UPLOAD_CONCURRENCY, BlockUpload, upload_blocks_concurrently,
+    with_retries
+)
+from block_splitter import (
+    BYTE_ENGINES, DEFAULT_STREAM_CHUNK_ROWS, ENGINES, frame_header_bytes, iter_block_frames,
+    iter_block_frames_streaming, iter_byte_blocks, iter_raw_blocks_parallel, next_power_of_2,
+    padding_block_digest, plan_block_count, read_csv_header, scan_csv_schema, write_block_bytes, write_block_frame
+)
+
 # Optional boto3 import for cloud functionality
 try:
     import boto3
+    from botocore.config import Config
     BOTO3_AVAILABLE = True
 except ImportError:
     BOTO3_AVAILABLE = False
     print("⚠️  Warning: boto3 not installed. Cloud features will be disabled.")
 
-class CloudMerkleTree:
-    """Merkle Tree implementation optimized for cloud storage."""
-    
-    def __init__(self, leaves: List[str]):
-        self.leaves = leaves
-        self.tree = self._build_tree(leaves)
-        self.root = self.tree[0][0] if self.tree and len(self.tree[0]) > 0 else None
-        self.leaf_count = len(leaves)
-    
-    def _build_tree(self, leaves: List[str]) -> List[List[str]]:
-        """Build the Merkle tree from leaf nodes."""
-        if not leaves:
-            return []
-        
-        tree = [leaves]  # Level 0: leaves
-        current_level = leaves
-        
-        while len(current_level) > 1:
-            next_level = []
-            for i in range(0, len(current_level), 2):
-                left = current_level[i]
-                right = current_level[i + 1]
-                parent_hash = self._compute_sha3_hash(left + right)
-                next_level.append(parent_hash)
-            
-            tree.insert(0, next_level)
-            current_level = next_level
-        
-        return tree
-    
-    def _compute_sha3_hash(self, data: str) -> str:
-        """Compute SHA-3 hash of input data."""
-        hasher = hashlib.sha3_256()
-        hasher.update(data.encode('utf-8'))
-        return hasher.hexdigest()
+# HTTP connections kept by the S3 client; caps useful upload concurrency
+S3_MAX_POOL_CONNECTIONS = 64
+
+class CloudMerkleTree(CompactMerkleTree):
+    """
+    Merkle Tree implementation optimized for cloud storage.
     
-    def get_authentication_path(self, leaf_index: int) -> List[str]:
-        """Get authentication path for given leaf index."""
-        if leaf_index >= self.leaf_count or not self.tree:
-            return []
-        
-        auth_path = []
-        current_index = leaf_index
-        
-        for level in range(len(self.tree) - 1, 0, -1):
-            current_level_nodes = self.tree[level]
-            
-            if current_index % 2 == 0:
-                sibling_index = current_index + 1
-            else:
-                sibling_index = current_index - 1
-            
-            if sibling_index < len(current_level_nodes):
-                auth_path.append(current_level_nodes[sibling_index])
-            
-            current_index = current_index // 2
-        
-        return auth_path
+    Levels are packed 32-byte digest buffers (see compact_merkle.py);
+    ``root`` and authentication paths are exposed as hex strings.
+    """
 
 class CloudDataIngestionPipeline:
     """Main pipeline for ingesting data into cloud-based ZK audit system."""
@@ -101,7 +74,9 @@ class CloudDataIngestionPipeline:
         # Initialize AWS clients
         try:
             if BOTO3_AVAILABLE:
-                self.s3_client = boto3.client('s3', region_name=aws_region)
+                # Room for the concurrent upload stage's requests in flight
+                self.s3_client = boto3.client('s3', region_name=aws_region,
+                                              config=Config(max_pool_connections=S3_MAX_POOL_CONNECTIONS))
                 self.dynamodb = boto3.resource('dynamodb', region_name=aws_region)
                 self.table = self.dynamodb.Table(self.dynamodb_table)
             else:
@@ -112,6 +87,22 @@ class CloudDataIngestionPipeline:
             self.s3_client = None
             self.dynamodb = None
             self.table = None
+        
+        self.block_store = None
+    
+    def use_local_aws(self, root_dir: str):
+        """Swap the AWS clients for filesystem-backed stand-ins under ``root_dir`` (see local_aws.py)."""
+        from local_aws import LocalDynamoTable, LocalS3Client
+        
+        self.s3_client = LocalS3Client(os.path.join(root_dir, 's3'))
+        self.table = LocalDynamoTable(self.dynamodb_table,
+                                      os.path.join(root_dir, 'dynamodb', f"{self.dynamodb_table}.sqlite"))
+        print(f"🧪 Using local AWS stand-ins in {root_dir}")
+    
+    def use_block_store(self, root_dir: str):
+        """Keep blocks once in the content-addressed store under ``root_dir`` (see block_store.py)."""
+        self.block_store = BlockStore(root_dir)
+        print(f"♻️  Using block store in {root_dir}")
     
     def compute_block_hash(self, data: bytes) -> str:
         """Compute SHA3-256 hash of block data."""
@@ -123,8 +114,68 @@ class CloudDataIngestionPipeline:
                          input_file: str, 
                          target_block_size_mb: float = 2.0,
                          blocks_dir: Optional[str] = None,
-                         upload_id: Optional[str] = None) -> Tuple[List[Dict], int, str]:
-        """Split CSV file into blocks and prepare for cloud upload."""
+                         upload_id: Optional[str] = None,
+                         streaming: bool = False,
+                         stream_chunk_rows: int = DEFAULT_STREAM_CHUNK_ROWS,
+                         engine: str = 'pandas',
+                         workers: int = 1,
+                         storage: str = 'files',
+                         compression: str = 'none',
+                         journal: Optional[IngestionJournal] = None,
+                         compact_dtypes: bool = False,
+                         dtypes: Optional[Dict[str, str]] = None) -> Tuple[List[Dict], int, str]:
+        """
+        Split CSV file into blocks and prepare for cloud upload.
+        
+        With ``streaming`` the CSV is read in chunks of ``stream_chunk_rows``
+        rows instead of being loaded whole; block files are byte-identical.
+        With ``compact_dtypes`` the pandas engine first scans the CSV for a
+        schema that holds the rows in less memory (narrow integers,
+        categoricals, pyarrow strings; see block_splitter.scan_csv_schema)
+        and writes the same bytes. ``dtypes`` maps columns to pandas dtypes
+        forced on top of the inferred ones.
+        
+        ``engine='raw'`` cuts blocks on record boundaries in the original
+        bytes instead of parsing and re-serializing with pandas. Blocks then
+        hold the source bytes verbatim, so hashes differ from the pandas engine.
+        ``engine='cdc'`` also copies source bytes but places boundaries by
+        content (see block_splitter.iter_cdc_blocks), so re-ingesting a
+        locally edited file reproduces most earlier block hashes.
+        With ``workers > 1`` the raw engine writes and hashes blocks in a
+        process pool; the output is identical to the sequential raw engine.
+        
+        Padding blocks (header-only blocks rounding the count up to a power
+        of two) are virtual: they are committed with the header-only hash and
+        marked ``is_padding``, but never written, uploaded or stored.
+        
+        ``storage='pack'`` appends the blocks to segment files in the blocks
+        directory instead of one file each (see block_storage.py); block
+        entries then carry ``pack_segment`` and ``pack_offset`` instead of
+        ``local_path``.
+        
+        ``compression`` ('gzip' or 'zstd') stores each block compressed (see
+        block_compression.py). Hashes, sizes and row counts still describe
+        the uncompressed CSV, so the Merkle root is unchanged; compressed
+        blocks also record ``compression`` and ``stored_bytes``.
+        
+        With a ``journal`` (see ingestion_journal.py) every completed block is
+        checkpointed, and the journaled blocks still intact on disk are reused
+        instead of written again. Byte engines resume reading at the end of
+        the last reused block; the pandas engine cuts the same frames again
+        but only writes the blocks after it.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown block engine '{engine}' (expected one of {ENGINES})")
+        if workers > 1 and engine != 'raw':
+            raise ValueError("Parallel block creation requires the raw engine")
+        if storage not in STORAGE_BACKENDS:
+            raise ValueError(f"Unknown block storage '{storage}' (expected one of {STORAGE_BACKENDS})")
+        if storage == 'pack' and workers > 1:
+            raise ValueError("Parallel block creation writes block files; use storage='files'")
+        if storage == 'pack' and journal is not None:
+            raise ValueError("Checkpointed ingestion writes block files; use storage='files'")
+        check_compression(compression)
+        
         print(f"📁 Processing file: {input_file}")
         
         # Get file info
@@ -133,8 +184,7 @@ class CloudDataIngestionPipeline:
         print(f"📊 File size: {file_size_mb:.2f} MB")
         
         # Calculate optimal block count (power of 2)
-        estimated_blocks = math.ceil(file_size_mb / target_block_size_mb)
-        power_of_2_blocks = 2 ** math.ceil(math.log2(estimated_blocks))
+        estimated_blocks, power_of_2_blocks = plan_block_count(file_size, target_block_size_mb)
         target_block_size_bytes = int(target_block_size_mb * 1024 * 1024)
         
         print(f"🧮 Estimated blocks needed: {estimated_blocks}")
@@ -148,70 +198,231 @@ class CloudDataIngestionPipeline:
         else:
             temp_dir = tempfile.mkdtemp(prefix='zk_audit_blocks_')
         upload_id = upload_id or str(uuid.uuid4())
+        pack = PackWriter(temp_dir) if storage == 'pack' else None
+        resumed, resume_offset = journal.resume_point() if journal else ([], None)
+        if resumed:
+            print(f"⏯️  Resuming after {len(resumed)} checkpointed blocks")
         
         try:
+            if engine == 'raw' and workers > 1:
+                print(f"⚙️  Materializing blocks with {workers} worker processes")
+                block_metadata = list(resumed)
+                for (block_id, block_hash, row_count, size_bytes, block_file), offset_end in iter_raw_blocks_parallel(
+                        input_file, target_block_size_bytes, temp_dir, workers, compression,
+                        start=resume_offset, start_block=len(resumed)):
+                    metadata = self._block_metadata(block_id, block_hash, row_count, size_bytes, upload_id,
+                                                    block_file, self._stored_file(block_file, compression))
+                    if journal:
+                        journal.record_block(len(block_metadata), metadata, offset_end)
+                    block_metadata.append(metadata)
+                padding_hash, padding_size = padding_block_digest(read_csv_header(input_file))
+                for block_index in range(len(block_metadata), next_power_of_2(len(block_metadata))):
+                    block_metadata.append(self._padding_metadata(
+                        f"block_{block_index + 1:04d}", padding_hash, padding_size, upload_id
+                    ))
+                print(f"🔢 Raw engine produced {len(block_metadata)} blocks")
+                return block_metadata, len(block_metadata), upload_id
+            
+            if engine in BYTE_ENGINES:
+                block_metadata = self._split_raw(input_file, target_block_size_bytes, temp_dir, upload_id, engine,
+                                                 pack, compression, journal, resumed, resume_offset)
+                print(f"🔢 {'CDC' if engine == 'cdc' else 'Raw'} engine produced {len(block_metadata)} blocks")
+                return block_metadata, len(block_metadata), upload_id
+            
             # Read and process CSV data
-            df = pd.read_csv(input_file)
-            total_rows = len(df)
-            print(f"📋 Total rows to process: {total_rows:,}")
+            read_dtypes = dict(dtypes or {})
+            if streaming or compact_dtypes:
+                columns, scanned_dtypes, total_rows = scan_csv_schema(input_file, stream_chunk_rows, compact_dtypes)
+                read_dtypes = {**scanned_dtypes, **read_dtypes}
+            if streaming:
+                print(f"📋 Total rows to process: {total_rows:,}")
+                print(f"🌊 Streaming in chunks of {stream_chunk_rows:,} rows")
+                block_frames = iter_block_frames_streaming(
+                    input_file, power_of_2_blocks, target_block_size_bytes,
+                    columns, read_dtypes, stream_chunk_rows
+                )
+            else:
+                df = pd.read_csv(input_file, dtype=read_dtypes or None)
+                total_rows = len(df)
+                print(f"📋 Total rows to process: {total_rows:,}")
+                if compact_dtypes:
+                    print(f"🗜️  Compact dtypes: {df.memory_usage(deep=True).sum() / 2**20:.1f} MB in memory")
+                block_frames = iter_block_frames(df, power_of_2_blocks, target_block_size_bytes)
             
             block_metadata = []
-            current_row = 0
+            padding = None
             
             # Generate blocks
-            for block_index in tqdm(range(power_of_2_blocks), desc="Creating blocks"):
+            for block_index, block_data in enumerate(tqdm(block_frames, total=power_of_2_blocks,
+                                                          desc="Creating blocks")):
                 block_id = f"block_{block_index + 1:04d}"
-                block_file = os.path.join(temp_dir, f"{block_id}.csv")
                 
-                if current_row >= total_rows:
-                    # Create empty block
-                    block_data = pd.DataFrame(columns=df.columns)
-                else:
-                    # Estimate rows for target size
-                    sample_size = min(1000, total_rows - current_row)
-                    if sample_size > 0:
-                        sample_data = df.iloc[current_row:current_row + sample_size]
-                        sample_csv = sample_data.to_csv(index=False)
-                        bytes_per_row = len(sample_csv.encode('utf-8')) / sample_size
-                        target_rows = max(1, int(target_block_size_bytes / bytes_per_row))
-                    else:
-                        target_rows = 1
-                    
-                    end_row = min(current_row + target_rows, total_rows)
-                    block_data = df.iloc[current_row:end_row]
-                    current_row = end_row
+                if block_index < len(resumed):
+                    # Checkpointed and intact: the frame is only cut to reach the next one
+                    block_metadata.append(resumed[block_index])
+                    continue
                 
-                # Save block locally
-                block_data.to_csv(block_file, index=False)
+                if len(block_data) == 0:
+                    # Rows are exhausted: the rest is virtual padding
+                    if padding is None:
+                        padding = padding_block_digest(frame_header_bytes(block_data.columns))
+                    block_metadata.append(self._padding_metadata(block_id, *padding, upload_id))
+                    continue
                 
-                # Calculate block hash and metadata
-                with open(block_file, 'rb') as f:
-                    block_content = f.read()
-                    block_hash = self.compute_block_hash(block_content)
-                
-                metadata = {
-                    "block_id": block_id,
-                    "hash": block_hash,
-                    "row_count": len(block_data),
-                    "size_bytes": len(block_content),
-                    "size_mb": len(block_content) / (1024 * 1024),
-                    "is_empty": len(block_data) == 0,
-                    "timestamp": datetime.now().isoformat(),
-                    "upload_id": upload_id,
-                    "user_id": self.user_id,
-                    "local_path": block_file
-                }
+                # Save block locally, hashing it as it is written
+                block_hash, size_bytes, block_file, location = self._store_block(
+                    pack, temp_dir, block_index, lambda f: write_block_frame(block_data, f, compression), compression
+                )
                 
+                metadata = self._block_metadata(
+                    block_id, block_hash, len(block_data), size_bytes, upload_id, block_file, location
+                )
+                if journal:
+                    journal.record_block(block_index, metadata)
                 block_metadata.append(metadata)
             
             return block_metadata, power_of_2_blocks, upload_id
         
+        except BaseException:
+            if pack is not None:
+                pack.abort()
+            raise
+        
         finally:
             # Note: temp_dir cleanup handled by caller
-            pass
+            if pack is not None:
+                pack.close()
+    
+    def _split_raw(self, input_file: str, target_block_size_bytes: int,
+                   blocks_dir: str, upload_id: str, engine: str = 'raw',
+                   pack: Optional[PackWriter] = None, compression: str = 'none',
+                   journal: Optional[IngestionJournal] = None, resumed: Optional[List[Dict]] = None,
+                   resume_offset: Optional[int] = None) -> List[Dict]:
+        """
+        Write blocks cut from the source bytes, hashing exactly what is written.
+        
+        ``resumed`` blocks are kept as they are and cutting restarts at
+        ``resume_offset``, the input offset where the first missing block begins.
+        With a block store, a block it already holds is linked instead of written.
+        """
+        header = read_csv_header(input_file)
+        padding_hash, padding_size = padding_block_digest(header)
+        block_metadata = list(resumed or [])
+        offset = len(header) if resume_offset is None else resume_offset
+        
+        blocks = iter_byte_blocks(input_file, target_block_size_bytes, engine, resume_offset, len(block_metadata))
+        for block_index, (data, row_count) in enumerate(tqdm(blocks, desc="Creating blocks"), len(block_metadata)):
+            block_id = f"block_{block_index + 1:04d}"
+            if not data:
+                block_metadata.append(self._padding_metadata(block_id, padding_hash, padding_size, upload_id))
+                continue
+            
+            block_hash, size_bytes, block_file, location = self._link_stored_block(
+                blocks_dir, block_index, header, data
+            ) if self.block_store else (None, 0, None, None)
+            if block_hash is None:
+                block_hash, size_bytes, block_file, location = self._store_block(
+                    pack, blocks_dir, block_index, lambda f: write_block_bytes(f, header, data, compression=compression),
+                    compression
+                )
+            offset += len(data)
+            
+            metadata = self._block_metadata(
+                block_id, block_hash, row_count, size_bytes, upload_id, block_file, location
+            )
+            if journal:
+                journal.record_block(block_index, metadata, offset)
+            block_metadata.append(metadata)
+        
+        return block_metadata
     
-    def create_merkle_commitment(self, block_metadata: List[Dict], target_block_size_mb: float = 2.0) -> Dict:
-        """Create Merkle tree commitment from block metadata."""
+    def _link_stored_block(self, blocks_dir: str, block_index: int, header: bytes,
+                           data: bytes) -> Tuple[Optional[str], int, Optional[str], Optional[Dict]]:
+        """
+        Link one block to the block store's copy instead of writing it, when
+        the store holds its hash; returns what ``_store_block`` would, or a
+        None hash when the block still has to be written.
+        """
+        hasher = hashlib.sha3_256(header)
+        hasher.update(data)
+        block_hash = hasher.hexdigest()
+        block_file = os.path.join(blocks_dir, f"block_{block_index + 1:04d}.csv")
+        storage = self.block_store.link_existing(block_hash, block_file)
+        if storage is None:
+            return None, 0, None, None
+        location = storage if storage['compression'] != 'none' else None
+        return block_hash, len(header) + len(data), block_file, location
+    
+    @staticmethod
+    def _store_block(pack: Optional[PackWriter], blocks_dir: str, block_index: int,
+                     write_fn, compression: str = 'none') -> Tuple[str, int, Optional[str], Optional[Dict]]:
+        """
+        Write one block with ``write_fn`` (a block_splitter writer bound to its
+        data) to its own file, or append it to the pack.
+        
+        Returns the hash, size, block file and storage details: the pack
+        location and, for a compressed block, its codec and stored size.
+        """
+        if pack is not None:
+            location = pack.write(block_index, write_fn)
+            stored = {'pack_segment': location['pack_segment'], 'pack_offset': location['pack_offset']}
+            if compression != 'none':
+                stored.update(compression=compression, stored_bytes=location['stored_bytes'])
+            return location['hash'], location['size_bytes'], None, stored
+        block_file = os.path.join(blocks_dir, f"block_{block_index + 1:04d}.csv")
+        block_hash, size_bytes = write_fn(block_file)
+        return block_hash, size_bytes, block_file, CloudDataIngestionPipeline._stored_file(block_file, compression)
+    
+    @staticmethod
+    def _stored_file(block_file: str, compression: str) -> Optional[Dict]:
+        """Codec and on-disk size of a compressed block file (None when stored as plain CSV)."""
+        if compression == 'none':
+            return None
+        return {'compression': compression, 'stored_bytes': os.path.getsize(block_file)}
+    
+    def _block_metadata(self, block_id: str, block_hash: str, row_count: int,
+                        size_bytes: int, upload_id: str, block_file: Optional[str],
+                        location: Optional[Dict] = None) -> Dict:
+        """Build the metadata record stored for each block."""
+        if location:
+            # Packed block: its segment file and offset replace a file of its own
+            metadata = self._block_metadata(block_id, block_hash, row_count, size_bytes, upload_id, block_file)
+            if 'pack_segment' in location:
+                del metadata['local_path']
+            metadata.update(location)
+            return metadata
+        return {
+            "block_id": block_id,
+            "hash": block_hash,
+            "row_count": row_count,
+            "size_bytes": size_bytes,
+            "size_mb": size_bytes / (1024 * 1024),
+            "is_empty": row_count == 0,
+            "timestamp": datetime.now().isoformat(),
+            "upload_id": upload_id,
+            "user_id": self.user_id,
+            "local_path": block_file
+        }
+    
+    def _padding_metadata(self, block_id: str, padding_hash: str, size_bytes: int, upload_id: str) -> Dict:
+        """Metadata for a virtual padding leaf: committed in the tree, never written or uploaded."""
+        metadata = self._block_metadata(block_id, padding_hash, 0, size_bytes, upload_id, None)
+        del metadata['local_path']
+        metadata['is_padding'] = True
+        return metadata
+    
+    def create_merkle_commitment(self, block_metadata: List[Dict], target_block_size_mb: float = 2.0,
+                                 path_mode: str = 'embedded') -> Dict:
+        """
+        Create Merkle tree commitment from block metadata.
+        
+        ``path_mode='on_demand'`` stores the tree levels once as ``merkle_levels``
+        instead of a full authentication path in every block entry; paths are
+        then derived per selected block (get_commitment_authentication_path).
+        """
+        if path_mode not in PATH_MODES:
+            raise ValueError(f"Unknown path mode '{path_mode}' (expected one of {PATH_MODES})")
+        
         print("\n🌳 Building Merkle tree commitment...")
         
         # Extract block hashes
@@ -220,15 +431,17 @@ class CloudDataIngestionPipeline:
         # Build Merkle tree
         merkle_tree = CloudMerkleTree(block_hashes)
         
-        # Generate authentication paths for each block
-        print("🔐 Generating authentication paths...")
-        for i, block in enumerate(block_metadata):
-            auth_path = merkle_tree.get_authentication_path(i)
-            block['authentication_path'] = auth_path
+        if path_mode == 'embedded':
+            # Generate authentication paths for each block
+            print("🔐 Generating authentication paths...")
+            for i, block in enumerate(block_metadata):
+                auth_path = merkle_tree.get_authentication_path(i)
+                block['authentication_path'] = auth_path
         
         # Calculate statistics
         non_empty_blocks = [b for b in block_metadata if not b.get('is_empty', False)]
         empty_blocks = len(block_metadata) - len(non_empty_blocks)
+        padding_blocks = [b for b in block_metadata if b.get('is_padding', False)]
         
         commitment_data = {
             "commitment_type": "merkle_tree",
@@ -237,6 +450,8 @@ class CloudDataIngestionPipeline:
             "total_blocks": len(block_metadata),
             "data_blocks": len(non_empty_blocks),
             "empty_blocks": empty_blocks,
+            "padding_blocks": len(padding_blocks),
+            "padding_hash": padding_blocks[0]['hash'] if padding_blocks else None,
             "blocks_power_of_2": True,
             "target_block_size_mb": target_block_size_mb,
             "timestamp": datetime.now().isoformat(),
@@ -244,7 +459,7 @@ class CloudDataIngestionPipeline:
             "user_id": self.user_id,
             "block_metadata": block_metadata,
             "merkle_tree_structure": {
-                "height": len(merkle_tree.tree),
+                "height": merkle_tree.height,
                 "leaf_count": len(block_hashes),
                 "is_complete_binary_tree": True
             },
@@ -258,13 +473,41 @@ class CloudDataIngestionPipeline:
             }
         }
         
+        compressions = sorted({b['compression'] for b in block_metadata if 'compression' in b})
+        if compressions:
+            # Informational: readers detect the codec of each stored block
+            commitment_data["block_compression"] = compressions[0] if len(compressions) == 1 else compressions
+        
+        if path_mode == 'on_demand':
+            print("🔐 Storing tree levels for on-demand authentication paths...")
+            commitment_data["path_mode"] = path_mode
+            commitment_data["merkle_levels"] = merkle_tree.parent_levels_hex()
+        
         print(f"✅ Merkle root: {merkle_tree.root}")
-        print(f"🌲 Tree height: {len(merkle_tree.tree)}")
+        print(f"🌲 Tree height: {merkle_tree.height}")
         
         return commitment_data
     
-    def upload_to_s3(self, block_metadata: List[Dict], commitment_data: Dict) -> bool:
-        """Upload blocks and commitment to S3."""
+    def upload_to_s3(self, block_metadata: List[Dict], commitment_data: Dict,
+                     concurrency: int = DEFAULT_UPLOAD_CONCURRENCY,
+                     multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD,
+                     journal: Optional[IngestionJournal] = None) -> bool:
+        """
+        Upload blocks and commitment to S3.
+        
+        Up to ``concurrency`` block uploads run at once; blocks of at least
+        ``multipart_threshold`` bytes use multipart upload, and every request
+        is retried with backoff (see s3_transfer.py). Each block's ``s3_key``
+        is filled in as its upload completes, before the commitment goes up.
+        
+        With a block store, blocks go to content-addressed keys and those
+        already in the bucket are not uploaded again; the bytes and estimated
+        seconds skipped are added to ``commitment_data['deduplication']``.
+        
+        With a ``journal`` each completed block upload is checkpointed, and
+        blocks the journal records as already uploaded to their key are
+        not uploaded again.
+        """
         if not self.s3_client:
             print("⚠️  S3 client not available, skipping upload")
             return False
@@ -273,47 +516,65 @@ class CloudDataIngestionPipeline:
         upload_id = commitment_data['upload_id']
         
         try:
-            # Upload blocks
-            for block in tqdm(block_metadata, desc="Uploading blocks"):
-                s3_key = f"uploads/{self.user_id}/blocks/{upload_id}/{block['block_id']}.csv"
-                
-                with open(block['local_path'], 'rb') as f:
-                    self.s3_client.put_object(
-                        Bucket=self.s3_bucket,
-                        Key=s3_key,
-                        Body=f,
-                        Metadata={
-                            'block_id': block['block_id'],
-                            'hash': block['hash'],
-                            'user_id': self.user_id,
-                            'upload_id': upload_id
-                        }
-                    )
-                
-                # Update metadata with S3 location
-                block['s3_bucket'] = self.s3_bucket
-                block['s3_key'] = s3_key
+            # Upload blocks (virtual padding has no object to upload)
+            data_blocks = [block for block in block_metadata if not block.get('is_padding', False)]
+            blocks_by_key = {}
+            uploads = []
+            skipped_bytes = 0
+            checkpointed = 0
+            for block in data_blocks:
+                remote_key = self.block_store and self.block_store.remote_key(block['hash'], self.s3_bucket)
+                if remote_key:
+                    block['s3_bucket'] = self.s3_bucket
+                    block['s3_key'] = remote_key
+                    skipped_bytes += block.get('stored_bytes', block['size_bytes'])
+                    continue
+                upload = self._block_upload(upload_id, block)
+                if journal and journal.is_uploaded(self.s3_bucket, upload.key, block['hash']):
+                    # Uploaded before the previous run was interrupted
+                    block['s3_bucket'] = self.s3_bucket
+                    block['s3_key'] = upload.key
+                    checkpointed += 1
+                    continue
+                if upload.key not in blocks_by_key:
+                    # Identical blocks within one upload share a content-addressed key
+                    uploads.append(upload)
+                blocks_by_key.setdefault(upload.key, []).append(block)
             
-            # Upload commitment
-            commitment_key = f"uploads/{self.user_id}/commitments/{upload_id}/merkle_commitment.json"
-            commitment_json = json.dumps(commitment_data, indent=2)
+            if checkpointed:
+                print(f"⏯️  Skipping {checkpointed} blocks uploaded before the checkpoint")
+            print(f"🚀 Uploading {len(uploads)} blocks, {concurrency} at a time")
+            start_time = time.time()
+            for upload in upload_blocks_concurrently(self.s3_client, self.s3_bucket, uploads,
+                                                     concurrency=concurrency,
+                                                     multipart_threshold=multipart_threshold):
+                # Update metadata with S3 location
+                for block in blocks_by_key[upload.key]:
+                    block['s3_bucket'] = self.s3_bucket
+                    block['s3_key'] = upload.key
+                if self.block_store:
+                    self.block_store.mark_uploaded(blocks_by_key[upload.key][0]['hash'], self.s3_bucket, upload.key)
+                if journal:
+                    journal.record_upload(self.s3_bucket, upload.key, blocks_by_key[upload.key][0]['hash'])
             
-            self.s3_client.put_object(
-                Bucket=self.s3_bucket,
-                Key=commitment_key,
-                Body=commitment_json.encode(),
-                ContentType='application/json',
-                Metadata={
-                    'user_id': self.user_id,
-                    'upload_id': upload_id,
-                    'total_blocks': str(commitment_data['total_blocks'])
-                }
-            )
+            if self.block_store:
+                upload_seconds = time.time() - start_time
+                uploaded_bytes = sum(os.path.getsize(upload.path) for upload in uploads)
+                skipped_bytes += sum(block.get('stored_bytes', block['size_bytes'])
+                                     for blocks in blocks_by_key.values() for block in blocks[1:])
+                # Skipped bytes at the throughput observed over this and earlier uploads
+                throughput = self.block_store.upload_throughput(uploaded_bytes, upload_seconds)
+                commitment_data.setdefault('deduplication', {}).update({
+                    'uploaded_bytes': uploaded_bytes,
+                    'upload_bytes_skipped': skipped_bytes,
+                    'upload_seconds': upload_seconds,
+                    'upload_seconds_saved': skipped_bytes / throughput if throughput else None,
+                })
             
-            commitment_data['s3_bucket'] = self.s3_bucket
-            commitment_data['s3_key'] = commitment_key
+            # Upload commitment
+            self._upload_commitment(commitment_data)
             
-            print(f"✅ Uploaded {len(block_metadata)} blocks to S3")
+            print(f"✅ Uploaded {len(data_blocks)} blocks to S3")
             print(f"✅ Uploaded commitment to S3")
             
             return True
@@ -322,8 +583,56 @@ class CloudDataIngestionPipeline:
             print(f"❌ S3 upload failed: {e}")
             return False
     
-    def store_metadata_dynamodb(self, commitment_data: Dict) -> bool:
-        """Store metadata in DynamoDB for fast querying."""
+    def _block_upload(self, upload_id: str, block: Dict) -> BlockUpload:
+        """The S3 object a data block's file is uploaded to."""
+        if self.block_store:
+            key = content_key(block['hash'])
+        else:
+            key = f"uploads/{self.user_id}/blocks/{upload_id}/{block['block_id']}.csv"
+        return BlockUpload(
+            key=key,
+            path=block.get('local_path') or block['pack_segment'],
+            offset=block.get('pack_offset', 0),
+            length=block.get('stored_bytes', block['size_bytes']) if 'pack_segment' in block else None,
+            metadata={
+                'block_id': block['block_id'],
+                'hash': block['hash'],
+                'user_id': self.user_id,
+                'upload_id': upload_id,
+                'compression': block.get('compression', 'none')
+            }
+        )
+    
+    def _upload_commitment(self, commitment_data: Dict):
+        """Upload the commitment JSON and record its S3 location in it."""
+        upload_id = commitment_data['upload_id']
+        commitment_key = f"uploads/{self.user_id}/commitments/{upload_id}/merkle_commitment.json"
+        commitment_json = json.dumps(commitment_data, indent=2)
+        
+        with_retries(
+            self.s3_client.put_object,
+            Bucket=self.s3_bucket,
+            Key=commitment_key,
+            Body=commitment_json.encode(),
+            ContentType='application/json',
+            Metadata={
+                'user_id': self.user_id,
+                'upload_id': upload_id,
+                'total_blocks': str(commitment_data['total_blocks'])
+            }
+        )
+        
+        commitment_data['s3_bucket'] = self.s3_bucket
+        commitment_data['s3_key'] = commitment_key
+    
+    def store_metadata_dynamodb(self, commitment_data: Dict,
+                                concurrency: int = DEFAULT_WRITE_CONCURRENCY) -> bool:
+        """
+        Store metadata in DynamoDB for fast querying.
+        
+        Block records go up in BatchWriteItem requests of 25 from
+        ``concurrency`` parallel writers (see dynamodb_writer.py).
+        """
         if not self.table:
             print("⚠️  DynamoDB client not available, skipping metadata storage")
             return False
@@ -334,110 +643,267 @@ class CloudDataIngestionPipeline:
             upload_id = commitment_data['upload_id']
             
             # Store main commitment record
-            main_record = {
-                'pk': f"USER#{self.user_id}",
-                'sk': f"UPLOAD#{upload_id}",
-                'entity_type': 'commitment',
-                'upload_id': upload_id,
-                'user_id': self.user_id,
-                'root_hash': commitment_data['root_hash'][0],
-                'total_blocks': commitment_data['total_blocks'],
-                'data_blocks': commitment_data['data_blocks'],
-                'timestamp': commitment_data['timestamp'],
-                's3_bucket': commitment_data.get('s3_bucket'),
-                's3_key': commitment_data.get('s3_key'),
-                'merkle_tree_height': commitment_data['merkle_tree_structure']['height'],
-                'size_statistics': commitment_data['size_statistics']
-            }
+            self.table.put_item(Item=self._commitment_record(commitment_data))
             
-            self.table.put_item(Item=main_record)
+            # Store individual block metadata for fast access; padding leaves
+            # are described by the commitment record's padding fields
+            block_records = [
+                self._block_record(upload_id, i, block)
+                for i, block in enumerate(commitment_data['block_metadata'])
+                if not block.get('is_padding', False)
+            ]
             
-            # Store individual block metadata for fast access
-            for i, block in enumerate(commitment_data['block_metadata']):
-                block_record = {
-                    'pk': f"UPLOAD#{upload_id}",
-                    'sk': f"BLOCK#{i:04d}",
-                    'entity_type': 'block',
-                    'block_id': block['block_id'],
-                    'block_index': i,
-                    'hash': block['hash'],
-                    'authentication_path': block['authentication_path'],
-                    'size_mb': block['size_mb'],
-                    'is_empty': block['is_empty'],
-                    's3_bucket': block.get('s3_bucket'),
-                    's3_key': block.get('s3_key'),
-                    'upload_id': upload_id,
-                    'user_id': self.user_id
-                }
-                
-                self.table.put_item(Item=block_record)
+            requests = batch_write_items(self.table.meta.client, self.table.name, block_records,
+                                         concurrency=concurrency)
             
-            print(f"✅ Stored metadata for {len(commitment_data['block_metadata'])} blocks")
+            print(f"✅ Stored metadata for {len(block_records)} blocks in {requests} batch requests")
             return True
             
         except Exception as e:
             print(f"❌ DynamoDB storage failed: {e}")
             return False
     
+    def _commitment_record(self, commitment_data: Dict) -> Dict:
+        """DynamoDB item describing a whole upload's commitment."""
+        upload_id = commitment_data['upload_id']
+        return to_dynamodb_item({
+            'pk': f"USER#{self.user_id}",
+            'sk': f"UPLOAD#{upload_id}",
+            'entity_type': 'commitment',
+            'upload_id': upload_id,
+            'user_id': self.user_id,
+            'root_hash': commitment_data['root_hash'][0],
+            'total_blocks': commitment_data['total_blocks'],
+            'data_blocks': commitment_data['data_blocks'],
+            'padding_blocks': commitment_data.get('padding_blocks', 0),
+            'padding_hash': commitment_data.get('padding_hash'),
+            'timestamp': commitment_data['timestamp'],
+            's3_bucket': commitment_data.get('s3_bucket'),
+            's3_key': commitment_data.get('s3_key'),
+            'merkle_tree_height': commitment_data['merkle_tree_structure']['height'],
+            'size_statistics': commitment_data['size_statistics']
+        })
+    
+    def _block_record(self, upload_id: str, block_index: int, block: Dict) -> Dict:
+        """DynamoDB item for one data block."""
+        block_record = {
+            'pk': f"UPLOAD#{upload_id}",
+            'sk': f"BLOCK#{block_index:04d}",
+            'entity_type': 'block',
+            'block_id': block['block_id'],
+            'block_index': block_index,
+            'hash': block['hash'],
+            'size_mb': block['size_mb'],
+            'is_empty': block['is_empty'],
+            's3_bucket': block.get('s3_bucket'),
+            's3_key': block.get('s3_key'),
+            'upload_id': upload_id,
+            'user_id': self.user_id
+        }
+        if 'authentication_path' in block:
+            block_record['authentication_path'] = block['authentication_path']
+        return to_dynamodb_item(block_record)
+    
     def process_file(self, 
                     input_file: str, 
                     target_block_size_mb: float = 2.0,
                     upload_to_cloud: bool = True,
                     blocks_dir: Optional[str] = None,
-                    upload_id: Optional[str] = None) -> Dict:
-        """Complete pipeline to process a file for ZK audit system."""
+                    upload_id: Optional[str] = None,
+                    streaming: bool = False,
+                    stream_chunk_rows: int = DEFAULT_STREAM_CHUNK_ROWS,
+                    engine: str = 'pandas',
+                    workers: int = 1,
+                    path_mode: str = 'embedded',
+                    binary_commitment: bool = False,
+                    upload_concurrency: int = DEFAULT_UPLOAD_CONCURRENCY,
+                    dynamodb_concurrency: int = DEFAULT_WRITE_CONCURRENCY,
+                    pipelined: bool = False,
+                    storage: str = 'files',
+                    compression: str = 'none',
+                    columnar: str = 'none',
+                    checkpoint: bool = False,
+                    compact_dtypes: bool = False,
+                    dtypes: Optional[Dict[str, str]] = None,
+                    commitments_dir: str = 'merkle_commitments') -> Dict:
+        """
+        Complete pipeline to process a file for ZK audit system.
+        
+        With ``pipelined`` the split, write+hash, upload and metadata stages
+        overlap through bounded queues (see pipelined_ingestion); ``workers``
+        is then the number of block writer threads. The commitment is the same
+        as the sequential pipeline's.
+        
+        With a block store (``use_block_store``) the split blocks are moved
+        into it or, when already stored, replaced by links to the stored
+        copy; the per-upload savings are recorded in the store and in the
+        commitment's ``deduplication`` entry.
+        
+        ``storage='pack'`` keeps the blocks in segment files with an index
+        instead of one file per block (see block_storage.py), and
+        ``compression`` stores the blocks gzip- or zstd-compressed with the
+        same commitment (see block_compression.py).
+        
+        ``columnar`` ('arrow' or 'parquet') also writes a columnar copy of
+        each block under ``blocks_dir/columnar``, bound to the block's CSV
+        hash (see block_columnar.py); the commitment still covers the CSV.
+        
+        With ``checkpoint`` the completed blocks and uploads are journaled in
+        ``blocks_dir`` (see ingestion_journal.py). If the run is interrupted,
+        rerunning with the same file, settings and ``upload_id`` reuses the
+        intact blocks, splits only the rest and skips finished uploads.
+        
+        ``compact_dtypes`` and ``dtypes`` type the pandas engine's rows (see
+        split_into_blocks); block bytes and the commitment are unchanged.
+        
+        The local commitment copy is saved as
+        ``commitments_dir/commitment_<upload_id>.json``, and the commitment
+        is returned.
+        """
         print(f"🚀 Starting cloud data ingestion pipeline")
         print(f"👤 User ID: {self.user_id}")
         
+        if pipelined and self.block_store:
+            raise ValueError("The block store is not supported with pipelined ingestion")
+        if storage == 'pack' and (pipelined or self.block_store):
+            raise ValueError("Pack storage is not supported with pipelined ingestion or the block store")
+        check_columnar(columnar)
+        if columnar != 'none' and not blocks_dir:
+            raise ValueError("Columnar sidecars are kept with the blocks; pass blocks_dir")
+        if checkpoint and not blocks_dir:
+            raise ValueError("The checkpoint journal is kept with the blocks; pass blocks_dir")
+        if checkpoint and (pipelined or storage == 'pack'):
+            raise ValueError("Checkpointed ingestion is not supported with pipelined ingestion or pack storage")
+        
+        journal = None
+        if checkpoint:
+            upload_id = upload_id or str(uuid.uuid4())
+            # Both ids are part of the checkpoint and of the S3 keys
+            print(f"⏯️  Checkpointing in {blocks_dir}; resume with --upload-id {upload_id} --user-id {self.user_id}")
+            os.makedirs(blocks_dir, exist_ok=True)
+            journal = IngestionJournal(blocks_dir, checkpoint_params(
+                input_file, upload_id=upload_id, user_id=self.user_id, target_block_size_mb=target_block_size_mb,
+                engine=engine, compression=compression
+            ))
+        
         temp_dir = None
         try:
+            if self.block_store and blocks_dir:
+                # Never write a re-ingested block through a link into the store
+                self.block_store.unlink_blocks(blocks_dir)
+            
+            if pipelined:
+                temp_dir = blocks_dir or tempfile.mkdtemp(prefix='zk_audit_blocks_')
+                ingestion = PipelinedIngestion(
+                    self, write_workers=workers, upload_concurrency=upload_concurrency,
+                    dynamodb_concurrency=dynamodb_concurrency, upload_to_cloud=upload_to_cloud
+                )
+                commitment_data = ingestion.run(
+                    input_file, target_block_size_mb, temp_dir, upload_id,
+                    streaming=streaming, stream_chunk_rows=stream_chunk_rows, engine=engine,
+                    path_mode=path_mode, compression=compression, compact_dtypes=compact_dtypes, dtypes=dtypes
+                )
+                ingestion.print_report()
+                self._write_sidecars(blocks_dir, commitment_data, columnar)
+                if not upload_to_cloud:
+                    commitment_data['cloud_upload_success'] = True  # Local mode
+                return self._finish_ingestion(commitment_data, binary_commitment, commitments_dir)
+            
             # Step 1: Split into blocks
             block_metadata, total_blocks, upload_id = self.split_into_blocks(
-                input_file, target_block_size_mb, blocks_dir, upload_id
+                input_file, target_block_size_mb, blocks_dir, upload_id,
+                streaming=streaming, stream_chunk_rows=stream_chunk_rows, engine=engine,
+                workers=workers, storage=storage, compression=compression, journal=journal,
+                compact_dtypes=compact_dtypes, dtypes=dtypes
             )
-            temp_dir = os.path.dirname(block_metadata[0]['local_path']) if block_metadata else None
+            local_paths = [block.get('local_path') or block['pack_segment'] for block in block_metadata
+                           if 'local_path' in block or 'pack_segment' in block]
+            temp_dir = os.path.dirname(local_paths[0]) if local_paths else None
+            
+            # Reused blocks take their stored object's codec before it is committed
+            deduplication = self.block_store and self.block_store.add_upload_blocks(upload_id, block_metadata)
             
             # Step 2: Create Merkle commitment
-            commitment_data = self.create_merkle_commitment(block_metadata, target_block_size_mb)
+            commitment_data = self.create_merkle_commitment(block_metadata, target_block_size_mb, path_mode)
+            self._write_sidecars(blocks_dir, commitment_data, columnar)
+            
+            if self.block_store:
+                commitment_data['deduplication'] = deduplication
             
             if upload_to_cloud:
                 # Step 3: Upload to S3
-                s3_success = self.upload_to_s3(block_metadata, commitment_data)
+                s3_success = self.upload_to_s3(block_metadata, commitment_data, concurrency=upload_concurrency,
+                                               journal=journal)
                 
                 # Step 4: Store metadata in DynamoDB
-                dynamo_success = self.store_metadata_dynamodb(commitment_data)
+                dynamo_success = self.store_metadata_dynamodb(commitment_data, concurrency=dynamodb_concurrency)
                 
                 # Update success status
                 commitment_data['cloud_upload_success'] = s3_success and dynamo_success
             else:
                 commitment_data['cloud_upload_success'] = True  # Local mode
             
-            # Step 5: Save local copy
-            # Create merkle_commitments directory if it doesn't exist
-            commitments_dir = Path("merkle_commitments")
-            commitments_dir.mkdir(exist_ok=True)
-            
-            output_file = commitments_dir / f"commitment_{upload_id}.json"
-            with open(output_file, 'w') as f:
-                json.dump(commitment_data, f, indent=2)
-            
-            # Summary
-            print(f"\n{'='*60}")
-            print("📋 INGESTION COMPLETE")
-            print(f"{'='*60}")
-            print(f"🆔 Upload ID: {upload_id}")
-            print(f"📦 Total blocks: {total_blocks}")
-            print(f"📊 Data blocks: {commitment_data['data_blocks']}")
-            print(f"🌳 Merkle root: {commitment_data['root_hash'][0]}")
-            print(f"☁️  Cloud upload: {'✅' if commitment_data.get('cloud_upload_success') else '❌'}")
-            print(f"💾 Local copy: {output_file}")
+            if self.block_store:
+                self.block_store.record_upload_stats(commitment_data['deduplication'])
             
-            return commitment_data
+            result = self._finish_ingestion(commitment_data, binary_commitment, commitments_dir)
+            if journal and commitment_data['cloud_upload_success']:
+                journal.complete(commitment_data['root_hash'][0])
+            return result
             
         finally:
+            if journal:
+                journal.close()
             # Cleanup temporary files (only if we created a temp directory, not user-specified)
             if temp_dir and os.path.exists(temp_dir) and not blocks_dir:
                 shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    @staticmethod
+    def _write_sidecars(blocks_dir: Optional[str], commitment_data: Dict, columnar: str):
+        """Write the columnar copy of every data block and note the format in the commitment."""
+        if columnar == 'none' or not blocks_dir:
+            return
+        start_time = time.time()
+        count = build_sidecars(blocks_dir, commitment_data['block_metadata'], columnar)
+        commitment_data['columnar_sidecars'] = columnar
+        print(f"🧱 Wrote {count} {columnar} block sidecars in {time.time() - start_time:.2f}s")
+    
+    def _finish_ingestion(self, commitment_data: Dict, binary_commitment: bool,
+                          commitments_dir: str = 'merkle_commitments') -> Dict:
+        """Save the local commitment copy and print the ingestion summary."""
+        upload_id = commitment_data['upload_id']
+        total_blocks = commitment_data['total_blocks']
+        # Step 5: Save local copy
+        # Create the commitments directory if it doesn't exist
+        commitments_dir = Path(commitments_dir)
+        commitments_dir.mkdir(parents=True, exist_ok=True)
+        
+        output_file = commitments_dir / f"commitment_{upload_id}.json"
+        with open(output_file, 'w') as f:
+            json.dump(commitment_data, f, indent=2)
+        
+        binary_file = None
+        if binary_commitment:
+            binary_file = write_binary_commitment(commitment_data, commitments_dir / f"commitment_{upload_id}.zkc")
+        
+        # Summary
+        print(f"\n{'='*60}")
+        print("📋 INGESTION COMPLETE")
+        print(f"{'='*60}")
+        print(f"🆔 Upload ID: {upload_id}")
+        print(f"📦 Total blocks: {total_blocks}")
+        print(f"📊 Data blocks: {commitment_data['data_blocks']}")
+        print(f"🧱 Padding blocks: {commitment_data['padding_blocks']} (virtual)")
+        print(f"🌳 Merkle root: {commitment_data['root_hash'][0]}")
+        print(f"☁️  Cloud upload: {'✅' if commitment_data.get('cloud_upload_success') else '❌'}")
+        print(f"💾 Local copy: {output_file}")
+        if binary_file:
+            print(f"💾 Binary commitment: {binary_file}")
+        if 'deduplication' in commitment_data:
+            for line in format_upload_stats(commitment_data['deduplication']):
+                print(line)
+        
+        return commitment_data
 
 def main():
     """Interactive main function for testing."""
@@ -452,6 +918,51 @@ def main():
     parser.add_argument('--local-only', action='store_true', 
                        help='Skip cloud upload (local processing only)')
     parser.add_argument('--blocks-dir', help='Directory to save blocks (for data editing)')
+    parser.add_argument('--commitments-dir', default='merkle_commitments',
+                       help='Directory the local commitment copy is saved in')
+    parser.add_argument('--streaming', action='store_true',
+                       help='Read the CSV in bounded chunks instead of loading it whole')
+    parser.add_argument('--stream-chunk-rows', type=int, default=DEFAULT_STREAM_CHUNK_ROWS,
+                       help=f'Rows per read in streaming mode (default: {DEFAULT_STREAM_CHUNK_ROWS})')
+    parser.add_argument('--compact-dtypes', action='store_true',
+                       help='Pandas engine: infer narrow integer, categorical and pyarrow string dtypes in a '
+                            'first pass to cut memory; block bytes are unchanged')
+    parser.add_argument('--dtypes', metavar='JSON',
+                       help='Pandas engine: JSON file mapping columns to pandas dtypes, applied over the '
+                            'inferred ones (dtypes that print values differently change block hashes)')
+    parser.add_argument('--engine', choices=ENGINES, default='pandas',
+                       help='Block splitting engine: pandas re-serializes rows, raw copies source bytes, '
+                            'cdc copies source bytes with content-defined boundaries (default: pandas)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Worker processes writing and hashing blocks in parallel (raw engine, default: 1)')
+    parser.add_argument('--path-mode', choices=PATH_MODES, default='embedded',
+                       help='Embed every authentication path, or store tree levels once and derive '
+                            'paths on demand (default: embedded)')
+    parser.add_argument('--binary-commitment', action='store_true',
+                       help='Also write the commitment in the random-access binary format (.zkc)')
+    parser.add_argument('--upload-concurrency', type=int, default=DEFAULT_UPLOAD_CONCURRENCY,
+                       help=f'Concurrent S3 block uploads (default: {DEFAULT_UPLOAD_CONCURRENCY})')
+    parser.add_argument('--dynamodb-concurrency', type=int, default=DEFAULT_WRITE_CONCURRENCY,
+                       help=f'Parallel DynamoDB batch writers (default: {DEFAULT_WRITE_CONCURRENCY})')
+    parser.add_argument('--pipelined', action='store_true',
+                       help='Overlap splitting, hashing, upload and metadata writes through bounded queues '
+                            '(--workers sets the block writer threads)')
+    parser.add_argument('--storage', choices=STORAGE_BACKENDS, default='files',
+                       help='Keep blocks as one file each, or appended to segment files with an index '
+                            '(default: files)')
+    parser.add_argument('--compression', choices=COMPRESSIONS, default='none',
+                       help='Store blocks compressed; hashes and the Merkle root cover the uncompressed CSV '
+                            '(default: none)')
+    parser.add_argument('--columnar', choices=COLUMNAR_FORMATS, default='none',
+                       help='Also write a columnar copy of each block (Arrow IPC or Parquet, needs pyarrow) '
+                            'under --blocks-dir for fast reads; audits still verify the CSV (default: none)')
+    parser.add_argument('--checkpoint', action='store_true',
+                       help='Journal completed blocks and uploads in --blocks-dir; after an interruption, rerun '
+                            'with the same --upload-id and --user-id to resume')
+    parser.add_argument('--block-store', metavar='DIR',
+                       help='Keep blocks once in a content-addressed store under DIR shared across uploads')
+    parser.add_argument('--local-aws', metavar='DIR',
+                       help='Upload to filesystem-backed AWS stand-ins under DIR instead of AWS')
     parser.add_argument('--s3-bucket', help='S3 bucket name')
     parser.add_argument('--dynamodb-table', help='DynamoDB table name')
     
@@ -468,6 +979,15 @@ def main():
         s3_bucket=args.s3_bucket,
         dynamodb_table=args.dynamodb_table
     )
+    if args.local_aws:
+        pipeline.use_local_aws(args.local_aws)
+    if args.block_store:
+        pipeline.use_block_store(args.block_store)
+    
+    dtypes = None
+    if args.dtypes:
+        with open(args.dtypes) as f:
+            dtypes = json.load(f)
     
     # Process file
     try:
@@ -476,7 +996,23 @@ def main():
             args.block_size,
             upload_to_cloud=not args.local_only,
             blocks_dir=args.blocks_dir,
-            upload_id=args.upload_id
+            upload_id=args.upload_id,
+            streaming=args.streaming,
+            stream_chunk_rows=args.stream_chunk_rows,
+            engine=args.engine,
+            workers=args.workers,
+            path_mode=args.path_mode,
+            binary_commitment=args.binary_commitment,
+            upload_concurrency=args.upload_concurrency,
+            dynamodb_concurrency=args.dynamodb_concurrency,
+            pipelined=args.pipelined,
+            storage=args.storage,
+            compression=args.compression,
+            columnar=args.columnar,
+            checkpoint=args.checkpoint,
+            compact_dtypes=args.compact_dtypes,
+            dtypes=dtypes,
+            commitments_dir=args.commitments_dir
         )
         
         if result.get('cloud_upload_success', False):
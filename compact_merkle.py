@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Compact Merkle tree engine for the ZK Data Integrity Audit System.
+
+Each tree level is one contiguous buffer of 32-byte SHA3-256 digests.
+Hex strings only appear at the API boundary. Parents keep the original
+hashing rule, SHA3-256(hex(left) + hex(right)), so roots and
+authentication paths match the existing commitments and the Rust
+``verify_merkle_path``.
+"""
+
+import binascii
+import hashlib
+from typing import Dict, Iterable, List, Optional, Union
+
+DIGEST_SIZE = 32
+
+# How commitments carry authentication paths: a full path inside every
+# block_metadata entry, or the tree levels stored once for on-demand paths
+PATH_MODES = ('embedded', 'on_demand')
+
+
+# Pairs hashed per slice of a level, bounding the temporary hex copy
+BUILD_WINDOW_PAIRS = 1 << 16
+
+
+def hash_children(left: bytes, right: bytes) -> bytes:
+    """Parent digest of two child digests: SHA3-256(hex(left) + hex(right))."""
+    return hashlib.sha3_256(binascii.hexlify(left + right)).digest()
+
+
+def build_parent_level(level: Union[bytes, bytearray]) -> bytearray:
+    """Hash one level of packed digests into the next level up."""
+    if (len(level) // DIGEST_SIZE) % 2:
+        # Odd node count: the last node is paired with itself
+        level = bytes(level) + bytes(level[-DIGEST_SIZE:])
+
+    sha3_256 = hashlib.sha3_256
+    pair_width = 2 * DIGEST_SIZE
+    hex_width = 2 * pair_width
+    window = BUILD_WINDOW_PAIRS * pair_width
+    parents = bytearray()
+
+    for start in range(0, len(level), window):
+        # Hex-encoding a slice at once makes hex(left) + hex(right)
+        # a plain 128-byte slice for every pair in it
+        level_hex = binascii.hexlify(level[start:start + window])
+        parents += b''.join([
+            sha3_256(level_hex[i:i + hex_width]).digest()
+            for i in range(0, len(level_hex), hex_width)
+        ])
+
+    return parents
+
+
+def level_sizes(leaf_count: int) -> List[int]:
+    """Node count of every level, leaves first, root last."""
+    sizes = [leaf_count]
+    while sizes[-1] > 1:
+        sizes.append((sizes[-1] + 1) // 2)
+    return sizes
+
+
+def recompute_root_path(leaf: bytes, leaf_index: int, leaf_count: int, auth_path: List[bytes]) -> List[bytes]:
+    """
+    New digests of the nodes from a changed leaf up to the root, leaf first.
+
+    ``auth_path`` is the leaf's authentication path; its siblings are not
+    affected by the change, except on odd levels where the node is paired
+    with itself, so the new node is used there instead.
+    """
+    nodes = [leaf]
+    node, index = leaf, leaf_index
+    for level, size in enumerate(level_sizes(leaf_count)[:-1]):
+        sibling = node if index ^ 1 >= size else auth_path[level]
+        node = hash_children(node, sibling) if index % 2 == 0 else hash_children(sibling, node)
+        nodes.append(node)
+        index //= 2
+    return nodes
+
+
+class CompactMerkleTree:
+    """Merkle tree stored as packed digest levels, leaves first."""
+
+    def __init__(self, leaves: Union[Iterable[str], bytes, bytearray]):
+        if isinstance(leaves, (bytes, bytearray)):
+            leaf_level = bytearray(leaves)
+        else:
+            leaf_level = bytearray(binascii.unhexlify(''.join(leaves)))
+
+        if len(leaf_level) % DIGEST_SIZE:
+            raise ValueError("Leaf buffer is not a whole number of 32-byte digests")
+
+        self.levels: List[bytearray] = self._build_levels(leaf_level)
+        self.leaf_count = len(leaf_level) // DIGEST_SIZE
+
+    @staticmethod
+    def _build_levels(leaf_level: bytearray) -> List[bytearray]:
+        """Build every level from the leaves up to the root."""
+        if not leaf_level:
+            return []
+
+        levels = [leaf_level]
+        while len(levels[-1]) > DIGEST_SIZE:
+            levels.append(build_parent_level(levels[-1]))
+        return levels
+
+    @property
+    def height(self) -> int:
+        """Number of levels, leaves and root included."""
+        return len(self.levels)
+
+    @property
+    def root_digest(self) -> Optional[bytes]:
+        return bytes(self.levels[-1]) if self.levels else None
+
+    @property
+    def root(self) -> Optional[str]:
+        return self.levels[-1].hex() if self.levels else None
+
+    def node_digest(self, level: int, index: int) -> bytes:
+        """Raw digest of node ``index`` on ``level`` (0 = leaves)."""
+        offset = index * DIGEST_SIZE
+        return bytes(self.levels[level][offset:offset + DIGEST_SIZE])
+
+    def node_hash(self, level: int, index: int) -> str:
+        return self.node_digest(level, index).hex()
+
+    def level_size(self, level: int) -> int:
+        return len(self.levels[level]) // DIGEST_SIZE
+
+    def get_authentication_path(self, leaf_index: int) -> List[str]:
+        """Get authentication path for given leaf index, leaf level first."""
+        if leaf_index >= self.leaf_count or not self.levels:
+            return []
+
+        auth_path = []
+        current_index = leaf_index
+        for level in range(self.height - 1):
+            sibling_index = current_index ^ 1
+            if sibling_index >= self.level_size(level):
+                sibling_index = current_index  # odd level: node is its own sibling
+            auth_path.append(self.node_hash(level, sibling_index))
+            current_index //= 2
+
+        return auth_path
+
+    def update_leaf(self, leaf_index: int, leaf_hash: str) -> str:
+        """Replace one leaf and rehash only its O(log n) ancestors; returns the new root."""
+        if not 0 <= leaf_index < self.leaf_count:
+            raise IndexError(f"Leaf index {leaf_index} out of range (0-{self.leaf_count - 1})")
+
+        auth_path = [bytes.fromhex(sibling) for sibling in self.get_authentication_path(leaf_index)]
+        nodes = recompute_root_path(binascii.unhexlify(leaf_hash), leaf_index, self.leaf_count, auth_path)
+        for level, node in enumerate(nodes):
+            offset = (leaf_index >> level) * DIGEST_SIZE
+            self.levels[level][offset:offset + DIGEST_SIZE] = node
+        return self.root
+
+    @property
+    def leaves(self) -> List[str]:
+        """Hex view of the leaf level."""
+        return self.level_hex(0) if self.levels else []
+
+    @property
+    def tree(self) -> List[List[str]]:
+        """Hex view of every level, root first (the legacy list-of-lists layout)."""
+        return [self.level_hex(level) for level in range(self.height - 1, -1, -1)]
+
+    def level_hex(self, level: int) -> List[str]:
+        data = self.levels[level].hex()
+        width = 2 * DIGEST_SIZE
+        return [data[i:i + width] for i in range(0, len(data), width)]
+
+    def parent_levels_hex(self) -> List[str]:
+        """Every level above the leaves, root last, each as one concatenated hex string."""
+        return [self.levels[level].hex() for level in range(1, self.height)]
+
+
+def get_commitment_authentication_path(commitment: Dict, leaf_index: int) -> List[str]:
+    """
+    Authentication path for one block of a loaded commitment.
+
+    Embedded commitments already hold the path in ``block_metadata``. On-demand
+    commitments store ``merkle_levels`` (level 1 up to the root) and the path
+    is derived here from the leaf hashes and those levels in O(log n).
+    """
+    blocks = commitment['block_metadata']
+    block = blocks[leaf_index]
+    if 'merkle_levels' not in commitment:
+        return block.get('authentication_path', [])
+
+    levels = commitment['merkle_levels']
+    if not levels:
+        return []  # single-leaf tree
+
+    width = 2 * DIGEST_SIZE
+    sibling_index = leaf_index ^ 1 if leaf_index ^ 1 < len(blocks) else leaf_index
+    auth_path = [blocks[sibling_index]['hash']]
+    current_index = leaf_index // 2
+
+    for level_hex in levels[:-1]:
+        sibling_index = current_index ^ 1
+        if sibling_index >= len(level_hex) // width:
+            sibling_index = current_index
+        auth_path.append(level_hex[sibling_index * width:(sibling_index + 1) * width])
+        current_index //= 2
+
+    return auth_path
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Batched DynamoDB writes for the ZK Data Integrity Audit System.
+
+Per-block metadata records are written with BatchWriteItem, 25 items per
+request (the service limit), from a small pool of parallel writers.
+Unprocessed items returned by the service are resubmitted with backoff.
+Throttled or failed requests are retried the same way.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Dict, List
+
+from s3_transfer import DEFAULT_MAX_ATTEMPTS, backoff_delay, with_retries
+
+# BatchWriteItem accepts at most 25 put/delete requests
+BATCH_WRITE_LIMIT = 25
+DEFAULT_WRITE_CONCURRENCY = 4
+
+# Rounds of resubmitting UnprocessedItems before giving up
+MAX_UNPROCESSED_ROUNDS = 10
+
+
+def to_dynamodb_item(value):
+    """Convert floats (rejected by the DynamoDB serializer) to Decimal, recursively."""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: to_dynamodb_item(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_dynamodb_item(v) for v in value]
+    return value
+
+
+def write_batch(client, table_name: str, items: List[Dict],
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+    """
+    Write up to 25 items in one BatchWriteItem call, resubmitting whatever
+    comes back unprocessed. Returns the number of requests made.
+    """
+    pending = {table_name: [{'PutRequest': {'Item': item}} for item in items]}
+    requests = 0
+
+    for round_number in range(MAX_UNPROCESSED_ROUNDS):
+        response = with_retries(client.batch_write_item, RequestItems=pending, max_attempts=max_attempts)
+        requests += 1
+        pending = response.get('UnprocessedItems') or {}
+        if not pending:
+            return requests
+        # Unprocessed items mean the table is throttling: back off before resubmitting
+        time.sleep(backoff_delay(round_number))
+
+    unprocessed = sum(len(table_requests) for table_requests in pending.values())
+    raise RuntimeError(f"{unprocessed} items still unprocessed after {MAX_UNPROCESSED_ROUNDS} rounds")
+
+
+def batch_write_items(client, table_name: str, items: List[Dict],
+                      concurrency: int = DEFAULT_WRITE_CONCURRENCY,
+                      max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+    """
+    Write ``items`` in batches of 25 from ``concurrency`` parallel writers.
+
+    ``client`` is a DynamoDB client accepting Python-typed items, e.g. the
+    ``table.meta.client`` of a boto3 resource. Returns the number of
+    BatchWriteItem requests made.
+    """
+    batches = [items[i:i + BATCH_WRITE_LIMIT] for i in range(0, len(items), BATCH_WRITE_LIMIT)]
+    if not batches:
+        return 0
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        return sum(executor.map(lambda batch: write_batch(client, table_name, batch, max_attempts), batches))
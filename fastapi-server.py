@@ -6,11 +6,13 @@ A more robust backend with proper logging and error handling.
 
 import os
 import sys
+import asyncio
 import subprocess
 import tempfile
 import uuid
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional
@@ -21,6 +23,15 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 import uvicorn
 
+from adaptive_audit import DEFAULT_STARK_BATCH_SIZE, StarkVerifier, run_adaptive_audit
+from binary_commitment import BinaryCommitment, is_binary_commitment
+from block_columnar import COLUMNAR_FORMATS, PYARROW_AVAILABLE, find_sidecar, read_block_frame, write_sidecar
+from block_compression import COMPRESSIONS
+from block_storage import STORAGE_BACKENDS, block_index_of, is_pack_dir, open_block_reader
+from cloud_data_ingestion import CloudDataIngestionPipeline
+from incremental_commit import recommit_commitment_file
+from random_block_selector import SIZING_METHODS, RandomBlockSelector, block_risk_weights
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -44,15 +55,61 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# How uploaded blocks are kept: one file each, or packed into segment files
+BLOCK_STORAGE = os.environ.get('ZK_BLOCK_STORAGE', 'files')
+if BLOCK_STORAGE not in STORAGE_BACKENDS:
+    raise ValueError(f"ZK_BLOCK_STORAGE must be one of {STORAGE_BACKENDS}, got '{BLOCK_STORAGE}'")
+
+# Codec uploaded blocks are stored with; commitments always cover the uncompressed CSV
+BLOCK_COMPRESSION = os.environ.get('ZK_BLOCK_COMPRESSION', 'none')
+if BLOCK_COMPRESSION not in COMPRESSIONS:
+    raise ValueError(f"ZK_BLOCK_COMPRESSION must be one of {COMPRESSIONS}, got '{BLOCK_COMPRESSION}'")
+
+# Columnar sidecar written per block at ingestion; the block viewer loads it instead of parsing the CSV
+BLOCK_COLUMNAR = os.environ.get('ZK_BLOCK_COLUMNAR', 'parquet' if PYARROW_AVAILABLE else 'none')
+if BLOCK_COLUMNAR not in COLUMNAR_FORMATS:
+    raise ValueError(f"ZK_BLOCK_COLUMNAR must be one of {COLUMNAR_FORMATS}, got '{BLOCK_COLUMNAR}'")
+
+# Commitment kept per upload. A binary (.zkc) commitment re-commits an edited block by
+# patching its root path (~36 ms at 100k blocks); a JSON one is loaded and rewritten
+# whole on every re-commit, O(n) in the block count (~5 s at 100k blocks)
+COMMITMENT_FORMATS = ('binary', 'json')
+COMMITMENT_FORMAT = os.environ.get('ZK_COMMITMENT_FORMAT', 'binary')
+if COMMITMENT_FORMAT not in COMMITMENT_FORMATS:
+    raise ValueError(f"ZK_COMMITMENT_FORMAT must be one of {COMMITMENT_FORMATS}, got '{COMMITMENT_FORMAT}'")
+
+# Audit sample sizing: exact hypergeometric needs fewer STARK proofs than the binomial bound
+SAMPLE_SIZING = os.environ.get('ZK_SAMPLE_SIZING', 'hypergeometric')
+if SAMPLE_SIZING not in SIZING_METHODS:
+    raise ValueError(f"ZK_SAMPLE_SIZING must be one of {SIZING_METHODS}, got '{SAMPLE_SIZING}'")
+
+# Ingestion and block selection run in-process on these threads, off the event loop
+WORKER_THREADS = int(os.environ.get('ZK_WORKER_THREADS', '4'))
+if WORKER_THREADS < 1:
+    raise ValueError(f"ZK_WORKER_THREADS must be at least 1, got {WORKER_THREADS}")
+worker_pool = ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix='zk-worker')
+
+# Blocks per verify_upload_blocks run in adaptive audits, which stop after the first tampered batch
+ADAPTIVE_BATCH_SIZE = int(os.environ.get('ZK_ADAPTIVE_BATCH_SIZE', str(DEFAULT_STARK_BATCH_SIZE)))
+if ADAPTIVE_BATCH_SIZE < 1:
+    raise ValueError(f"ZK_ADAPTIVE_BATCH_SIZE must be at least 1, got {ADAPTIVE_BATCH_SIZE}")
+
 # Global state (in production, use a proper database)
 uploads: Dict[str, dict] = {}
 audits: Dict[str, dict] = {}
+# Committed block hashes per commitment file, reloaded when a re-commit replaces the file
+committed_hashes: Dict[str, tuple] = {}
 
 # Pydantic models
 class AuditStartRequest(BaseModel):
     upload_id: str
     confidence_level: int = 95
     min_corruption_rate: int = 5
+    # Draw blocks by risk weight (size, edits through the block endpoint, re-commits);
+    # min_corruption_rate is then a share of the risk weight
+    risk_weighted: bool = False
+    # Verify the blocks in seeded order, a batch per verifier run, stopping at the first tampered batch
+    adaptive: bool = False
 
 class HealthResponse(BaseModel):
     status: str
@@ -75,6 +132,89 @@ class BlockDataRequest(BaseModel):
     upload_id: str
     block_id: str
     data: List[Dict]
+    # Re-commit the edit as a new commitment version; otherwise the edit is
+    # left uncommitted (tampering) and audits of the upload will catch it.
+    # O(log n) on binary commitments, O(n) with ZK_COMMITMENT_FORMAT=json
+    recommit: bool = False
+
+def committed_block_hash(upload_info: dict, block_id: str) -> Optional[str]:
+    """Hash the upload's current commitment records for a block (None if there is no commitment)."""
+    commitment_file = Path(__file__).parent / "merkle_commitments" / upload_info['commitment_file']
+    try:
+        mtime = commitment_file.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if is_binary_commitment(commitment_file):
+        with BinaryCommitment(commitment_file) as commitment:
+            block_index = block_index_of(block_id)
+            return commitment.block_hash(block_index) if 0 <= block_index < len(commitment) else None
+    cached = committed_hashes.get(str(commitment_file))
+    if cached is None or cached[0] != mtime:
+        with open(commitment_file) as f:
+            commitment = json.load(f)
+        cached = (mtime, {block['block_id']: block['hash'] for block in commitment.get('block_metadata', [])})
+        committed_hashes[str(commitment_file)] = cached
+    return cached[1].get(block_id)
+
+def ingest_upload(file_path: str, upload_id: str, blocks_dir: Path) -> Dict:
+    """Run the local ingestion pipeline on an uploaded file; returns its commitment."""
+    project_root = Path(__file__).parent
+    pipeline = CloudDataIngestionPipeline(user_id='web_user')
+    if BLOCK_STORAGE == 'files':
+        # Inside upload_blocks so the per-upload hard links stay on one volume
+        pipeline.use_block_store(str(project_root / "upload_blocks" / ".block_store"))
+    binary = COMMITMENT_FORMAT == 'binary'
+    try:
+        commitment = pipeline.process_file(
+            file_path, 2.0, upload_to_cloud=False, blocks_dir=str(blocks_dir), upload_id=upload_id,
+            storage=BLOCK_STORAGE, compression=BLOCK_COMPRESSION, columnar=BLOCK_COLUMNAR,
+            binary_commitment=binary, commitments_dir=str(project_root / "merkle_commitments")
+        )
+        if binary:
+            # The .zkc is the upload's commitment; a JSON copy would go stale on the first re-commit
+            (project_root / "merkle_commitments" / f"commitment_{commitment['upload_id']}.json").unlink()
+        return commitment
+    finally:
+        if pipeline.block_store:
+            pipeline.block_store.close()
+
+def plan_audit(upload_info: dict, confidence: float, min_corruption: float, risk_weighted: bool = False) -> Dict:
+    """Select the blocks to audit for an upload; returns the audit plan."""
+    selector = RandomBlockSelector(confidence_level=confidence, min_corruption_rate=min_corruption,
+                                   sizing=SAMPLE_SIZING)
+    block_weights = None
+    if risk_weighted:
+        commitment_file = Path(__file__).parent / "merkle_commitments" / upload_info['commitment_file']
+        if is_binary_commitment(commitment_file):
+            with BinaryCommitment(commitment_file) as commitment:
+                block_metadata = [commitment.block_metadata(i, include_path=False) for i in range(len(commitment))]
+        else:
+            with open(commitment_file) as f:
+                block_metadata = json.load(f)['block_metadata']
+        # Blocks re-committed since the upload carry a later timestamp
+        block_weights = block_risk_weights(block_metadata, edited_blocks=upload_info.get('edited_blocks', []),
+                                           recent_since=upload_info['timestamp'])
+    return selector.generate_audit_plan(upload_info['total_blocks'], 'web_user', upload_info['upload_id'],
+                                        padding_blocks=upload_info.get('padding_blocks', 0),
+                                        block_weights=block_weights)
+
+def verify_adaptively(upload_info: dict, audit_info: dict, commitment_file: Path) -> Dict:
+    """STARK-verify an audit's selected blocks in seeded order; returns the adaptive audit report."""
+    selector = RandomBlockSelector(confidence_level=audit_info['confidence_level'] / 100,
+                                   min_corruption_rate=audit_info['min_corruption_rate'] / 100,
+                                   sizing=SAMPLE_SIZING)
+    verifier = StarkVerifier(upload_info['upload_id'], str(commitment_file))
+    # The clean-audit stopping point is the plan's sample size, so at most the selected blocks are verified
+    report = run_adaptive_audit(selector, upload_info['total_blocks'], 'web_user', upload_info['upload_id'],
+                                verifier, batch_size=ADAPTIVE_BATCH_SIZE,
+                                padding_blocks=upload_info.get('padding_blocks', 0),
+                                audit_timestamp=audit_info['audit_timestamp'])
+    report['output'] = '\n'.join(verifier.outputs)
+    return report
+
+async def run_in_worker(fn, *args):
+    """Run a blocking call on the worker pool."""
+    return await asyncio.get_running_loop().run_in_executor(worker_pool, fn, *args)
 
 # Middleware for request logging (only API calls)
 @app.middleware("http") 
@@ -141,76 +281,32 @@ async def upload_dataset(file: UploadFile = File(...)):
         commitments_dir = project_root / "merkle_commitments"
         commitments_dir.mkdir(exist_ok=True)
         
+        # Defaults, kept if ingestion fails
+        total_blocks = max(4, int(file_size_mb / 2))
+        padding_blocks = 0
+        root_hash = f"hash_{upload_id[:16]}..."
+        commitment_file_generated = None
+        
         try:
-            logger.info(f"🔧 PROCESSING: Running cloud_data_ingestion.py with --local-only")
-            result = subprocess.run([
-                'python3', 'cloud_data_ingestion.py',
-                file_path,
-                '--local-only',
-                '--user-id', 'web_user',
-                '--upload-id', upload_id,
-                '--block-size', '2.0',
-                '--blocks-dir', str(blocks_dir)
-            ], capture_output=True, text=True, cwd=project_root, timeout=1800)
+            logger.info(f"🔧 PROCESSING: Running the ingestion pipeline (local only)")
+            start_time = datetime.now()
+            commitment = await run_in_worker(ingest_upload, file_path, upload_id, blocks_dir)
+            elapsed = (datetime.now() - start_time).total_seconds()
             
-            # Initialize variables for both success and failure cases
-            total_blocks = max(4, int(file_size_mb / 2))
-            root_hash = f"hash_{upload_id[:16]}..."
-            commitment_file_generated = None
-            
-            if result.returncode != 0:
-                logger.error(f"❌ PROCESSING: Data ingestion failed with return code {result.returncode}")
-                logger.error(f"❌ PROCESSING: stderr: {result.stderr}")
-                logger.error(f"❌ PROCESSING: stdout: {result.stdout}")
-                # Will create fallback blocks below
-            else:
-                logger.info(f"✅ PROCESSING: Data ingestion completed successfully")
-                logger.info(f"📋 PROCESSING: Full output:\n{result.stdout}")
-                
-                # Parse processing output
-                output_lines = result.stdout.split('\n')
-                
-                for line in output_lines:
-                    if 'Total blocks:' in line:
-                        try:
-                            total_blocks = int(line.split(':')[1].strip())
-                            logger.info(f"📊 PROCESSING: Extracted total_blocks = {total_blocks}")
-                        except Exception as e:
-                            logger.warning(f"⚠️ PROCESSING: Failed to parse total_blocks: {e}")
-                    elif 'Merkle root:' in line:
-                        root_hash = line.split(':')[1].strip()[:16] + '...'  
-                        logger.info(f"🌳 PROCESSING: Extracted root_hash = {root_hash}")
-                    elif 'Upload ID:' in line:
-                        try:
-                            actual_upload_id = line.split('Upload ID:')[1].strip()
-                            commitment_file_generated = f"commitment_{actual_upload_id}.json"
-                            logger.info(f"🆔 PROCESSING: Found commitment file: {commitment_file_generated}")
-                        except Exception as e:
-                            logger.warning(f"⚠️ PROCESSING: Failed to parse upload ID: {e}")
-                
-                # Move generated commitment file to merkle_commitments directory
-                if commitment_file_generated and os.path.exists(commitment_file_generated):
-                    target_path = commitments_dir / commitment_file_generated
-                    try:
-                        import shutil
-                        shutil.move(commitment_file_generated, target_path)
-                        logger.info(f"📁 PROCESSING: Moved commitment file to {target_path}")
-                    except Exception as e:
-                        logger.warning(f"⚠️ PROCESSING: Failed to move commitment file: {e}")
-                        
-        except subprocess.TimeoutExpired:
-            logger.warning("⏰ PROCESSING: Data ingestion timed out after 60s, using defaults")
-            total_blocks = max(4, int(file_size_mb / 2))
-            root_hash = f"hash_{upload_id[:16]}..."
-            commitment_file_generated = None
+            total_blocks = commitment['total_blocks']
+            padding_blocks = commitment['padding_blocks']
+            root_hash = commitment['root_hash'][0]
+            commitment_file_generated = (f"commitment_{commitment['upload_id']}."
+                                         f"{'zkc' if COMMITMENT_FORMAT == 'binary' else 'json'}")
+            logger.info(f"✅ PROCESSING: Data ingestion completed in {elapsed:.2f}s")
+            logger.info(f"📊 PROCESSING: total_blocks = {total_blocks}, padding_blocks = {padding_blocks}")
+            logger.info(f"🌳 PROCESSING: root_hash = {root_hash}")
+            logger.info(f"📁 PROCESSING: Commitment file: {commitments_dir / commitment_file_generated}")
         except Exception as e:
             logger.warning(f"⚠️ PROCESSING: Data ingestion error: {e}, using defaults")
-            total_blocks = max(4, int(file_size_mb / 2))
-            root_hash = f"hash_{upload_id[:16]}..."
-            commitment_file_generated = None
         
         # Ensure blocks directory exists and create fallback blocks if needed
-        if not blocks_dir.exists() or len(list(blocks_dir.glob("block_*.csv"))) == 0:
+        if not blocks_dir.exists() or (not is_pack_dir(blocks_dir) and not any(blocks_dir.glob("block_*.csv"))):
             logger.info(f"🔧 FALLBACK: Creating fallback blocks for tampering functionality")
             try:
                 import pandas as pd
@@ -240,7 +336,8 @@ async def upload_dataset(file: UploadFile = File(...)):
             'filename': file.filename,
             'file_size_mb': file_size_mb,
             'total_blocks': total_blocks,
-            'data_blocks': total_blocks - 1,
+            'data_blocks': total_blocks - padding_blocks,
+            'padding_blocks': padding_blocks,
             'root_hash': root_hash,
             'timestamp': datetime.now().isoformat(),
             'status': 'completed',
@@ -279,6 +376,8 @@ async def start_audit(request: AuditStartRequest):
             logger.error(f"❌ Upload not found: {request.upload_id}")
             logger.info(f"📋 Available uploads: {list(uploads.keys())}")
             raise HTTPException(status_code=404, detail="Upload not found")
+        if request.adaptive and request.risk_weighted:
+            raise HTTPException(status_code=400, detail="Adaptive audits use uniform block selection")
         
         upload_info = uploads[request.upload_id]
         audit_id = str(uuid.uuid4())
@@ -290,62 +389,14 @@ async def start_audit(request: AuditStartRequest):
         logger.info(f"🎲 BLOCK SELECTION: Starting random block selection")
         logger.info(f"🎲 BLOCK SELECTION: total_blocks={upload_info['total_blocks']}, confidence={request.confidence_level}%, corruption={request.min_corruption_rate}%")
         
+        audit_plan = {}
         try:
-            cmd = [
-                'python3', 'random_block_selector.py',
-                '--total-blocks', str(upload_info['total_blocks']),
-                '--user-id', 'web_user',
-                '--upload-id', request.upload_id,
-                '--confidence', str(request.confidence_level / 100),
-                '--min-corruption', str(request.min_corruption_rate / 100)
-            ]
-            logger.info(f"🎲 BLOCK SELECTION: Running command: {' '.join(cmd)}")
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=project_root, timeout=600)
-            
-            if result.returncode != 0:
-                logger.error(f"❌ BLOCK SELECTION: Failed with return code {result.returncode}")
-                logger.error(f"❌ BLOCK SELECTION: stderr: {result.stderr}")
-                logger.error(f"❌ BLOCK SELECTION: stdout: {result.stdout}")
-                sample_size = min(8, upload_info['total_blocks'])
-                selected_blocks = list(range(sample_size))
-                logger.warning(f"🎲 BLOCK SELECTION: Using fallback - selecting first {sample_size} blocks")
-            else:
-                logger.info(f"✅ BLOCK SELECTION: Completed successfully")
-                logger.info(f"📋 BLOCK SELECTION: Full output:\n{result.stdout}")
-                
-                # Parse block selection results
-                output_lines = result.stdout.split('\n')
-                selected_blocks = []
-                sample_size = 4
-                
-                for line in output_lines:
-                    if 'Selected blocks:' in line:
-                        try:
-                            sample_size = int(line.split(':')[1].strip().split()[0])
-                            logger.info(f"📊 BLOCK SELECTION: Extracted sample_size = {sample_size}")
-                        except Exception as e:
-                            logger.warning(f"⚠️ BLOCK SELECTION: Failed to parse sample_size: {e}")
-                    elif line.strip().startswith('[') and ']' in line:
-                        try:
-                            import re
-                            numbers = re.findall(r'\d+', line)
-                            new_blocks = [int(n) for n in numbers]
-                            selected_blocks.extend(new_blocks)
-                            logger.info(f"🎯 BLOCK SELECTION: Found blocks in line: {new_blocks}")
-                        except Exception as e:
-                            logger.warning(f"⚠️ BLOCK SELECTION: Failed to parse block line '{line}': {e}")
-                
-                if not selected_blocks:
-                    selected_blocks = list(range(min(sample_size, upload_info['total_blocks'])))
-                    logger.warning(f"🎲 BLOCK SELECTION: No blocks parsed, using sequential fallback: {selected_blocks}")
-                else:
-                    logger.info(f"🎯 BLOCK SELECTION: Final selected blocks: {selected_blocks}")
-                    
-        except subprocess.TimeoutExpired:
-            logger.warning("⏰ BLOCK SELECTION: Timed out after 30s, using fallback")
-            sample_size = min(8, upload_info['total_blocks'])
-            selected_blocks = list(range(sample_size))
+            audit_plan = await run_in_worker(plan_audit, upload_info, request.confidence_level / 100,
+                                             request.min_corruption_rate / 100, request.risk_weighted)
+            selected_blocks = audit_plan['selected_blocks']
+            logger.info(f"✅ BLOCK SELECTION: Selected {len(selected_blocks)} blocks "
+                        f"({audit_plan['statistical_method']})")
+            logger.info(f"🎯 BLOCK SELECTION: Final selected blocks: {selected_blocks}")
         except Exception as e:
             logger.warning(f"⚠️ BLOCK SELECTION: Error: {e}, using fallback")
             sample_size = min(8, upload_info['total_blocks'])
@@ -362,6 +413,12 @@ async def start_audit(request: AuditStartRequest):
             'sample_percentage': f"{(len(selected_blocks) / upload_info['total_blocks'] * 100):.2f}",
             'confidence_level': request.confidence_level,
             'min_corruption_rate': request.min_corruption_rate,
+            'risk_weighted': request.risk_weighted,
+            # The fallback selection has no seeded order to extend
+            'adaptive': request.adaptive and 'timestamp' in audit_plan,
+            'audit_timestamp': audit_plan.get('timestamp'),
+            'confidence_analysis': audit_plan.get('confidence_analysis', []),
+            'cryptographic_seed': audit_plan.get('cryptographic_seed'),
             'status': 'running',
             'start_time': datetime.now().isoformat()
         }
@@ -411,6 +468,9 @@ async def get_audit_status(audit_id: str):
         stark_success = True
         stark_output = ""
         verification_time = 0
+        # Adaptive audits stop early, so they can verify fewer than the selected blocks
+        adaptive_report = None
+        blocks_audited = len(audit_info['selected_blocks'])
         
         try:
             project_root = Path(__file__).parent / 'verification-rs'
@@ -452,16 +512,38 @@ async def get_audit_status(audit_id: str):
                         selected_blocks_json,
                         str(commitment_file)
                     ]
-                    logger.info(f"🔒 REAL STARK VERIFICATION: Running command: {' '.join(cmd)}")
                     
                     start_time = datetime.now()
-                    result = subprocess.run(cmd, capture_output=True, text=True, cwd=project_root, timeout=1800)
+                    if audit_info.get('adaptive'):
+                        logger.info(f"🔁 ADAPTIVE VERIFICATION: Verifying in seeded order, {ADAPTIVE_BATCH_SIZE} blocks per run")
+                        adaptive_report = await run_in_worker(verify_adaptively, upload_info, audit_info, commitment_file)
+                        blocks_audited = adaptive_report['blocks_verified']
+                        logger.info(f"🔁 ADAPTIVE VERIFICATION: {adaptive_report['verdict']} after {blocks_audited} "
+                                    f"of {len(audit_info['selected_blocks'])} blocks")
+                        # Same shape as a single run over the blocks verified, for the parsing below
+                        result = subprocess.CompletedProcess(cmd, 1 if adaptive_report['tampered_blocks'] else 0,
+                                                             adaptive_report['output'], '')
+                        audit_info['adaptive_report'] = {
+                            'verdict': adaptive_report['verdict'],
+                            'tampered_blocks': adaptive_report['tampered_blocks'],
+                            'blocks_verified': blocks_audited,
+                            'confidence': adaptive_report['confidence'],
+                            'steps': [{'blocks_verified': step['blocks_verified'], 'confidence': step['confidence']}
+                                      for step in adaptive_report['steps']],
+                        }
+                    else:
+                        logger.info(f"🔒 REAL STARK VERIFICATION: Running command: {' '.join(cmd)}")
+                        result = subprocess.run(cmd, capture_output=True, text=True, cwd=project_root, timeout=1800)
                     end_time = datetime.now()
                     
                     verification_time = (end_time - start_time).total_seconds()
                     stark_success = result.returncode == 0
                     stark_output = result.stdout
-                    tampering_detected = result.returncode == 1 and "TAMPERING DETECTED" in result.stdout
+                    if adaptive_report:
+                        # Blocks failing Merkle verification or unreadable count as tampered too
+                        tampering_detected = adaptive_report['verdict'] == 'tampered'
+                    else:
+                        tampering_detected = result.returncode == 1 and "TAMPERING DETECTED" in result.stdout
                     
                     logger.info(f"🔒 REAL STARK VERIFICATION: Process completed in {verification_time:.2f}s")
                     logger.info(f"🔒 REAL STARK VERIFICATION: Return code: {result.returncode}")
@@ -613,10 +695,15 @@ async def get_audit_status(audit_id: str):
             if current_block:
                 verification_results.append(current_block)
             
+            if adaptive_report:
+                # Each run's summary only counts its own batch
+                blocks_failed = len(adaptive_report['tampered_blocks'])
+                blocks_verified = blocks_audited - blocks_failed
+            
             # Fallback calculation: if tampering was detected but blocks_failed is 0, 
             # calculate it as the difference between total selected and verified
             if blocks_failed == 0 and tampering_detected:
-                blocks_failed = len(audit_info['selected_blocks']) - blocks_verified
+                blocks_failed = blocks_audited - blocks_verified
                 logger.warning(f"⚠️ TAMPERING PARSING: Fallback calculation - setting blocks_failed = {blocks_failed}")
             
             total_blocks_audited = blocks_failed + blocks_verified
@@ -632,7 +719,7 @@ async def get_audit_status(audit_id: str):
                     'rawStarkOutput': stark_output,
                     'statistics': {
                         'totalBlocks': len(audit_info['selected_blocks']),
-                        'blocksAudited': len(audit_info['selected_blocks']),
+                        'blocksAudited': blocks_audited,
                         'blocksPassed': blocks_verified,
                         'blocksFailed': blocks_failed,
                         'totalTimeMs': int(verification_time * 1000),
@@ -725,19 +812,23 @@ async def get_audit_status(audit_id: str):
                 
                 elif 'Total generation time:' in line:
                     try:
-                        total_gen_time = int(line.split(':')[1].strip().split()[0])
+                        total_gen_time += int(line.split(':')[1].strip().split()[0])
                     except:
                         pass
                 
                 elif 'Total verification time:' in line:
                     try:
-                        total_verify_time = int(line.split(':')[1].strip().split()[0])
+                        total_verify_time += int(line.split(':')[1].strip().split()[0])
                     except:
                         pass
             
             # Don't forget the last block
             if current_block:
                 verification_results.append(current_block)
+            if adaptive_report:
+                # Each run's summary only counts its own batch
+                blocks_failed = len(adaptive_report['tampered_blocks'])
+                blocks_verified = blocks_audited - blocks_failed
         
         # If parsing failed, create minimal results
         if not verification_results and stark_success:
@@ -753,7 +844,7 @@ async def get_audit_status(audit_id: str):
                 }
                 for i in audit_info['selected_blocks'][:5]  # Show first 5 for display
             ]
-            blocks_verified = len(audit_info['selected_blocks'])
+            blocks_verified = blocks_audited
         
         # Update audit with REAL results
         audit_info.update({
@@ -766,7 +857,7 @@ async def get_audit_status(audit_id: str):
                 'rawStarkOutput': stark_output,  # Include raw output for debugging
                 'statistics': {
                     'totalBlocks': len(audit_info['selected_blocks']),
-                    'blocksAudited': len(audit_info['selected_blocks']),
+                    'blocksAudited': blocks_audited,
                     'blocksPassed': blocks_verified,
                     'blocksFailed': blocks_failed,
                     'totalTimeMs': int(verification_time * 1000),
@@ -805,20 +896,10 @@ async def get_upload_blocks(upload_id: str):
         raise HTTPException(status_code=404, detail="Blocks directory not found")
     
     try:
-        # Find all CSV block files
-        block_files = list(blocks_dir.glob("block_*.csv"))
-        block_files.sort()
-        
-        blocks_info = []
-        for block_file in block_files:
-            block_id = block_file.stem  # e.g., "block_0001"
-            block_info = {
-                'block_id': block_id,
-                'file_path': str(block_file),
-                'size_bytes': block_file.stat().st_size,
-                'modified': datetime.fromtimestamp(block_file.stat().st_mtime).isoformat()
-            }
-            blocks_info.append(block_info)
+        # Block files, or one read of the pack index
+        reader = open_block_reader(blocks_dir)
+        blocks_info = reader.list_blocks()
+        reader.close()
         
         logger.info(f"✅ Found {len(blocks_info)} blocks for upload {upload_id}")
         return {
@@ -842,15 +923,22 @@ async def get_block_data(upload_id: str, block_id: str):
     
     upload_info = uploads[upload_id]
     blocks_dir = Path(upload_info['blocks_dir'])
-    block_file = blocks_dir / f"{block_id}.csv"
+    reader = open_block_reader(blocks_dir)
     
-    if not block_file.exists():
-        logger.error(f"❌ Block file not found: {block_file}")
+    if not reader.exists(block_id):
+        logger.error(f"❌ Block {block_id} not found in {blocks_dir}")
         raise HTTPException(status_code=404, detail="Block file not found")
     
     try:
         import pandas as pd
-        df = pd.read_csv(block_file)
+        # The columnar copy is only served while it matches the committed CSV hash
+        expected_hash = committed_block_hash(upload_info, block_id)
+        df = read_block_frame(blocks_dir, block_id, expected_hash) if expected_hash else None
+        data_source = 'columnar' if df is not None else 'csv'
+        if df is None:
+            with reader.open_block(block_id) as stream:
+                df = pd.read_csv(stream)
+        reader.close()
         
         # Clean DataFrame to handle NaN values for JSON serialization
         df_clean = df.fillna('')  # Replace NaN with empty string
@@ -862,10 +950,11 @@ async def get_block_data(upload_id: str, block_id: str):
             'columns': df.columns.tolist(),
             'data': df_clean.to_dict('records'),
             'row_count': len(df),
-            'file_path': str(block_file)
+            'file_path': str(blocks_dir / f"{block_id}.csv"),
+            'data_source': data_source
         }
         
-        logger.info(f"✅ Block {block_id} loaded: {len(df)} rows, {len(df.columns)} columns")
+        logger.info(f"✅ Block {block_id} loaded from {data_source}: {len(df)} rows, {len(df.columns)} columns")
         return block_data
         
     except Exception as e:
@@ -883,10 +972,10 @@ async def update_block_data(upload_id: str, block_id: str, request: BlockDataReq
     
     upload_info = uploads[upload_id]
     blocks_dir = Path(upload_info['blocks_dir'])
-    block_file = blocks_dir / f"{block_id}.csv"
+    reader = open_block_reader(blocks_dir)
     
-    if not block_file.exists():
-        logger.error(f"❌ Block file not found: {block_file}")
+    if not reader.exists(block_id):
+        logger.error(f"❌ Block {block_id} not found in {blocks_dir}")
         raise HTTPException(status_code=404, detail="Block file not found")
     
     try:
@@ -895,18 +984,26 @@ async def update_block_data(upload_id: str, block_id: str, request: BlockDataReq
         # Convert the new data to DataFrame
         df = pd.DataFrame(request.data)
         
-        # Create backup of original file
+        # Create backup of original block
         backup_file = blocks_dir / f"{block_id}_backup.csv"
-        if block_file.exists():
-            import shutil
-            shutil.copy2(block_file, backup_file)
-            logger.info(f"💾 Backup created: {backup_file}")
+        backup_file.write_bytes(reader.read_block(block_id))
+        logger.info(f"💾 Backup created: {backup_file}")
         
-        # Save the updated data
-        df.to_csv(block_file, index=False)
+        # Save the updated data; replacing (not rewriting) the block file
+        # leaves a shared block store object untouched
+        block_data = df.to_csv(index=False).encode('utf-8')
+        reader.write_block(block_id, block_data)
+        reader.close()
+        sidecar = find_sidecar(blocks_dir, block_id)
+        if sidecar is not None and PYARROW_AVAILABLE:
+            # Bound to the edited bytes: served again once the edit is re-committed
+            write_sidecar(blocks_dir, block_id, block_data, sidecar.suffix.lstrip('.'))
         
         logger.info(f"✅ Block {block_id} updated: {len(df)} rows, {len(df.columns)} columns")
-        return {
+        if block_id not in upload_info.setdefault('edited_blocks', []):
+            # Weighted up by risk-weighted audits
+            upload_info['edited_blocks'].append(block_id)
+        response = {
             'success': True,
             'upload_id': upload_id,
             'block_id': block_id,
@@ -915,6 +1012,19 @@ async def update_block_data(upload_id: str, block_id: str, request: BlockDataReq
             'message': f'Block {block_id} updated successfully'
         }
         
+        if request.recommit:
+            # Rehash only this block's root path and write the next commitment version.
+            # A JSON commitment is still loaded and rewritten whole (O(n) blocks)
+            commitment_file = Path(__file__).parent / "merkle_commitments" / upload_info['commitment_file']
+            recommit = recommit_commitment_file(str(commitment_file), block_id, block_data=block_data)
+            upload_info['root_hash'] = recommit['root_hash']
+            upload_info['commitment_version'] = recommit['version']
+            response['recommit'] = recommit
+            logger.info(f"🌳 Block {block_id} re-committed: version {recommit['version']}, "
+                        f"root {recommit['root_hash'][:16]}...")
+        
+        return response
+        
     except Exception as e:
         logger.error(f"❌ Error updating block data: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error updating block data: {str(e)}")
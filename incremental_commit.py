@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Incremental re-commitment for the ZK Data Integrity Audit System.
+
+When one block of an upload is legitimately edited, only that leaf and
+its O(log n) ancestors change. recommit_block rehashes that root path and
+patches the commitment in place: the block entry, the root, the stored
+tree levels (on-demand mode) or the path entries that referenced a changed
+node (embedded mode), and the size statistics. The commitment's
+``version`` goes up and the old root is kept as ``previous_root_hash``.
+The update is then written atomically as a new version. The previous file
+stays available as ``commitment_<id>.v<N>.json`` (or ``.zkc``).
+
+Usage:
+    python incremental_commit.py merkle_commitments/commitment_<id>.json block_0003 upload_blocks/<id>/block_0003.csv
+"""
+
+import hashlib
+import json
+import os
+import sys
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from binary_commitment import BinaryCommitment, is_binary_commitment, patch_binary_commitment
+from block_compression import open_block_file
+from block_splitter import count_csv_records
+from compact_merkle import get_commitment_authentication_path, level_sizes, recompute_root_path
+
+DIGEST_HEX = 64
+
+
+def hash_block_file(block_file: str) -> Dict:
+    """Hash, size and row count of a block file's canonical (uncompressed) bytes, as the splitter records them."""
+    with open_block_file(block_file) as f:
+        return hash_block_data(f.read())
+
+
+def hash_block_data(data: bytes) -> Dict:
+    """Hash, size and row count of a block's bytes (e.g. read from a pack)."""
+    header_end = data.find(b'\n') + 1 if b'\n' in data else len(data)
+    return {
+        'hash': hashlib.sha3_256(data).hexdigest(),
+        'size_bytes': len(data),
+        'row_count': count_csv_records(data[header_end:]),
+    }
+
+
+def _update_block_entry(block: Dict, block_hash: str, size_bytes: int, row_count: int) -> Dict:
+    """Apply an edit to one block entry; returns the entry's previous values."""
+    if block.get('is_padding', False):
+        raise ValueError(f"{block['block_id']} is a virtual padding block and cannot be edited")
+    previous = {'size_mb': block['size_mb'], 'is_empty': block['is_empty']}
+    block.update({
+        'hash': block_hash,
+        'row_count': row_count,
+        'size_bytes': size_bytes,
+        'size_mb': size_bytes / (1024 * 1024),
+        'is_empty': row_count == 0,
+        'timestamp': datetime.now().isoformat(),
+    })
+    return previous
+
+
+def _update_commitment_fields(info: Dict, previous: Dict, block: Dict,
+                              data_sizes: Callable[[], Iterable[float]], old_root: str):
+    """
+    Adjust block counts and size statistics for one edited block.
+
+    Totals move by the size difference. ``data_sizes`` (sizes of all
+    non-empty blocks) is only read when the edited block held the minimum
+    or maximum and moved inward, or became or stopped being empty.
+    """
+    stats = info['size_statistics']
+    old_size, new_size = previous['size_mb'], block['size_mb']
+    was_data, is_data = not previous['is_empty'], not block['is_empty']
+
+    info['data_blocks'] += is_data - was_data
+    info['empty_blocks'] += was_data - is_data
+    stats['total_size_mb'] += new_size - old_size
+    stats['data_size_mb'] += new_size * is_data - old_size * was_data
+    stats['average_block_size_mb'] = stats['data_size_mb'] / info['data_blocks'] if info['data_blocks'] else 0
+
+    moved_inward = was_data and (old_size == stats['min_block_size_mb'] < new_size or
+                                 old_size == stats['max_block_size_mb'] > new_size)
+    if moved_inward or was_data != is_data:
+        sizes = list(data_sizes())
+        stats['min_block_size_mb'] = min(sizes, default=0)
+        stats['max_block_size_mb'] = max(sizes, default=0)
+    elif is_data:
+        stats['min_block_size_mb'] = min(stats['min_block_size_mb'], new_size)
+        stats['max_block_size_mb'] = max(stats['max_block_size_mb'], new_size)
+
+    info['version'] = info.get('version', 1) + 1
+    info['previous_root_hash'] = old_root
+    info['timestamp'] = datetime.now().isoformat()
+
+
+def _patch_embedded_paths(blocks: List[Dict], block_index: int, nodes: List[str], sizes: List[int]):
+    """
+    Replace the path entries that referenced a node on the edited root path.
+
+    Block j's path meets that root path once, at the level below where j and
+    the edited block share an ancestor. It also meets it on odd levels where
+    their shared ancestor is paired with itself.
+    """
+    self_paired = [level for level in range(len(sizes) - 1) if (block_index >> level) ^ 1 >= sizes[level]]
+    for j, block in enumerate(blocks):
+        path = block.get('authentication_path')
+        if not path:
+            continue
+        shared_from = (j ^ block_index).bit_length()
+        if shared_from:
+            path[shared_from - 1] = nodes[shared_from - 1]
+        for level in self_paired:
+            if level >= shared_from:
+                path[level] = nodes[level]
+
+
+def recommit_block(commitment: Dict, block_index: int, block_hash: str,
+                   size_bytes: int, row_count: int) -> str:
+    """
+    Re-commit one edited block of a JSON commitment in place; returns the new root.
+
+    Only the block's root path is rehashed (O(log n) hashes).
+    """
+    if commitment.get('commitment_type', 'merkle_tree') != 'merkle_tree':
+        raise ValueError(f"Cannot re-commit a {commitment['commitment_type']} commitment")
+    blocks = commitment['block_metadata']
+    if not 0 <= block_index < len(blocks):
+        raise IndexError(f"Block index {block_index} out of range (0-{len(blocks) - 1})")
+
+    auth_path = [bytes.fromhex(sibling) for sibling in get_commitment_authentication_path(commitment, block_index)]
+    nodes = [node.hex() for node in recompute_root_path(bytes.fromhex(block_hash), block_index,
+                                                        len(blocks), auth_path)]
+    old_root = commitment['root_hash'][0]
+
+    previous = _update_block_entry(blocks[block_index], block_hash, size_bytes, row_count)
+    commitment['root_hash'] = [nodes[-1]]
+
+    if commitment.get('merkle_levels') is not None:
+        levels = commitment['merkle_levels']
+        for level in range(1, len(nodes)):
+            start = (block_index >> level) * DIGEST_HEX
+            levels[level - 1] = levels[level - 1][:start] + nodes[level] + levels[level - 1][start + DIGEST_HEX:]
+    else:
+        _patch_embedded_paths(blocks, block_index, nodes, level_sizes(len(blocks)))
+
+    _update_commitment_fields(commitment, previous, blocks[block_index],
+                              lambda: (b['size_mb'] for b in blocks if not b['is_empty']), old_root)
+    return nodes[-1]
+
+
+def version_path(commitment_file: Path, version: int) -> Path:
+    """Where version ``version`` of a commitment is kept once superseded."""
+    return commitment_file.with_name(f"{commitment_file.stem}.v{version}{commitment_file.suffix}")
+
+
+def _replace_with_version(commitment_file: Path, old_version: int, tmp_file: Path):
+    """Keep the current file as ``.v<old_version>`` and atomically move ``tmp_file`` over it."""
+    archived = version_path(commitment_file, old_version)
+    if not archived.exists():
+        # A hard link keeps the old bytes without copying them
+        os.link(commitment_file, archived)
+    os.replace(tmp_file, commitment_file)
+
+
+def recommit_commitment_file(commitment_file: str, block_id: str, block_file: Optional[str] = None,
+                             block_data: Optional[bytes] = None) -> Dict:
+    """
+    Re-commit an edited block and write the commitment's next version.
+
+    The edited block is read from ``block_file``, or given as ``block_data``
+    when it lives in a pack. Works on JSON and binary (.zkc) commitments.
+    Returns the block's new hash, the old and new root and the new version.
+    """
+    commitment_file = Path(commitment_file)
+    block_index = int(block_id.rsplit('_', 1)[-1]) - 1
+    edit = hash_block_data(block_data) if block_data is not None else hash_block_file(block_file)
+    tmp_file = commitment_file.with_name(f".{commitment_file.name}.{uuid.uuid4().hex}")
+
+    try:
+        if is_binary_commitment(commitment_file):
+            with BinaryCommitment(commitment_file) as reader:
+                old_root, version = reader.root, reader.info.get('version', 1)
+                new_root = _recommit_binary(reader, block_index, edit, tmp_file)
+        else:
+            with open(commitment_file) as f:
+                commitment = json.load(f)
+            old_root, version = commitment['root_hash'][0], commitment.get('version', 1)
+            new_root = recommit_block(commitment, block_index, edit['hash'], edit['size_bytes'], edit['row_count'])
+            with open(tmp_file, 'w') as f:
+                json.dump(commitment, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+
+        _replace_with_version(commitment_file, version, tmp_file)
+    finally:
+        if tmp_file.exists():
+            tmp_file.unlink()
+
+    return {
+        'block_id': block_id,
+        'hash': edit['hash'],
+        'previous_root_hash': old_root,
+        'root_hash': new_root,
+        'version': version + 1,
+        'previous_version_file': str(version_path(commitment_file, version)),
+    }
+
+
+def _recommit_binary(reader: BinaryCommitment, block_index: int, edit: Dict, output_file: Path) -> str:
+    """Re-commit one block of a binary commitment into ``output_file``; returns the new root."""
+    if reader.info.get('commitment_type', 'merkle_tree') != 'merkle_tree':
+        raise ValueError(f"Cannot re-commit a {reader.info['commitment_type']} commitment")
+
+    auth_path = [bytes.fromhex(sibling) for sibling in reader.authentication_path(block_index)]
+    nodes = recompute_root_path(bytes.fromhex(edit['hash']), block_index, reader.leaf_count, auth_path)
+
+    block = reader.block_metadata(block_index, include_path=False)
+    previous = _update_block_entry(block, edit['hash'], edit['size_bytes'], edit['row_count'])
+    info = dict(reader.info)
+    def data_sizes():
+        for i in range(reader.leaf_count):
+            other = block if i == block_index else reader.block_metadata(i, include_path=False)
+            if not other['is_empty']:
+                yield other['size_mb']
+
+    _update_commitment_fields(info, previous, block, data_sizes, reader.root)
+
+    patch_binary_commitment(reader, block_index, nodes, block, info, output_file)
+    return nodes[-1].hex()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='ZK Audit System - Re-commit an edited block')
+    parser.add_argument('commitment_file', help='Path to the JSON or binary (.zkc) commitment')
+    parser.add_argument('block_id', help='Edited block, e.g. block_0003')
+    parser.add_argument('block_file', help='Path to the edited block CSV')
+    args = parser.parse_args()
+
+    try:
+        result = recommit_commitment_file(args.commitment_file, args.block_id, args.block_file)
+    except (OSError, ValueError, IndexError, KeyError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    print(f"✏️  {result['block_id']}: {result['hash']}")
+    print(f"🌳 Merkle root: {result['previous_root_hash']} -> {result['root_hash']}")
+    print(f"🔖 Version {result['version']} written; previous kept at {result['previous_version_file']}")
+
+
+if __name__ == "__main__":
+    main()
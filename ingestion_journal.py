@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Checkpoint journal for resumable ingestion in the ZK Data Integrity Audit System.
+
+Checkpointed ingestion appends one JSON line to ``<blocks_dir>/ingest.journal``
+per completed step:
+
+    {"type": "start", "params": {...}}            input file identity and split settings
+    {"type": "block", "index": i, "block": {...}, "offset_end": n, "mtime_ns": t}
+    {"type": "uploaded", "s3_bucket": b, "s3_key": k, "hash": h}
+    {"type": "done", "root_hash": r}
+
+A block line is written only after its file is complete. Lines are
+flushed as they are written and fsynced at most every
+``FSYNC_INTERVAL_SECONDS``, so a crash loses at most the last few steps;
+a torn final line is dropped on reopen.
+
+A rerun with the same upload and user ids reopens the journal.
+Completed blocks whose files still have the journaled size and
+modification time are reused without re-reading them, and the split
+resumes after the last one: byte engines seek straight to ``offset_end``.
+Blocks recorded as uploaded are not uploaded again. A journal started
+with a different input file or split settings is refused.
+
+Usage:
+    python ingestion_journal.py upload_blocks/<id>      # show checkpoint progress
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+JOURNAL_FILE = 'ingest.journal'
+FSYNC_INTERVAL_SECONDS = 1.0
+
+
+def checkpoint_params(input_file: str, **settings) -> Dict:
+    """Journal parameters: the input file's identity plus the settings that decide block boundaries."""
+    info = os.stat(input_file)
+    return {
+        'input_file': os.path.abspath(input_file),
+        'input_size': info.st_size,
+        'input_mtime_ns': info.st_mtime_ns,
+        **settings,
+    }
+
+
+def has_journal(blocks_dir: str) -> bool:
+    return (Path(blocks_dir) / JOURNAL_FILE).exists()
+
+
+class IngestionJournal:
+    """Append-only record of the blocks an ingestion has written and uploaded."""
+
+    def __init__(self, blocks_dir: str, params: Dict):
+        self.path = Path(blocks_dir) / JOURNAL_FILE
+        self.params = params
+        self.blocks: Dict[int, Dict] = {}
+        self.uploads: Dict[Tuple[str, str], str] = {}
+        self.done = False
+        self.resumed = self.path.exists()
+
+        if self.resumed:
+            self._load()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._last_sync = time.monotonic()
+        if not self.resumed:
+            self._append({'type': 'start', 'params': params, 'timestamp': datetime.now().isoformat()}, sync=True)
+
+    def _load(self):
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        # Keep whole lines only: a crash may have torn the last one
+        complete = data[:data.rfind(b'\n') + 1]
+        if len(complete) != len(data):
+            with open(self.path, 'r+b') as f:
+                f.truncate(len(complete))
+
+        for line in complete.decode('utf-8').splitlines():
+            record = json.loads(line)
+            kind = record['type']
+            if kind == 'start':
+                if record['params'] != self.params:
+                    raise ValueError(f"{self.path} was started with different input or settings; "
+                                     f"remove it to start over ({record['params']} != {self.params})")
+            elif kind == 'block':
+                self.blocks[record['index']] = record
+            elif kind == 'uploaded':
+                self.uploads[record['s3_bucket'], record['s3_key']] = record['hash']
+            elif kind == 'done':
+                self.done = True
+
+    def _append(self, record: Dict, sync: bool = False):
+        self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._file.flush()
+        now = time.monotonic()
+        if sync or now - self._last_sync >= FSYNC_INTERVAL_SECONDS:
+            os.fsync(self._file.fileno())
+            self._last_sync = now
+
+    def record_block(self, block_index: int, block: Dict, offset_end: Optional[int] = None):
+        """Journal a block whose file is complete (``offset_end``: where the next block starts in the input)."""
+        record = {'type': 'block', 'index': block_index, 'block': block, 'offset_end': offset_end}
+        if 'local_path' in block:
+            record['mtime_ns'] = os.stat(block['local_path']).st_mtime_ns
+        self.blocks[block_index] = record
+        self._append(record)
+
+    def record_upload(self, s3_bucket: str, s3_key: str, block_hash: str):
+        """Journal that the object at ``s3_key`` holds the block with ``block_hash``."""
+        self.uploads[s3_bucket, s3_key] = block_hash
+        self._append({'type': 'uploaded', 's3_bucket': s3_bucket, 's3_key': s3_key, 'hash': block_hash})
+
+    def is_uploaded(self, s3_bucket: str, s3_key: str, block_hash: str) -> bool:
+        """Whether this block content was already uploaded to ``s3_key``."""
+        return self.uploads.get((s3_bucket, s3_key)) == block_hash
+
+    def resume_point(self) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Metadata of the leading run of journaled blocks that are still intact
+        on disk, and the input offset where the next block starts.
+
+        A block is intact when its file has the journaled size (stored size
+        for compressed blocks) and modification time; nothing is re-read.
+        The run ends at the first missing, changed or unjournaled block.
+        """
+        blocks, offset_end = [], None
+        for block_index in range(len(self.blocks)):
+            record = self.blocks.get(block_index)
+            if record is None or not self._intact(record):
+                break
+            blocks.append(dict(record['block']))
+            offset_end = record['offset_end']
+        return blocks, offset_end
+
+    @staticmethod
+    def _intact(record: Dict) -> bool:
+        block = record['block']
+        if block.get('is_padding', False):
+            return True
+        try:
+            info = os.stat(block['local_path'])
+        except (KeyError, FileNotFoundError):
+            return False
+        return (info.st_size == block.get('stored_bytes', block['size_bytes'])
+                and info.st_mtime_ns == record.get('mtime_ns'))
+
+    def complete(self, root_hash: str):
+        self.done = True
+        self._append({'type': 'done', 'root_hash': root_hash, 'timestamp': datetime.now().isoformat()}, sync=True)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(f"Usage: {sys.argv[0]} <blocks_dir>")
+        sys.exit(1)
+    path = Path(sys.argv[1]) / JOURNAL_FILE
+    if not path.exists():
+        print(f"❌ Error: No checkpoint journal in {sys.argv[1]}")
+        sys.exit(1)
+
+    with open(path, encoding='utf-8') as f:
+        lines = [line for line in f if line.endswith('\n')]
+    records = [json.loads(line) for line in lines]
+    params = records[0]['params'] if records and records[0]['type'] == 'start' else {}
+    blocks = {r['index'] for r in records if r['type'] == 'block'}
+    uploads = {(r['s3_bucket'], r['s3_key']) for r in records if r['type'] == 'uploaded'}
+    done = [r for r in records if r['type'] == 'done']
+
+    print(f"📄 Input: {params.get('input_file')} ({params.get('input_size', 0) / 2**20:.2f} MB)")
+    print(f"⚙️  Settings: {', '.join(f'{k}={v}' for k, v in params.items() if not k.startswith('input_'))}")
+    print(f"📦 Blocks written: {len(blocks)}")
+    print(f"☁️  Blocks uploaded: {len(uploads)}")
+    print(f"✅ Complete: {done[-1]['root_hash']}" if done
+          else "⏸️  Incomplete: rerun with the same --upload-id and --user-id to resume")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the AWS services used by the ingestion pipeline.
+
+LocalS3Client is a filesystem-backed object store. LocalDynamoTable is a
+sqlite-backed table. Each implements the subset of the boto3 API the
+pipeline calls, so uploads and metadata writes can be exercised and
+benchmarked with no network or credentials. An optional per-request
+latency emulates the round trip to the real service.
+"""
+
+import hashlib
+import io
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+
+class LocalS3Client:
+    """Filesystem-backed subset of the boto3 S3 client."""
+
+    def __init__(self, root_dir: str, latency_ms: float = 0.0, failure_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            root_dir: Directory holding one sub-directory per bucket
+            latency_ms: Simulated round-trip time added to every request
+            failure_rate: Fraction of requests that fail before doing anything,
+                to exercise retries
+            seed: Seed for the failure injection
+        """
+        self.root = Path(root_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.latency = latency_ms / 1000.0
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._multipart: Dict[str, Dict] = {}
+        self.request_count = 0
+
+    def _request(self):
+        with self._lock:
+            self.request_count += 1
+            fail = self.failure_rate and self._random.random() < self.failure_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise ConnectionError("Simulated S3 request failure")
+
+    def _object_path(self, bucket: str, key: str) -> Path:
+        path = self.root / bucket / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _store(self, bucket: str, key: str, data: bytes, metadata: Optional[Dict], etag: str):
+        path = self._object_path(bucket, key)
+        # Write-then-rename keeps a concurrent or retried PUT atomic
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        path.with_name(path.name + '.meta.json').write_text(
+            json.dumps({'Metadata': metadata or {}, 'ETag': etag, 'ContentLength': len(data)})
+        )
+
+    def put_object(self, Bucket: str, Key: str, Body, Metadata: Optional[Dict] = None, **kwargs) -> Dict:
+        self._request()
+        data = Body.read() if hasattr(Body, 'read') else bytes(Body)
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        self._store(Bucket, Key, data, Metadata, etag)
+        return {'ETag': etag}
+
+    def get_object(self, Bucket: str, Key: str, **kwargs) -> Dict:
+        self._request()
+        path = self.root / Bucket / Key
+        info = self._read_meta(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        return {'Body': io.BytesIO(data), 'Metadata': info['Metadata'],
+                'ETag': info['ETag'], 'ContentLength': len(data)}
+
+    def head_object(self, Bucket: str, Key: str, **kwargs) -> Dict:
+        self._request()
+        return self._read_meta(self.root / Bucket / Key)
+
+    @staticmethod
+    def _read_meta(path: Path) -> Dict:
+        meta_path = path.with_name(path.name + '.meta.json')
+        if not meta_path.exists():
+            raise FileNotFoundError(f"NoSuchKey: {path}")
+        return json.loads(meta_path.read_text())
+
+    def create_multipart_upload(self, Bucket: str, Key: str, Metadata: Optional[Dict] = None, **kwargs) -> Dict:
+        self._request()
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._multipart[upload_id] = {'parts': {}, 'metadata': Metadata}
+        return {'UploadId': upload_id, 'Bucket': Bucket, 'Key': Key}
+
+    def upload_part(self, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body, **kwargs) -> Dict:
+        self._request()
+        data = Body.read() if hasattr(Body, 'read') else bytes(Body)
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        with self._lock:
+            self._multipart[UploadId]['parts'][PartNumber] = (etag, data)
+        return {'ETag': etag}
+
+    def complete_multipart_upload(self, Bucket: str, Key: str, UploadId: str, MultipartUpload: Dict,
+                                  **kwargs) -> Dict:
+        self._request()
+        with self._lock:
+            upload = self._multipart.get(UploadId)
+        if upload is None:
+            # Completing twice (a retried request that already succeeded) is a no-op
+            return {'Bucket': Bucket, 'Key': Key, 'ETag': self._read_meta(self.root / Bucket / Key)['ETag']}
+
+        chunks, digests = [], b''
+        for part in MultipartUpload['Parts']:
+            etag, data = upload['parts'][part['PartNumber']]
+            if etag != part['ETag']:
+                raise ValueError(f"InvalidPart: ETag mismatch for part {part['PartNumber']}")
+            chunks.append(data)
+            digests += bytes.fromhex(etag.strip('"'))
+
+        etag = f'"{hashlib.md5(digests).hexdigest()}-{len(chunks)}"'
+        self._store(Bucket, Key, b''.join(chunks), upload['metadata'], etag)
+        with self._lock:
+            self._multipart.pop(UploadId, None)
+        return {'Bucket': Bucket, 'Key': Key, 'ETag': etag}
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str, **kwargs) -> Dict:
+        self._request()
+        with self._lock:
+            self._multipart.pop(UploadId, None)
+        return {}
+
+
+class LocalDynamoTable:
+    """
+    sqlite-backed subset of a boto3 DynamoDB Table resource.
+
+    Items are keyed by their ``pk``/``sk`` attributes. Like the boto3
+    serializer, floats are rejected (use Decimal). ``table.meta.client``
+    provides ``batch_write_item``. ``unprocessed_rate`` hands that fraction of
+    each batch back as UnprocessedItems, as a throttled table would.
+    """
+
+    def __init__(self, name: str, db_path: str = ':memory:', latency_ms: float = 0.0,
+                 unprocessed_rate: float = 0.0, seed: Optional[int] = None):
+        self.name = name
+        self.latency = latency_ms / 1000.0
+        self.unprocessed_rate = unprocessed_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        if db_path != ':memory:':
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS items (pk TEXT, sk TEXT, item TEXT, PRIMARY KEY (pk, sk))")
+        self.request_count = 0
+        self.meta = SimpleNamespace(client=SimpleNamespace(batch_write_item=self.batch_write_item))
+
+    def _request(self):
+        with self._lock:
+            self.request_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    @staticmethod
+    def _encode(item: Dict) -> str:
+        def default(value):
+            if isinstance(value, Decimal):
+                return str(value)
+            raise TypeError(f"Unsupported type {type(value).__name__}")
+
+        def check(value):
+            if isinstance(value, float):
+                raise TypeError("Float types are not supported. Use Decimal types instead.")
+            if isinstance(value, dict):
+                for v in value.values():
+                    check(v)
+            elif isinstance(value, (list, tuple)):
+                for v in value:
+                    check(v)
+
+        check(item)
+        return json.dumps(item, default=default)
+
+    def _write(self, items: List[Dict]):
+        rows = [(item['pk'], item['sk'], self._encode(item)) for item in items]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO items VALUES (?, ?, ?)", rows)
+            self._db.commit()
+
+    def put_item(self, Item: Dict, **kwargs) -> Dict:
+        self._request()
+        self._write([Item])
+        return {}
+
+    def get_item(self, Key: Dict, **kwargs) -> Dict:
+        self._request()
+        with self._lock:
+            row = self._db.execute("SELECT item FROM items WHERE pk = ? AND sk = ?",
+                                   (Key['pk'], Key['sk'])).fetchone()
+        return {'Item': json.loads(row[0])} if row else {}
+
+    def batch_write_item(self, RequestItems: Dict, **kwargs) -> Dict:
+        self._request()
+        requests = RequestItems.get(self.name, [])
+        if len(requests) > 25:
+            raise ValueError("ValidationException: Too many items requested for the BatchWriteItem call")
+
+        written, unprocessed = [], []
+        with self._lock:
+            for request in requests:
+                if self.unprocessed_rate and self._random.random() < self.unprocessed_rate:
+                    unprocessed.append(request)
+                else:
+                    written.append(request['PutRequest']['Item'])
+        self._write(written)
+        return {'UnprocessedItems': {self.name: unprocessed} if unprocessed else {}}
+
+    @property
+    def item_count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM items").fetchone()[0]
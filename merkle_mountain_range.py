@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Merkle Mountain Range accumulator for append-only commitments.
+
+An MMR is a list of perfect binary trees ("mountains") of strictly
+decreasing height, one per set bit of the leaf count. Appending a leaf
+pushes a height-0 peak and merges equal-height peaks, so each append hashes
+O(log n) nodes and only the peaks have to be kept. Parents use the same
+rule as compact_merkle, SHA3-256(hex(left) + hex(right)).
+
+The root "bags" the peaks right to left: H(p0, H(p1, ... H(pk-1, pk))).
+When the leaf count is a power of two there is a single peak, and the root
+equals the CompactMerkleTree root over the same leaves.
+"""
+
+import binascii
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from compact_merkle import CompactMerkleTree, hash_children
+
+
+def peak_heights(leaf_count: int) -> List[int]:
+    """Heights of the mountains for ``leaf_count`` leaves, tallest (leftmost) first."""
+    return [height for height in range(leaf_count.bit_length() - 1, -1, -1) if leaf_count >> height & 1]
+
+
+def bag_peaks(peaks: List[bytes]) -> Optional[bytes]:
+    """Fold peak digests right to left into a single root digest."""
+    if not peaks:
+        return None
+    root = peaks[-1]
+    for peak in reversed(peaks[:-1]):
+        root = hash_children(peak, root)
+    return root
+
+
+class MerkleMountainRange:
+    """Append-only Merkle accumulator holding only its peaks."""
+
+    def __init__(self, leaf_count: int = 0, peaks: Iterable[str] = ()):
+        self.leaf_count = leaf_count
+        self._peaks: List[bytes] = [binascii.unhexlify(peak) for peak in peaks]
+        if len(self._peaks) != len(peak_heights(leaf_count)):
+            raise ValueError(f"{len(self._peaks)} peaks do not match a range of {leaf_count} leaves")
+        # Parent hashes computed by appends, to show the O(log n) cost
+        self.hash_count = 0
+
+    def append(self, leaf_hash: str) -> str:
+        """Add one leaf and return the new root."""
+        node = binascii.unhexlify(leaf_hash)
+        height = 0
+        # Each trailing set bit of the old count is a peak of the height being merged
+        while self.leaf_count >> height & 1:
+            node = hash_children(self._peaks.pop(), node)
+            self.hash_count += 1
+            height += 1
+        self._peaks.append(node)
+        self.leaf_count += 1
+        return self.root
+
+    def extend(self, leaf_hashes: Iterable[str]) -> Optional[str]:
+        """Append several leaves and return the root after the last one."""
+        for leaf_hash in leaf_hashes:
+            self.append(leaf_hash)
+        return self.root
+
+    @property
+    def peaks(self) -> List[str]:
+        return [peak.hex() for peak in self._peaks]
+
+    @property
+    def root(self) -> Optional[str]:
+        root = bag_peaks(self._peaks)
+        return root.hex() if root is not None else None
+
+    @property
+    def height(self) -> int:
+        """Levels of the tallest mountain, leaves and peak included."""
+        return self.leaf_count.bit_length()
+
+    def to_dict(self) -> Dict:
+        return {'leaf_count': self.leaf_count, 'peaks': self.peaks, 'root': self.root}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MerkleMountainRange':
+        return cls(data['leaf_count'], data['peaks'])
+
+
+def _mountain_of(leaf_count: int, leaf_index: int) -> Tuple[int, int, int]:
+    """Return ``(peak position, first leaf, height)`` of the mountain holding ``leaf_index``."""
+    start = 0
+    for position, height in enumerate(peak_heights(leaf_count)):
+        if leaf_index < start + (1 << height):
+            return position, start, height
+        start += 1 << height
+    raise IndexError(f"Leaf {leaf_index} out of range for {leaf_count} leaves")
+
+
+def mmr_authentication_path(leaf_hashes: List[str], leaf_index: int) -> List[Dict[str, str]]:
+    """
+    Authentication path of one leaf, leaf level first.
+
+    MMR paths do not follow the leaf index bits past the peak, so every step
+    names the side its sibling sits on: ``{'hash': ..., 'side': 'left'|'right'}``.
+    The in-mountain part is derived from the mountain's leaves; the rest is
+    the bag of the peaks to the right, then each peak to the left.
+    """
+    leaf_count = len(leaf_hashes)
+    position, start, height = _mountain_of(leaf_count, leaf_index)
+
+    path = []
+    mountain = CompactMerkleTree(leaf_hashes[start:start + (1 << height)])
+    local_index = leaf_index - start
+    for sibling in mountain.get_authentication_path(local_index):
+        path.append({'hash': sibling, 'side': 'left' if local_index & 1 else 'right'})
+        local_index //= 2
+
+    peaks, offset = [], 0
+    for peak_height in peak_heights(leaf_count):
+        peaks.append(CompactMerkleTree(leaf_hashes[offset:offset + (1 << peak_height)]).root_digest)
+        offset += 1 << peak_height
+
+    right_bag = bag_peaks(peaks[position + 1:])
+    if right_bag is not None:
+        path.append({'hash': right_bag.hex(), 'side': 'right'})
+    for peak in reversed(peaks[:position]):
+        path.append({'hash': peak.hex(), 'side': 'left'})
+    return path
+
+
+def verify_mmr_path(leaf_hash: str, path: List[Dict[str, str]], root: str) -> bool:
+    """Check that ``path`` leads from ``leaf_hash`` to ``root``."""
+    node = binascii.unhexlify(leaf_hash)
+    for step in path:
+        sibling = binascii.unhexlify(step['hash'])
+        node = hash_children(sibling, node) if step['side'] == 'left' else hash_children(node, sibling)
+    return node.hex() == root
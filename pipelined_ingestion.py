@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Pipelined ingestion engine for the ZK Data Integrity Audit System.
+
+CloudDataIngestionPipeline.process_file runs its stages one after another:
+split, commit, upload, then metadata. Here they overlap. The splitter hands
+each block to writer threads, which write and SHA3-hash it in one pass.
+Written blocks flow on to S3 upload workers, and uploaded blocks flow to
+batched DynamoDB writers. Every hand-off is a bounded queue, so a slow stage
+pushes back on the splitter and only a few blocks per stage are ever held
+in memory. The Merkle commitment is finalized once the last leaf hash has
+arrived.
+"""
+
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from block_compression import check_compression
+from block_splitter import (
+    BYTE_ENGINES, DEFAULT_STREAM_CHUNK_ROWS, ENGINES, frame_header_bytes, iter_block_frames,
+    iter_block_frames_streaming, iter_byte_blocks, padding_block_digest, plan_block_count,
+    read_csv_header, scan_csv_schema, write_block_bytes, write_block_frame
+)
+from dynamodb_writer import BATCH_WRITE_LIMIT, DEFAULT_WRITE_CONCURRENCY, write_batch
+from s3_transfer import DEFAULT_MULTIPART_THRESHOLD, DEFAULT_UPLOAD_CONCURRENCY, upload_block
+
+# Blocks each queue may hold before the stage feeding it blocks
+DEFAULT_QUEUE_DEPTH = 8
+
+# pandas serialization holds the GIL, so more writer threads only pay off
+# with the raw engine, whose hashing and file writes release it
+DEFAULT_WRITE_WORKERS = 1
+
+# How often a blocked stage re-checks whether another stage has failed
+_POLL_SECONDS = 0.1
+_DONE = object()
+
+
+class _Aborted(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+
+class StageStats:
+    """Busy time and item count of one pipeline stage."""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, items: int = 1):
+        with self._lock:
+            self.items += items
+            self.busy_seconds += seconds
+
+    def utilization(self, wall_seconds: float) -> float:
+        """Fraction of the stage's worker-time spent working."""
+        if wall_seconds <= 0:
+            return 0.0
+        return self.busy_seconds / (wall_seconds * self.workers)
+
+
+class PipelinedIngestion:
+    """
+    Overlapping split / write+hash / upload / metadata stages for one file.
+
+    Reuses the clients and record builders of a CloudDataIngestionPipeline.
+    DynamoDB block items are written as soon as a block is uploaded, before
+    the tree exists, so they carry no authentication path; paths live in
+    the commitment (see get_commitment_authentication_path).
+    """
+
+    def __init__(self, pipeline,
+                 write_workers: int = DEFAULT_WRITE_WORKERS,
+                 upload_concurrency: int = DEFAULT_UPLOAD_CONCURRENCY,
+                 dynamodb_concurrency: int = DEFAULT_WRITE_CONCURRENCY,
+                 queue_depth: int = DEFAULT_QUEUE_DEPTH,
+                 upload_to_cloud: bool = True,
+                 multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD):
+        self.pipeline = pipeline
+        self.write_workers = max(1, write_workers)
+        self.upload_to_s3 = upload_to_cloud and pipeline.s3_client is not None
+        self.upload_metadata = upload_to_cloud and pipeline.table is not None
+        self.upload_concurrency = max(1, upload_concurrency) if self.upload_to_s3 else 0
+        self.dynamodb_concurrency = max(1, dynamodb_concurrency) if self.upload_metadata else 0
+        self.queue_depth = max(1, queue_depth)
+        self.multipart_threshold = multipart_threshold
+
+        self.stats = {
+            'split': StageStats('split', 1),
+            'write+hash': StageStats('write+hash', self.write_workers),
+            'upload': StageStats('upload', self.upload_concurrency),
+            'metadata': StageStats('metadata', self.dynamodb_concurrency),
+            'commit': StageStats('commit', 1),
+        }
+        self.wall_seconds = 0.0
+        self._error: Optional[BaseException] = None
+        self._error_lock = threading.Lock()
+        self._metadata_lock = threading.Lock()
+
+    # Queue helpers that give up as soon as any stage has failed
+
+    def _fail(self, error: BaseException):
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+
+    def _put(self, q: queue.Queue, item):
+        while True:
+            if self._error is not None:
+                raise _Aborted()
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: queue.Queue):
+        while True:
+            if self._error is not None:
+                raise _Aborted()
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+    def _start_workers(self, count: int, target, *args) -> List[threading.Thread]:
+        def guarded():
+            try:
+                target(*args)
+            except _Aborted:
+                pass
+            except BaseException as e:
+                self._fail(e)
+
+        threads = [threading.Thread(target=guarded, daemon=True) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _finish_stage(self, threads: List[threading.Thread], q: Optional[queue.Queue]):
+        """Send one end marker per worker and wait for the stage to drain."""
+        if q is not None:
+            for _ in threads:
+                self._put(q, _DONE)
+        for thread in threads:
+            thread.join()
+
+    # Stages
+
+    def _split(self, input_file: str, target_block_size_mb: float, streaming: bool,
+               stream_chunk_rows: int, engine: str, compact_dtypes: bool = False,
+               dtypes: Optional[Dict[str, str]] = None):
+        """
+        Yield ``(block_index, payload, row_count)`` per block, padding included.
+
+        ``payload`` is a DataFrame (pandas engine) or the block's source bytes
+        without the header (raw and cdc engines).
+        """
+        target_block_size_bytes = int(target_block_size_mb * 1024 * 1024)
+
+        if engine in BYTE_ENGINES:
+            self.header = read_csv_header(input_file)
+            blocks = iter_byte_blocks(input_file, target_block_size_bytes, engine)
+            for block_index, (data, row_count) in enumerate(blocks):
+                yield block_index, data, row_count
+            return
+
+        _, power_of_2_blocks = plan_block_count(os.path.getsize(input_file), target_block_size_mb)
+        read_dtypes = dict(dtypes or {})
+        if streaming or compact_dtypes:
+            columns, scanned_dtypes, _ = scan_csv_schema(input_file, stream_chunk_rows, compact_dtypes)
+            read_dtypes = {**scanned_dtypes, **read_dtypes}
+        if streaming:
+            block_frames = iter_block_frames_streaming(
+                input_file, power_of_2_blocks, target_block_size_bytes,
+                columns, read_dtypes, stream_chunk_rows
+            )
+        else:
+            block_frames = iter_block_frames(pd.read_csv(input_file, dtype=read_dtypes or None),
+                                             power_of_2_blocks, target_block_size_bytes)
+        for block_index, frame in enumerate(block_frames):
+            yield block_index, frame, len(frame)
+
+    def _padding_digest(self, payload) -> Tuple[str, int]:
+        if isinstance(payload, bytes):
+            return padding_block_digest(self.header)
+        return padding_block_digest(frame_header_bytes(payload.columns))
+
+    def _write_worker(self, write_q: queue.Queue, upload_q: Optional[queue.Queue]):
+        stats = self.stats['write+hash']
+        while True:
+            item = self._get(write_q)
+            if item is _DONE:
+                return
+            block_index, payload, row_count = item
+
+            start = time.perf_counter()
+            block_id = f"block_{block_index + 1:04d}"
+            block_file = os.path.join(self.blocks_dir, f"{block_id}.csv")
+            if isinstance(payload, bytes):
+                block_hash, size_bytes = write_block_bytes(block_file, self.header, payload,
+                                                           compression=self.compression)
+            else:
+                block_hash, size_bytes = write_block_frame(payload, block_file, self.compression)
+            block = self.pipeline._block_metadata(block_id, block_hash, row_count, size_bytes,
+                                                  self.upload_id, block_file,
+                                                  self.pipeline._stored_file(block_file, self.compression))
+            with self._metadata_lock:
+                self.block_metadata[block_index] = block
+            stats.record(time.perf_counter() - start)
+
+            if upload_q is not None:
+                self._put(upload_q, (block_index, block))
+
+    def _upload_worker(self, upload_q: queue.Queue, metadata_q: Optional[queue.Queue]):
+        stats = self.stats['upload']
+        while True:
+            item = self._get(upload_q)
+            if item is _DONE:
+                return
+            block_index, block = item
+
+            start = time.perf_counter()
+            upload = self.pipeline._block_upload(self.upload_id, block)
+            upload_block(self.pipeline.s3_client, self.pipeline.s3_bucket, upload,
+                         multipart_threshold=self.multipart_threshold)
+            block['s3_bucket'] = self.pipeline.s3_bucket
+            block['s3_key'] = upload.key
+            stats.record(time.perf_counter() - start)
+
+            if metadata_q is not None:
+                self._put(metadata_q, (block_index, block))
+
+    def _metadata_worker(self, metadata_q: queue.Queue):
+        stats = self.stats['metadata']
+        table = self.pipeline.table
+        batch = []
+
+        def flush():
+            start = time.perf_counter()
+            write_batch(table.meta.client, table.name, batch)
+            stats.record(time.perf_counter() - start, len(batch))
+            batch.clear()
+
+        while True:
+            item = self._get(metadata_q)
+            if item is _DONE:
+                break
+            block_index, block = item
+            batch.append(self.pipeline._block_record(self.upload_id, block_index, block))
+            if len(batch) == BATCH_WRITE_LIMIT:
+                flush()
+        if batch:
+            flush()
+
+    def run(self, input_file: str,
+            target_block_size_mb: float = 2.0,
+            blocks_dir: Optional[str] = None,
+            upload_id: Optional[str] = None,
+            streaming: bool = False,
+            stream_chunk_rows: int = DEFAULT_STREAM_CHUNK_ROWS,
+            engine: str = 'pandas',
+            path_mode: str = 'embedded',
+            compression: str = 'none',
+            compact_dtypes: bool = False,
+            dtypes: Optional[Dict[str, str]] = None) -> Dict:
+        """Ingest one file through the overlapped stages and return its commitment."""
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown block engine '{engine}' (expected one of {ENGINES})")
+        check_compression(compression)
+        self.compression = compression
+
+        self.blocks_dir = blocks_dir or tempfile.mkdtemp(prefix='zk_audit_blocks_')
+        os.makedirs(self.blocks_dir, exist_ok=True)
+        self.upload_id = upload_id or str(uuid.uuid4())
+        self.block_metadata: Dict[int, Dict] = {}
+
+        print(f"📁 Processing file: {input_file}")
+        print(f"🔀 Pipelined stages: {self.write_workers} writers, {self.upload_concurrency} uploaders, "
+              f"{self.dynamodb_concurrency} metadata writers, queue depth {self.queue_depth}")
+
+        write_q = queue.Queue(self.queue_depth)
+        upload_q = queue.Queue(self.queue_depth) if self.upload_to_s3 else None
+        metadata_q = queue.Queue(self.queue_depth) if self.upload_to_s3 and self.upload_metadata else None
+
+        start = time.perf_counter()
+        metadata_threads = (self._start_workers(self.dynamodb_concurrency, self._metadata_worker, metadata_q)
+                            if metadata_q is not None else [])
+        upload_threads = (self._start_workers(self.upload_concurrency, self._upload_worker, upload_q, metadata_q)
+                          if upload_q is not None else [])
+        write_threads = self._start_workers(self.write_workers, self._write_worker, write_q, upload_q)
+
+        padding = None
+        split_stats = self.stats['split']
+        try:
+            blocks = self._split(input_file, target_block_size_mb, streaming, stream_chunk_rows, engine,
+                                 compact_dtypes, dtypes)
+            while True:
+                split_start = time.perf_counter()
+                item = next(blocks, None)
+                if item is None:
+                    break
+                block_index, payload, row_count = item
+                split_stats.record(time.perf_counter() - split_start)
+
+                if row_count == 0:
+                    # Virtual padding: committed below, never written or uploaded
+                    if padding is None:
+                        padding = self._padding_digest(payload)
+                    block_id = f"block_{block_index + 1:04d}"
+                    with self._metadata_lock:
+                        self.block_metadata[block_index] = self.pipeline._padding_metadata(
+                            block_id, *padding, self.upload_id
+                        )
+                    continue
+
+                self._put(write_q, item)
+
+            self._finish_stage(write_threads, write_q)
+            self._finish_stage(upload_threads, upload_q)
+            self._finish_stage(metadata_threads, metadata_q)
+        except _Aborted:
+            pass
+        except BaseException as e:
+            # Stop the workers too, then surface the splitter's error below
+            self._fail(e)
+        finally:
+            for thread in write_threads + upload_threads + metadata_threads:
+                thread.join()
+
+        if self._error is not None:
+            raise self._error
+
+        # The last leaf has arrived: finalize the commitment
+        commit_start = time.perf_counter()
+        block_metadata = [self.block_metadata[i] for i in range(len(self.block_metadata))]
+        commitment_data = self.pipeline.create_merkle_commitment(block_metadata, target_block_size_mb, path_mode)
+        if self.upload_to_s3:
+            self.pipeline._upload_commitment(commitment_data)
+        if self.upload_metadata:
+            self.pipeline.table.put_item(Item=self.pipeline._commitment_record(commitment_data))
+        self.stats['commit'].record(time.perf_counter() - commit_start)
+
+        self.wall_seconds = time.perf_counter() - start
+        commitment_data['cloud_upload_success'] = self.upload_to_s3 and self.upload_metadata
+        return commitment_data
+
+    def report(self) -> Dict:
+        """Per-stage items, busy time and utilization, plus end-to-end wall-clock."""
+        return {
+            'wall_seconds': self.wall_seconds,
+            'stages': [
+                {
+                    'stage': stats.name,
+                    'workers': stats.workers,
+                    'items': stats.items,
+                    'busy_seconds': stats.busy_seconds,
+                    'utilization': stats.utilization(self.wall_seconds),
+                }
+                for stats in self.stats.values() if stats.workers
+            ]
+        }
+
+    def print_report(self):
+        report = self.report()
+        print(f"\n⏱️  Pipelined ingestion: {report['wall_seconds']:.2f}s end to end")
+        print(f"   {'stage':<12}{'workers':>8}{'items':>8}{'busy s':>9}{'util':>7}")
+        for stage in report['stages']:
+            print(f"   {stage['stage']:<12}{stage['workers']:>8}{stage['items']:>8}"
+                  f"{stage['busy_seconds']:>9.2f}{stage['utilization'] * 100:>6.0f}%")
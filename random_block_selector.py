@@ -8,29 +8,241 @@ import os
 import math
 import secrets
 import hashlib
-from typing import List, Dict, Tuple
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 import json
 from datetime import datetime
 
+# Sample sizing: binomial bound (sampling with replacement) or exact
+# hypergeometric (sampling without replacement from a finite upload)
+SIZING_METHODS = ('binomial', 'hypergeometric')
+
+# Relative slack when comparing a log-gamma miss probability with 1 - confidence,
+# so a sample meeting the target exactly is not rejected for rounding error
+MISS_PROBABILITY_RTOL = 1e-9
+
+# Rounds of the keyed Feistel network behind block selection; four already
+# make a strong pseudorandom permutation (Luby-Rackoff), six leave margin
+FEISTEL_ROUNDS = 6
+
+# Uploads up to this many blocks are shuffled outright (keyed Fisher-Yates):
+# Feistel networks over a few bits are measurably non-uniform
+SMALL_PERMUTATION_SIZE = 256
+
+# Risk multipliers for risk-weighted sampling (see block_risk_weights)
+EDITED_BLOCK_WEIGHT = 8.0
+RECENT_BLOCK_WEIGHT = 4.0
+
+
+def corrupted_block_count(total_blocks: int, corruption_rate: float) -> int:
+    """Fewest corrupted blocks that make up ``corruption_rate`` of the upload (at least one)."""
+    # Rounded first so that e.g. 0.05 * 100 counts as 5 blocks, not 6
+    return max(1, math.ceil(round(corruption_rate * total_blocks, 9)))
+
+
+@lru_cache(maxsize=65536)
+def hypergeometric_miss_probability(sample_size: int, total_blocks: int, corrupted_blocks: int) -> float:
+    """
+    Probability that ``sample_size`` distinct blocks drawn from ``total_blocks``
+    contain none of the ``corrupted_blocks``: C(N-K, n) / C(N, n), via log-gamma.
+    """
+    clean_blocks = total_blocks - corrupted_blocks
+    if sample_size > clean_blocks:
+        return 0.0
+    if sample_size <= 0:
+        return 1.0
+    log_miss = (math.lgamma(clean_blocks + 1) - math.lgamma(clean_blocks - sample_size + 1)
+                + math.lgamma(total_blocks - sample_size + 1) - math.lgamma(total_blocks + 1))
+    return math.exp(log_miss)
+
+
+@lru_cache(maxsize=4096)
+def hypergeometric_sample_size(total_blocks: int, corrupted_blocks: int, confidence_level: float) -> int:
+    """
+    Smallest n whose sample of distinct blocks hits at least one of the
+    ``corrupted_blocks`` with probability ``confidence_level``.
+
+    The miss probability falls monotonically with n and is zero once n
+    exceeds the clean blocks, so a bisection over [1, N - K + 1] finds n
+    in O(log N) log-gamma evaluations.
+    """
+    fail_prob = (1 - confidence_level) * (1 + MISS_PROBABILITY_RTOL)
+    low, high = 1, total_blocks - corrupted_blocks + 1
+    while low < high:
+        mid = (low + high) // 2
+        if hypergeometric_miss_probability(mid, total_blocks, corrupted_blocks) <= fail_prob:
+            high = mid
+        else:
+            low = mid + 1
+    return low
+
+
+def block_risk_weights(block_metadata: List[Dict], by_size: bool = True,
+                       edited_blocks: Iterable[str] = (), edited_weight: float = EDITED_BLOCK_WEIGHT,
+                       recent_since: Optional[str] = None, recent_weight: float = RECENT_BLOCK_WEIGHT) -> List[float]:
+    """
+    Risk weight of each data block of a commitment, for risk-weighted sampling.
+
+    A block's weight is its size relative to the mean block size (with
+    ``by_size``; otherwise 1), times ``edited_weight`` if its id is in
+    ``edited_blocks`` and times ``recent_weight`` if its ``timestamp`` is
+    at or after ``recent_since`` (ISO format; re-committed blocks get a new
+    timestamp). Virtual padding blocks are left out.
+    """
+    data_blocks = [block for block in block_metadata if not block.get('is_padding', False)]
+    if not data_blocks:
+        raise ValueError("Commitment has no data blocks")
+    edited_blocks = set(edited_blocks)
+    mean_size = sum(block['size_bytes'] for block in data_blocks) / len(data_blocks)
+    
+    weights = []
+    for block in data_blocks:
+        weight = block['size_bytes'] / mean_size if by_size and mean_size else 1.0
+        if block['block_id'] in edited_blocks:
+            weight *= edited_weight
+        if recent_since is not None and block.get('timestamp', '') >= recent_since:
+            weight *= recent_weight
+        weights.append(weight)
+    return weights
+
+
+def inclusion_probabilities(weights: List[float], confidence_level: float,
+                            weight_fraction: float) -> List[float]:
+    """
+    Per-block audit probabilities proportional to risk weight (capped at 1).
+
+    Blocks are included independently, so tampering of a set S is missed
+    with probability prod(1 - pi_i for i in S) <= exp(-sum(pi_i for i in S)).
+    Scaling the weights by -ln(1 - confidence) / (fraction * total weight)
+    makes that bound 1 - ``confidence_level`` for any set holding
+    ``weight_fraction`` of the weight; capped blocks are always audited.
+    """
+    if weight_fraction <= 0 or weight_fraction >= 1:
+        raise ValueError("Corruption rate must be between 0 and 1")
+    if not weights or min(weights) < 0 or sum(weights) <= 0:
+        raise ValueError("Weights must be non-negative with a positive total")
+    scale = -math.log(1 - confidence_level) / (weight_fraction * sum(weights))
+    return [min(1.0, scale * weight) for weight in weights]
+
+
+def worst_case_detection(probabilities: List[float], block_count: int) -> float:
+    """Chance of auditing at least one of ``block_count`` tampered blocks placed where audits are least likely."""
+    miss = 1.0
+    for probability in sorted(probabilities)[:block_count]:
+        miss *= 1 - probability
+    return 1 - miss
+
+
+def weighted_detection(weights: List[float], probabilities: List[float], weight_fraction: float) -> float:
+    """
+    Lower bound on the chance of auditing tampering of any blocks holding
+    ``weight_fraction`` of the weight, given their inclusion probabilities.
+
+    A set holding a capped block (pi = 1) is always audited. An uncapped set
+    is missed with probability <= exp(-sum(pi_i)), which is largest for the
+    lowest-probability blocks; the last of them counts only for the weight
+    still needed. When the uncapped blocks hold less than the share, every
+    such set holds a capped block and detection is certain.
+    """
+    needed = weight_fraction * sum(weights)
+    total_probability = 0.0
+    for probability, weight in sorted((p, w) for p, w in zip(probabilities, weights) if p < 1):
+        if weight >= needed:
+            return 1 - math.exp(-(total_probability + probability * needed / weight))
+        total_probability += probability
+        needed -= weight
+    return 1.0
+
+
+class KeyedPermutation:
+    """
+    Pseudorandom permutation of ``range(size)`` keyed by an audit seed.
+
+    A balanced Feistel network over the smallest even-width bit domain that
+    covers ``size``, with keyed BLAKE2b as the round function; outputs that
+    land outside ``range(size)`` are encrypted again (cycle walking). The
+    domain is under 4 * size, so each index costs fewer than four network
+    evaluations on average, needs no state, and ``permutation[i]`` for
+    i = 0, 1, 2, ... is a stream of distinct indices in seeded order.
+    Sizes up to SMALL_PERMUTATION_SIZE use a keyed Fisher-Yates shuffle.
+    """
+
+    def __init__(self, seed: bytes, size: int):
+        if size <= 0:
+            raise ValueError("Permutation size must be positive")
+        self.size = size
+        self.half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+        self.half_mask = (1 << self.half_bits) - 1
+        keyed_hash = hashlib.blake2b(key=seed[:64], digest_size=8, person=b'zk-block-select')
+        # One pre-tagged hasher per round (tag 0xFF drives the small-size shuffle)
+        self._hashers = {}
+        for tag in (*range(FEISTEL_ROUNDS), 0xFF):
+            self._hashers[tag] = keyed_hash.copy()
+            self._hashers[tag].update(bytes((tag,)))
+        self._shuffled = self._shuffle() if size <= SMALL_PERMUTATION_SIZE else None
+
+    def _hash(self, tag: int, value: int) -> int:
+        hasher = self._hashers[tag].copy()
+        hasher.update(value.to_bytes(8, 'big'))
+        return int.from_bytes(hasher.digest(), 'big')
+
+    def _shuffle(self) -> List[int]:
+        indices = list(range(self.size))
+        for i in range(self.size - 1, 0, -1):
+            # 64-bit draws, so the modulo bias is below 2^-56 at these sizes
+            j = self._hash(0xFF, i) % (i + 1)
+            indices[i], indices[j] = indices[j], indices[i]
+        return indices
+
+    def _encrypt(self, value: int) -> int:
+        left, right = value >> self.half_bits, value & self.half_mask
+        for round_index in range(FEISTEL_ROUNDS):
+            left, right = right, left ^ (self._hash(round_index, right) & self.half_mask)
+        return (left << self.half_bits) | right
+
+    def __getitem__(self, index: int) -> int:
+        if not 0 <= index < self.size:
+            raise IndexError("Permutation index out of range")
+        if self._shuffled is not None:
+            return self._shuffled[index]
+        value = self._encrypt(index)
+        while value >= self.size:
+            value = self._encrypt(value)
+        return value
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[int]:
+        return (self[index] for index in range(self.size))
+
 
 class RandomBlockSelector:
     """
     Cryptographically secure random block selector with statistical confidence guarantees.
     
     Uses binomial probability to calculate minimum sample size needed for 95% confidence
-    that we'll detect corruption if it exists in the dataset.
+    that we'll detect corruption if it exists in the dataset, or with
+    ``sizing='hypergeometric'`` the exact probability for sampling distinct
+    blocks from a finite upload, which needs fewer blocks.
     """
     
-    def __init__(self, confidence_level: float = 0.95, min_corruption_rate: float = 0.05):
+    def __init__(self, confidence_level: float = 0.95, min_corruption_rate: float = 0.05,
+                 sizing: str = 'binomial'):
         """
         Initialize the block selector.
         
         Args:
             confidence_level: Probability of detecting corruption (default: 0.95 = 95%)
             min_corruption_rate: Minimum corruption rate we want to detect (default: 0.05 = 5%)
+            sizing: Sample sizing method, one of SIZING_METHODS (default: binomial)
         """
+        if sizing not in SIZING_METHODS:
+            raise ValueError(f"Unknown sizing method '{sizing}' (expected one of {SIZING_METHODS})")
         self.confidence_level = confidence_level
         self.min_corruption_rate = min_corruption_rate
+        self.sizing = sizing
         self.random_seed = None
     
     def calculate_sample_size(self, total_blocks: int, 
@@ -46,6 +258,10 @@ class RandomBlockSelector:
         
         We want: 1 - (1 - p)^n >= confidence_level
         Solving for n: n >= log(1 - confidence_level) / log(1 - p)
+        
+        With ``sizing='hypergeometric'`` the upload holds K = ceil(p * N)
+        corrupted blocks and P(detect 0 corrupted) = C(N - K, n) / C(N, n)
+        exactly; n is the smallest sample meeting the confidence level.
         """
         if corruption_rate is None:
             corruption_rate = self.min_corruption_rate
@@ -56,12 +272,17 @@ class RandomBlockSelector:
         if total_blocks <= 0:
             raise ValueError("Total blocks must be positive")
         
-        # Calculate theoretical minimum sample size
-        fail_prob = 1 - self.confidence_level  # Probability of missing corruption
-        
-        # n >= log(fail_prob) / log(1 - corruption_rate)
-        theoretical_min = math.log(fail_prob) / math.log(1 - corruption_rate)
-        min_sample_size = math.ceil(theoretical_min)
+        if self.sizing == 'hypergeometric':
+            min_sample_size = hypergeometric_sample_size(
+                total_blocks, corrupted_block_count(total_blocks, corruption_rate), self.confidence_level
+            )
+        else:
+            # Calculate theoretical minimum sample size
+            fail_prob = 1 - self.confidence_level  # Probability of missing corruption
+            
+            # n >= log(fail_prob) / log(1 - corruption_rate)
+            theoretical_min = math.log(fail_prob) / math.log(1 - corruption_rate)
+            min_sample_size = math.ceil(theoretical_min)
         
         # Ensure we don't sample more blocks than available
         sample_size = min(min_sample_size, total_blocks)
@@ -99,7 +320,8 @@ class RandomBlockSelector:
     def select_random_blocks(self, total_blocks: int, 
                            user_id: str, upload_id: str,
                            corruption_rate: float = None,
-                           audit_timestamp: str = None) -> List[int]:
+                           audit_timestamp: str = None,
+                           padding_blocks: int = 0) -> List[int]:
         """
         Select random blocks for auditing using cryptographically secure randomness.
         
@@ -109,42 +331,75 @@ class RandomBlockSelector:
             upload_id: Upload identifier for deterministic seed generation
             corruption_rate: Expected corruption rate (default: uses min_corruption_rate)
             audit_timestamp: Timestamp for audit (default: current time)
+            padding_blocks: Virtual padding leaves at the end of the tree; they
+                hold no data, so only the first total_blocks - padding_blocks
+                blocks are sampled
             
         Returns:
             List of block indices to audit (0-based indexing)
         """
-        # Calculate required sample size
-        sample_size = self.calculate_sample_size(total_blocks, corruption_rate)
+        auditable_blocks = self._auditable_blocks(total_blocks, padding_blocks)
+        sample_size = self.calculate_sample_size(auditable_blocks, corruption_rate)
+        return sorted(self.iter_random_blocks(total_blocks, user_id, upload_id, sample_size,
+                                              audit_timestamp, padding_blocks))
+    
+    def iter_random_blocks(self, total_blocks: int, user_id: str, upload_id: str,
+                           sample_size: int = None, audit_timestamp: str = None,
+                           padding_blocks: int = 0) -> Iterator[int]:
+        """
+        Stream distinct block indices in seeded order.
+        
+        The indices are the first ``sample_size`` outputs of a
+        ``KeyedPermutation`` of the data blocks keyed by the audit seed, so
+        any prefix is a uniformly drawn sample, the same parameters always
+        give the same order, and memory stays constant however large the
+        sample. ``sample_size=None`` streams every data block.
+        """
+        auditable_blocks = self._auditable_blocks(total_blocks, padding_blocks)
+        if sample_size is None:
+            sample_size = auditable_blocks
+        if not 0 <= sample_size <= auditable_blocks:
+            raise ValueError("Sample size must be between 0 and the number of data blocks")
         
-        # Generate cryptographic seed
         seed = self.generate_cryptographic_seed(user_id, upload_id, audit_timestamp)
+        return islice(KeyedPermutation(seed, auditable_blocks), sample_size)
+    
+    def select_weighted_blocks(self, weights: List[float], user_id: str, upload_id: str,
+                               corruption_rate: float = None,
+                               audit_timestamp: str = None) -> List[int]:
+        """
+        Select blocks with probability proportional to their risk weight.
         
-        # Use secrets module for cryptographically secure random selection
-        # We'll use the seed to initialize a deterministic PRNG
-        selected_indices = set()
-        
-        # Create a deterministic random sequence from the seed
-        # We'll hash the seed with an incrementing counter to generate random bytes
-        counter = 0
-        while len(selected_indices) < sample_size:
-            # Create unique input for this iteration
-            hasher = hashlib.sha256()
-            hasher.update(seed)
-            hasher.update(counter.to_bytes(4, 'big'))
-            hash_bytes = hasher.digest()
-            
-            # Convert first 4 bytes to integer and mod by total_blocks
-            random_int = int.from_bytes(hash_bytes[:4], 'big')
-            block_index = random_int % total_blocks
-            
-            selected_indices.add(block_index)
-            counter += 1
-            
-            # Prevent infinite loop in edge cases
-            if counter > total_blocks * 10:
-                break
+        Each block is audited independently with its inclusion probability
+        (see inclusion_probabilities), decided by a keyed hash of the audit
+        seed and the block index, so the same parameters always give the
+        same selection. ``corruption_rate`` is read as a share of the total
+        weight: tampering of blocks holding at least that share is detected
+        with at least the target confidence. The sample size varies around
+        the sum of the inclusion probabilities.
         
-        return sorted(list(selected_indices))
+        ``weights`` has one entry per data block (see block_risk_weights).
+        """
+        if corruption_rate is None:
+            corruption_rate = self.min_corruption_rate
+        probabilities = inclusion_probabilities(weights, self.confidence_level, corruption_rate)
+        
+        seed = self.generate_cryptographic_seed(user_id, upload_id, audit_timestamp)
+        draw_hash = hashlib.blake2b(key=seed[:64], digest_size=8, person=b'zk-block-weight')
+        selected = []
+        for index, probability in enumerate(probabilities):
+            hasher = draw_hash.copy()
+            hasher.update(index.to_bytes(8, 'big'))
+            if int.from_bytes(hasher.digest(), 'big') < probability * 2 ** 64:
+                selected.append(index)
+        return selected
+    
+    @staticmethod
+    def _auditable_blocks(total_blocks: int, padding_blocks: int) -> int:
+        """Number of data blocks once structural padding is excluded."""
+        if padding_blocks < 0 or padding_blocks >= total_blocks:
+            raise ValueError("Padding blocks must leave at least one data block")
+        return total_blocks - padding_blocks
     
     def calculate_actual_confidence(self, sample_size: int, total_blocks: int,
                                   corruption_rate: float = None) -> float:
@@ -160,6 +415,12 @@ class RandomBlockSelector:
         if sample_size <= 0 or total_blocks <= 0:
             return 0.0
         
+        if self.sizing == 'hypergeometric':
+            miss_prob = hypergeometric_miss_probability(
+                sample_size, total_blocks, corrupted_block_count(total_blocks, corruption_rate)
+            )
+            return 1 - miss_prob
+        
         # Probability of missing corruption = (1 - corruption_rate)^sample_size
         miss_prob = (1 - corruption_rate) ** sample_size
         
@@ -170,7 +431,9 @@ class RandomBlockSelector:
     
     def generate_audit_plan(self, total_blocks: int, user_id: str, upload_id: str,
                           corruption_rates: List[float] = None,
-                          audit_timestamp: str = None) -> Dict:
+                          audit_timestamp: str = None,
+                          padding_blocks: int = 0,
+                          block_weights: Optional[List[float]] = None) -> Dict:
         """
         Generate a complete audit plan with multiple corruption rate scenarios.
         
@@ -179,6 +442,16 @@ class RandomBlockSelector:
         - Confidence levels
         - Statistical guarantees
         - Audit parameters
+        
+        Virtual padding leaves (``padding_blocks``) are never selected and do
+        not count towards the sampled population.
+        
+        With ``block_weights`` (one per data block) blocks are audited by risk
+        weight (select_weighted_blocks). Each corruption rate is then
+        reported twice: ``confidence`` for tampering of blocks holding that
+        share of the risk weight, and ``block_confidence`` for that share of
+        the blocks placed where audits are least likely (the lightest
+        blocks). The second is the worst case and can be far below the first.
         """
         if audit_timestamp is None:
             audit_timestamp = datetime.now().isoformat()
@@ -186,25 +459,58 @@ class RandomBlockSelector:
         if corruption_rates is None:
             corruption_rates = [0.01, 0.05, 0.10, 0.20]  # 1%, 5%, 10%, 20%
         
-        # Select blocks based on the primary corruption rate (min_corruption_rate)
-        selected_blocks = self.select_random_blocks(
-            total_blocks, user_id, upload_id, 
-            corruption_rate=self.min_corruption_rate,
-            audit_timestamp=audit_timestamp
-        )
+        auditable_blocks = self._auditable_blocks(total_blocks, padding_blocks)
+        probabilities = None
+        if block_weights is not None:
+            if len(block_weights) != auditable_blocks:
+                raise ValueError(f"Expected {auditable_blocks} block weights, got {len(block_weights)}")
+            probabilities = inclusion_probabilities(block_weights, self.confidence_level, self.min_corruption_rate)
+            selected_blocks = self.select_weighted_blocks(
+                block_weights, user_id, upload_id,
+                corruption_rate=self.min_corruption_rate,
+                audit_timestamp=audit_timestamp
+            )
+        else:
+            # Select blocks based on the primary corruption rate (min_corruption_rate)
+            selected_blocks = self.select_random_blocks(
+                total_blocks, user_id, upload_id, 
+                corruption_rate=self.min_corruption_rate,
+                audit_timestamp=audit_timestamp,
+                padding_blocks=padding_blocks
+            )
         
         sample_size = len(selected_blocks)
         
         # Calculate confidence for different corruption rates
         confidence_analysis = []
         for rate in corruption_rates:
-            confidence = self.calculate_actual_confidence(sample_size, total_blocks, rate)
-            confidence_analysis.append({
+            if probabilities is None:
+                confidence = self.calculate_actual_confidence(sample_size, auditable_blocks, rate)
+            else:
+                # Capped blocks are certain; the rest is bounded over the least-audited share
+                confidence = weighted_detection(block_weights, probabilities, rate)
+            analysis = {
                 "corruption_rate": rate,
                 "corruption_rate_percent": f"{rate * 100:.1f}%",
                 "confidence": confidence,
                 "confidence_percent": f"{confidence * 100:.2f}%"
-            })
+            }
+            if probabilities is not None:
+                analysis["block_confidence"] = worst_case_detection(
+                    probabilities, corrupted_block_count(auditable_blocks, rate)
+                )
+                analysis["block_confidence_percent"] = f"{analysis['block_confidence'] * 100:.2f}%"
+            confidence_analysis.append(analysis)
+        
+        if probabilities is None:
+            statistical_method = ("exact_hypergeometric" if self.sizing == 'hypergeometric'
+                                  else "binomial_approximation")
+            statistical_guarantee = (f"≥{self.confidence_level * 100:.1f}% chance of detecting "
+                                     f"≥{self.min_corruption_rate * 100:.1f}% corruption")
+        else:
+            statistical_method = "risk_weighted_poisson"
+            statistical_guarantee = (f"≥{self.confidence_level * 100:.1f}% chance of detecting tampering of "
+                                     f"blocks holding ≥{self.min_corruption_rate * 100:.1f}% of the risk weight")
         
         # Generate audit plan
         audit_plan = {
@@ -213,24 +519,29 @@ class RandomBlockSelector:
             "user_id": user_id,
             "upload_id": upload_id,
             "total_blocks": total_blocks,
+            "padding_blocks": padding_blocks,
+            "auditable_blocks": auditable_blocks,
             "selected_blocks": selected_blocks,
             "sample_size": sample_size,
-            "sample_percentage": f"{(sample_size / total_blocks) * 100:.2f}%",
+            "sample_percentage": f"{(sample_size / auditable_blocks) * 100:.2f}%",
             "target_confidence": self.confidence_level,
             "target_confidence_percent": f"{self.confidence_level * 100:.1f}%",
             "min_corruption_rate": self.min_corruption_rate,
             "min_corruption_rate_percent": f"{self.min_corruption_rate * 100:.1f}%",
             "confidence_analysis": confidence_analysis,
             "cryptographic_seed": self.random_seed.hex() if self.random_seed else None,
-            "selection_algorithm": "cryptographic_hash_based",
-            "statistical_method": "binomial_approximation",
+            "selection_algorithm": ("keyed_feistel_permutation" if probabilities is None
+                                    else "keyed_inclusion_draws"),
+            "statistical_method": statistical_method,
             "audit_guarantees": {
                 "deterministic": "Same parameters always produce same selection",
                 "unpredictable": "Selection unpredictable without audit parameters", 
                 "secure": "Uses cryptographically secure hash functions",
-                "statistical": f"≥{self.confidence_level * 100:.1f}% chance of detecting ≥{self.min_corruption_rate * 100:.1f}% corruption"
+                "statistical": statistical_guarantee
             }
         }
+        if probabilities is not None:
+            audit_plan["expected_sample_size"] = sum(probabilities)
         
         return audit_plan
     
@@ -247,7 +558,7 @@ class RandomBlockSelector:
             "statistics": {}
         }
         
-        total_blocks = audit_plan["total_blocks"]
+        total_blocks = audit_plan.get("auditable_blocks", audit_plan["total_blocks"])
         sample_size = audit_plan["sample_size"]
         
         # Check sample size reasonableness
@@ -277,6 +588,8 @@ def main():
     parser = argparse.ArgumentParser(description='ZK Audit System - Random Block Selector')
     parser.add_argument('--total-blocks', type=int, required=True,
                        help='Total number of blocks in dataset')
+    parser.add_argument('--padding-blocks', type=int, default=0,
+                       help='Virtual padding blocks at the end of the tree, excluded from sampling')
     parser.add_argument('--user-id', default='demo_user',
                        help='User ID for audit')
     parser.add_argument('--upload-id', default='demo_upload',
@@ -285,6 +598,16 @@ def main():
                        help='Target confidence level (default: 0.95)')
     parser.add_argument('--min-corruption', type=float, default=0.05,
                        help='Minimum corruption rate to detect (default: 0.05)')
+    parser.add_argument('--sizing', choices=SIZING_METHODS, default='binomial',
+                       help='Sample sizing: binomial bound, or exact hypergeometric for sampling distinct '
+                            'blocks (default: binomial)')
+    parser.add_argument('--risk-weights', metavar='COMMITMENT_JSON',
+                       help='Draw blocks by risk weight from this commitment\'s block sizes; '
+                            '--min-corruption is then a share of the risk weight')
+    parser.add_argument('--edited', default='',
+                       help=f'Comma-separated edited block ids, weighted x{EDITED_BLOCK_WEIGHT:g} (with --risk-weights)')
+    parser.add_argument('--recent-since', metavar='ISO_TIME',
+                       help=f'Blocks with a later timestamp are weighted x{RECENT_BLOCK_WEIGHT:g} (with --risk-weights)')
     parser.add_argument('--output', help='Save audit plan to JSON file')
     
     args = parser.parse_args()
@@ -295,12 +618,22 @@ def main():
     # Initialize selector
     selector = RandomBlockSelector(
         confidence_level=args.confidence,
-        min_corruption_rate=args.min_corruption
+        min_corruption_rate=args.min_corruption,
+        sizing=args.sizing
     )
     
+    block_weights = None
+    if args.risk_weights:
+        with open(args.risk_weights) as f:
+            block_metadata = json.load(f)['block_metadata']
+        block_weights = block_risk_weights(block_metadata, edited_blocks=filter(None, args.edited.split(',')),
+                                           recent_since=args.recent_since)
+    
     # Generate audit plan
     audit_plan = selector.generate_audit_plan(
-        args.total_blocks, args.user_id, args.upload_id
+        args.total_blocks, args.user_id, args.upload_id,
+        padding_blocks=args.padding_blocks,
+        block_weights=block_weights
     )
     
     # Validate plan
@@ -309,7 +642,11 @@ def main():
     # Display results
     print(f"🆔 Audit ID: {audit_plan['audit_id']}")
     print(f"📊 Total blocks: {audit_plan['total_blocks']:,}")
+    if audit_plan['padding_blocks']:
+        print(f"🧱 Padding blocks: {audit_plan['padding_blocks']:,} (structural, not sampled)")
     print(f"🎯 Selected blocks: {audit_plan['sample_size']} ({audit_plan['sample_percentage']})")
+    if 'expected_sample_size' in audit_plan:
+        print(f"⚖️  Risk-weighted: {audit_plan['expected_sample_size']:.1f} blocks expected")
     print(f"📈 Target confidence: {audit_plan['target_confidence_percent']}")
     print(f"🔍 Min corruption rate: {audit_plan['min_corruption_rate_percent']}")
     
@@ -323,6 +660,9 @@ def main():
     for analysis in audit_plan['confidence_analysis']:
         print(f"  {analysis['corruption_rate_percent']} corruption → "
               f"{analysis['confidence_percent']} detection confidence")
+        if 'block_confidence' in analysis:
+            print(f"     (of the risk weight; {analysis['block_confidence_percent']} if it is "
+                  f"{analysis['corruption_rate_percent']} of the blocks, placed at worst)")
     
     print(f"\n✅ Validation:")
     print(f"  Status: {'PASS' if validation['valid'] else 'FAIL'}")
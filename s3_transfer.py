@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Concurrent block upload stage for the ZK Data Integrity Audit System.
+
+Blocks are uploaded by a thread pool. Blocks at or above the multipart
+threshold go up as multipart uploads. Every request is retried with
+exponential backoff. Retrying is safe: a PUT or UploadPart of the same bytes
+to the same key/part number leaves the same object behind.
+"""
+
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from tqdm import tqdm
+
+DEFAULT_UPLOAD_CONCURRENCY = 8
+
+# S3 rejects multipart parts below 5 MiB (except the last one)
+MIN_MULTIPART_PART_SIZE = 5 * 1024 * 1024
+DEFAULT_MULTIPART_THRESHOLD = 16 * 1024 * 1024
+DEFAULT_MULTIPART_PART_SIZE = 8 * 1024 * 1024
+
+DEFAULT_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 0.1
+RETRY_MAX_DELAY = 5.0
+
+
+class BlockUpload(NamedTuple):
+    """
+    One block file to upload and the object it becomes. A packed block is
+    the ``length`` bytes at ``offset`` of its segment file.
+    """
+    key: str
+    path: str
+    metadata: Dict[str, str]
+    offset: int = 0
+    length: Optional[int] = None
+
+
+def backoff_delay(attempt: int, base_delay: float = RETRY_BASE_DELAY,
+                  max_delay: float = RETRY_MAX_DELAY) -> float:
+    """Full-jitter exponential backoff for retry ``attempt`` (0-based)."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def with_retries(request: Callable, *args, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 base_delay: float = RETRY_BASE_DELAY, **kwargs):
+    """Call ``request`` and retry it with backoff until it succeeds or attempts run out."""
+    for attempt in range(max_attempts):
+        try:
+            return request(*args, **kwargs)
+        except Exception:
+            if attempt == max_attempts - 1:
+                raise
+            time.sleep(backoff_delay(attempt, base_delay))
+
+
+def upload_block(s3_client, bucket: str, upload: BlockUpload,
+                 multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD,
+                 part_size: int = DEFAULT_MULTIPART_PART_SIZE,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+    """Upload one block file, as multipart if it is large enough. Returns bytes sent."""
+    size_bytes = upload.length if upload.length is not None else os.path.getsize(upload.path)
+    if size_bytes >= multipart_threshold:
+        _multipart_upload(s3_client, bucket, upload, size_bytes, part_size, max_attempts)
+        return size_bytes
+
+    def put():
+        # Reopened per attempt so a retry never resends a half-consumed stream
+        with open(upload.path, 'rb') as f:
+            if upload.length is None:
+                body = f
+            else:
+                f.seek(upload.offset)
+                body = f.read(upload.length)
+            s3_client.put_object(Bucket=bucket, Key=upload.key, Body=body, Metadata=upload.metadata)
+
+    with_retries(put, max_attempts=max_attempts)
+    return size_bytes
+
+
+def _multipart_upload(s3_client, bucket: str, upload: BlockUpload, size_bytes: int,
+                      part_size: int, max_attempts: int):
+    """Upload a file in parts; the multipart upload is aborted if any part finally fails."""
+    part_size = max(part_size, MIN_MULTIPART_PART_SIZE)
+    response = with_retries(s3_client.create_multipart_upload, Bucket=bucket, Key=upload.key,
+                            Metadata=upload.metadata, max_attempts=max_attempts)
+    multipart_id = response['UploadId']
+
+    try:
+        parts = []
+        with open(upload.path, 'rb') as f:
+            for part_number, offset in enumerate(range(0, size_bytes, part_size), start=1):
+                f.seek(upload.offset + offset)
+                body = f.read(min(part_size, size_bytes - offset))
+                part = with_retries(s3_client.upload_part, Bucket=bucket, Key=upload.key,
+                                    UploadId=multipart_id, PartNumber=part_number, Body=body,
+                                    max_attempts=max_attempts)
+                parts.append({'ETag': part['ETag'], 'PartNumber': part_number})
+
+        with_retries(s3_client.complete_multipart_upload, Bucket=bucket, Key=upload.key,
+                     UploadId=multipart_id, MultipartUpload={'Parts': parts},
+                     max_attempts=max_attempts)
+    except Exception:
+        try:
+            s3_client.abort_multipart_upload(Bucket=bucket, Key=upload.key, UploadId=multipart_id)
+        except Exception:
+            pass  # the original failure is the one worth reporting
+        raise
+
+
+def upload_blocks_concurrently(s3_client, bucket: str, uploads: List[BlockUpload],
+                               concurrency: int = DEFAULT_UPLOAD_CONCURRENCY,
+                               multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD,
+                               part_size: int = DEFAULT_MULTIPART_PART_SIZE,
+                               max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                               progress: bool = True) -> Iterator[BlockUpload]:
+    """
+    Upload blocks with ``concurrency`` requests in flight.
+
+    Yields each ``BlockUpload`` as it completes (in completion order). The
+    first upload that still fails after its retries is re-raised; nothing
+    further is started after that.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {
+            executor.submit(upload_block, s3_client, bucket, upload,
+                            multipart_threshold, part_size, max_attempts): upload
+            for upload in uploads
+        }
+        try:
+            for future in tqdm(as_completed(futures), total=len(futures),
+                               desc="Uploading blocks", disable=not progress):
+                future.result()
+                yield futures[future]
+        finally:
+            for future in futures:
+                future.cancel()
@@ -26,6 +26,15 @@ from pathlib import Path
 from tqdm import tqdm
 from typing import List, Dict, Tuple, Optional
 
+from compact_merkle import PATH_MODES, CompactMerkleTree
+from binary_commitment import write_binary_commitment
+from block_compression import COMPRESSIONS
+from block_splitter import (
+    BYTE_ENGINES, DEFAULT_STREAM_CHUNK_ROWS, ENGINES, frame_header_bytes, iter_block_frames,
+    iter_block_frames_streaming, iter_byte_blocks, padding_block_digest, read_csv_header, scan_csv_schema,
+    write_block_bytes, write_block_frame
+)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -43,64 +52,13 @@ def print_step(step, message):
     """Print a step with formatting"""
     print(f"\n🔧 Step {step}: {message}")
 
-class StandaloneMerkleTree:
-    """Merkle Tree implementation for standalone audit."""
-    
-    def __init__(self, leaves: List[str]):
-        self.leaves = leaves
-        self.tree = self._build_tree(leaves)
-        self.root = self.tree[0][0] if self.tree and len(self.tree[0]) > 0 else None
-        self.leaf_count = len(leaves)
-    
-    def _build_tree(self, leaves: List[str]) -> List[List[str]]:
-        """Build the Merkle tree from leaf nodes."""
-        if not leaves:
-            return []
-        
-        tree = [leaves]  # Level 0: leaves
-        current_level = leaves
-        
-        while len(current_level) > 1:
-            next_level = []
-            for i in range(0, len(current_level), 2):
-                left = current_level[i]
-                right = current_level[i + 1] if i + 1 < len(current_level) else current_level[i]
-                parent_hash = self._compute_sha3_hash(left + right)
-                next_level.append(parent_hash)
-            
-            tree.insert(0, next_level)
-            current_level = next_level
-        
-        return tree
-    
-    def _compute_sha3_hash(self, data: str) -> str:
-        """Compute SHA-3 hash of input data."""
-        hasher = hashlib.sha3_256()
-        hasher.update(data.encode('utf-8'))
-        return hasher.hexdigest()
+class StandaloneMerkleTree(CompactMerkleTree):
+    """
+    Merkle Tree implementation for standalone audit.
     
-    def get_authentication_path(self, leaf_index: int) -> List[str]:
-        """Get authentication path for given leaf index."""
-        if leaf_index >= self.leaf_count or not self.tree:
-            return []
-        
-        auth_path = []
-        current_index = leaf_index
-        
-        for level in range(len(self.tree) - 1, 0, -1):
-            current_level_nodes = self.tree[level]
-            
-            if current_index % 2 == 0:
-                sibling_index = current_index + 1
-            else:
-                sibling_index = current_index - 1
-            
-            if sibling_index < len(current_level_nodes):
-                auth_path.append(current_level_nodes[sibling_index])
-            
-            current_index = current_index // 2
-        
-        return auth_path
+    Levels are packed 32-byte digest buffers (see compact_merkle.py);
+    ``root`` and authentication paths are exposed as hex strings.
+    """
 
 def compute_block_hash(data: bytes) -> str:
     """Compute SHA3-256 hash of block data."""
@@ -108,22 +66,50 @@ def compute_block_hash(data: bytes) -> str:
     hasher.update(data)
     return hasher.hexdigest()
 
-def create_blocks_from_csv(csv_file, upload_id, blocks_dir, block_size_mb=2.0):
+def padding_metadata(block_id: str, padding_hash: str, size_bytes: int, upload_id: str) -> Dict:
+    """Metadata for a virtual padding leaf: committed in the tree, never written to disk."""
+    return {
+        "block_id": block_id,
+        "hash": padding_hash,
+        "row_count": 0,
+        "size_bytes": size_bytes,
+        "size_mb": size_bytes / (1024 * 1024),
+        "is_empty": True,
+        "timestamp": datetime.now().isoformat(),
+        "upload_id": upload_id,
+        "is_padding": True
+    }
+
+def create_blocks_from_csv(csv_file, upload_id, blocks_dir, block_size_mb=2.0, streaming=False,
+                           stream_chunk_rows=DEFAULT_STREAM_CHUNK_ROWS, engine='pandas', compression='none'):
     """
     Create data blocks from CSV file with proper power-of-2 structure and hash calculation
+    
+    With streaming=True the CSV is read in bounded chunks instead of loaded whole.
+    With engine='raw' blocks are cut from the source bytes without pandas;
+    engine='cdc' does the same with content-defined boundaries.
+    compression='gzip'/'zstd' stores the block files compressed; hashes still cover the CSV bytes.
+    Padding blocks up to the power of two are virtual (see padding_metadata).
     """
+    if engine in BYTE_ENGINES:
+        return create_raw_blocks_from_csv(csv_file, upload_id, blocks_dir, block_size_mb, engine, compression)
+    
     print(f"📄 Reading CSV file: {csv_file}")
     
     try:
         # Read the CSV file
-        df = pd.read_csv(csv_file)
+        if streaming:
+            columns, forced_dtypes, total_rows = scan_csv_schema(csv_file, stream_chunk_rows)
+        else:
+            df = pd.read_csv(csv_file)
+            columns, total_rows = list(df.columns), len(df)
         file_size = os.path.getsize(csv_file)
         file_size_mb = file_size / (1024 * 1024)
         
         print(f"📊 File info:")
         print(f"   📏 Size: {file_size_mb:.2f} MB")
-        print(f"   📋 Rows: {len(df)}")
-        print(f"   📰 Columns: {len(df.columns)}")
+        print(f"   📋 Rows: {total_rows}")
+        print(f"   📰 Columns: {len(columns)}")
         
         # Calculate optimal block count (power of 2) - same as cloud_data_ingestion.py
         estimated_blocks = math.ceil(file_size_mb / block_size_mb)
@@ -137,52 +123,48 @@ def create_blocks_from_csv(csv_file, upload_id, blocks_dir, block_size_mb=2.0):
         # Create blocks directory
         blocks_dir.mkdir(parents=True, exist_ok=True)
         
-        total_rows = len(df)
+        if streaming:
+            print(f"🌊 Streaming in chunks of {stream_chunk_rows:,} rows")
+            block_frames = iter_block_frames_streaming(
+                csv_file, power_of_2_blocks, target_block_size_bytes,
+                columns, forced_dtypes, stream_chunk_rows
+            )
+        else:
+            block_frames = iter_block_frames(df, power_of_2_blocks, target_block_size_bytes)
+        
         block_metadata = []
-        current_row = 0
+        padding = None
         
         # Generate blocks with proper metadata
-        for block_index in tqdm(range(power_of_2_blocks), desc="Creating blocks"):
+        for block_index, block_data in enumerate(tqdm(block_frames, total=power_of_2_blocks,
+                                                      desc="Creating blocks")):
             block_id = f"block_{block_index + 1:04d}"
-            block_file = blocks_dir / f"{block_id}.csv"
             
-            if current_row >= total_rows:
-                # Create empty block
-                block_data = pd.DataFrame(columns=df.columns)
-            else:
-                # Estimate rows for target size
-                sample_size = min(1000, total_rows - current_row)
-                if sample_size > 0:
-                    sample_data = df.iloc[current_row:current_row + sample_size]
-                    sample_csv = sample_data.to_csv(index=False)
-                    bytes_per_row = len(sample_csv.encode('utf-8')) / sample_size
-                    target_rows = max(1, int(target_block_size_bytes / bytes_per_row))
-                else:
-                    target_rows = 1
-                
-                end_row = min(current_row + target_rows, total_rows)
-                block_data = df.iloc[current_row:end_row]
-                current_row = end_row
+            if len(block_data) == 0:
+                # Rows are exhausted: the rest is virtual padding
+                if padding is None:
+                    padding = padding_block_digest(frame_header_bytes(block_data.columns))
+                block_metadata.append(padding_metadata(block_id, *padding, upload_id))
+                continue
             
-            # Save block locally
-            block_data.to_csv(block_file, index=False)
+            block_file = blocks_dir / f"{block_id}.csv"
             
-            # Calculate block hash and metadata
-            with open(block_file, 'rb') as f:
-                block_content = f.read()
-                block_hash = compute_block_hash(block_content)
+            # Save block locally, hashing it as it is written
+            block_hash, size_bytes = write_block_frame(block_data, block_file, compression)
             
             metadata = {
                 "block_id": block_id,
                 "hash": block_hash,
                 "row_count": len(block_data),
-                "size_bytes": len(block_content),
-                "size_mb": len(block_content) / (1024 * 1024),
+                "size_bytes": size_bytes,
+                "size_mb": size_bytes / (1024 * 1024),
                 "is_empty": len(block_data) == 0,
                 "timestamp": datetime.now().isoformat(),
                 "upload_id": upload_id,
                 "local_path": str(block_file)
             }
+            if compression != 'none':
+                metadata.update(compression=compression, stored_bytes=block_file.stat().st_size)
             
             block_metadata.append(metadata)
             
@@ -194,7 +176,7 @@ def create_blocks_from_csv(csv_file, upload_id, blocks_dir, block_size_mb=2.0):
         return {
             'total_blocks': power_of_2_blocks,
             'file_size_mb': file_size_mb,
-            'rows_processed': len(df),
+            'rows_processed': total_rows,
             'blocks_dir': str(blocks_dir),
             'block_metadata': block_metadata
         }
@@ -203,8 +185,70 @@ def create_blocks_from_csv(csv_file, upload_id, blocks_dir, block_size_mb=2.0):
         logger.error(f"❌ Error creating blocks: {e}")
         return None
 
-def create_merkle_commitment(block_metadata: List[Dict], upload_id: str, user_id: str = "cli_user", target_block_size_mb: float = 2.0) -> Dict:
-    """Create Merkle tree commitment from block metadata."""
+def create_raw_blocks_from_csv(csv_file, upload_id, blocks_dir, block_size_mb=2.0, engine='raw', compression='none'):
+    """
+    Create data blocks by cutting the CSV's own bytes on record boundaries
+    """
+    print(f"📄 Splitting CSV file on record boundaries: {csv_file}")
+    
+    try:
+        file_size_mb = os.path.getsize(csv_file) / (1024 * 1024)
+        target_block_size_bytes = int(block_size_mb * 1024 * 1024)
+        
+        print(f"📊 File info:")
+        print(f"   📏 Size: {file_size_mb:.2f} MB")
+        print(f"📦 Target block size: {block_size_mb} MB")
+        
+        blocks_dir.mkdir(parents=True, exist_ok=True)
+        header = read_csv_header(csv_file)
+        padding_hash, padding_size = padding_block_digest(header)
+        block_metadata = []
+        total_rows = 0
+        
+        blocks = iter_byte_blocks(csv_file, target_block_size_bytes, engine)
+        for block_index, (data, row_count) in enumerate(tqdm(blocks, desc="Creating blocks")):
+            block_id = f"block_{block_index + 1:04d}"
+            if not data:
+                block_metadata.append(padding_metadata(block_id, padding_hash, padding_size, upload_id))
+                continue
+            block_file = blocks_dir / f"{block_id}.csv"
+            
+            block_hash, size_bytes = write_block_bytes(block_file, header, data, compression=compression)
+            
+            total_rows += row_count
+            metadata = {
+                "block_id": block_id,
+                "hash": block_hash,
+                "row_count": row_count,
+                "size_bytes": size_bytes,
+                "size_mb": size_bytes / (1024 * 1024),
+                "is_empty": row_count == 0,
+                "timestamp": datetime.now().isoformat(),
+                "upload_id": upload_id,
+                "local_path": str(block_file)
+            }
+            if compression != 'none':
+                metadata.update(compression=compression, stored_bytes=block_file.stat().st_size)
+            block_metadata.append(metadata)
+        
+        print(f"   📋 Rows: {total_rows}")
+        print(f"✅ Created {len(block_metadata)} data blocks in {blocks_dir}")
+        
+        return {
+            'total_blocks': len(block_metadata),
+            'file_size_mb': file_size_mb,
+            'rows_processed': total_rows,
+            'blocks_dir': str(blocks_dir),
+            'block_metadata': block_metadata
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error creating blocks: {e}")
+        return None
+
+def create_merkle_commitment(block_metadata: List[Dict], upload_id: str, user_id: str = "cli_user", target_block_size_mb: float = 2.0,
+                             path_mode: str = 'embedded') -> Dict:
+    """Create Merkle tree commitment from block metadata (see PATH_MODES for path storage)."""
     print(f"🌳 Building Merkle tree commitment for {len(block_metadata)} blocks...")
     
     # Extract block hashes
@@ -213,15 +257,17 @@ def create_merkle_commitment(block_metadata: List[Dict], upload_id: str, user_id
     # Build Merkle tree
     merkle_tree = StandaloneMerkleTree(block_hashes)
     
-    # Generate authentication paths for each block
-    print("🔐 Generating authentication paths...")
-    for i, block in enumerate(block_metadata):
-        auth_path = merkle_tree.get_authentication_path(i)
-        block['authentication_path'] = auth_path
+    if path_mode == 'embedded':
+        # Generate authentication paths for each block
+        print("🔐 Generating authentication paths...")
+        for i, block in enumerate(block_metadata):
+            auth_path = merkle_tree.get_authentication_path(i)
+            block['authentication_path'] = auth_path
     
     # Calculate statistics
     non_empty_blocks = [b for b in block_metadata if not b.get('is_empty', False)]
     empty_blocks = len(block_metadata) - len(non_empty_blocks)
+    padding_blocks = [b for b in block_metadata if b.get('is_padding', False)]
     
     commitment_data = {
         "commitment_type": "merkle_tree",
@@ -230,6 +276,8 @@ def create_merkle_commitment(block_metadata: List[Dict], upload_id: str, user_id
         "total_blocks": len(block_metadata),
         "data_blocks": len(non_empty_blocks),
         "empty_blocks": empty_blocks,
+        "padding_blocks": len(padding_blocks),
+        "padding_hash": padding_blocks[0]['hash'] if padding_blocks else None,
         "blocks_power_of_2": True,
         "target_block_size_mb": target_block_size_mb,
         "timestamp": datetime.now().isoformat(),
@@ -237,7 +285,7 @@ def create_merkle_commitment(block_metadata: List[Dict], upload_id: str, user_id
         "user_id": user_id,
         "block_metadata": block_metadata,
         "merkle_tree_structure": {
-            "height": len(merkle_tree.tree),
+            "height": merkle_tree.height,
             "leaf_count": len(block_hashes),
             "is_complete_binary_tree": True
         },
@@ -251,14 +299,19 @@ def create_merkle_commitment(block_metadata: List[Dict], upload_id: str, user_id
         }
     }
     
+    if path_mode == 'on_demand':
+        print("🔐 Storing tree levels for on-demand authentication paths...")
+        commitment_data["path_mode"] = path_mode
+        commitment_data["merkle_levels"] = merkle_tree.parent_levels_hex()
+    
     print(f"✅ Merkle root: {merkle_tree.root}")
-    print(f"🌲 Tree height: {len(merkle_tree.tree)}")
+    print(f"🌲 Tree height: {merkle_tree.height}")
     print(f"📊 Data blocks: {len(non_empty_blocks)}, Empty blocks: {empty_blocks}")
     
     return commitment_data
 
-def save_commitment_file(commitment_data: Dict, upload_id: str) -> str:
-    """Save commitment file to local storage and return path."""
+def save_commitment_file(commitment_data: Dict, upload_id: str, binary: bool = False) -> str:
+    """Save commitment file to local storage and return path (optionally with a binary .zkc copy)."""
     project_root = Path(__file__).parent
     commitments_dir = project_root / "merkle_commitments"
     commitments_dir.mkdir(exist_ok=True)
@@ -271,6 +324,10 @@ def save_commitment_file(commitment_data: Dict, upload_id: str) -> str:
         json.dump(commitment_data, f, indent=2)
     
     print(f"💾 Commitment file saved: {commitment_path}")
+    
+    if binary:
+        binary_path = write_binary_commitment(commitment_data, commitments_dir / f"commitment_{upload_id}.zkc")
+        print(f"💾 Binary commitment saved: {binary_path}")
     return str(commitment_path)
 
 def run_block_selection(total_blocks, upload_id, confidence=0.95, min_corruption=0.05):
@@ -522,12 +579,28 @@ def display_final_results(file_info, selected_blocks, verification_result):
 
 def main():
     """Main function for standalone audit"""
-    if len(sys.argv) != 2:
-        print("Usage: python3 standalone_audit.py <filename.csv>")
-        print("Example: python3 standalone_audit.py sample_financial_dataset.csv")
-        sys.exit(1)
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        description='ZK Audit System - Standalone Audit',
+        epilog='Example: python3 standalone_audit.py sample_financial_dataset.csv'
+    )
+    parser.add_argument('csv_file', help='Path to input CSV file')
+    parser.add_argument('--streaming', action='store_true',
+                       help='Read the CSV in bounded chunks instead of loading it whole')
+    parser.add_argument('--engine', choices=ENGINES, default='pandas',
+                       help='Block splitting engine: pandas re-serializes rows, raw copies source bytes, '
+                            'cdc copies source bytes with content-defined boundaries (default: pandas)')
+    parser.add_argument('--compression', choices=COMPRESSIONS, default='none',
+                       help='Store block files compressed; hashes cover the uncompressed CSV (default: none)')
+    parser.add_argument('--path-mode', choices=PATH_MODES, default='embedded',
+                       help='Embed every authentication path, or store tree levels once and derive '
+                            'paths on demand (default: embedded)')
+    parser.add_argument('--binary-commitment', action='store_true',
+                       help='Also write the commitment in the random-access binary format (.zkc)')
     
-    csv_file = sys.argv[1]
+    args = parser.parse_args()
+    csv_file = args.csv_file
     
     print_header("ZK AUDIT SYSTEM - STANDALONE AUDIT")
     print(f"🎯 Target file: {csv_file}")
@@ -548,7 +621,8 @@ def main():
     try:
         # Step 1: Create blocks from CSV
         print_step(1, "Creating data blocks from CSV file")
-        file_info = create_blocks_from_csv(csv_file, upload_id, blocks_dir)
+        file_info = create_blocks_from_csv(csv_file, upload_id, blocks_dir, streaming=args.streaming,
+                                           engine=args.engine, compression=args.compression)
         if not file_info:
             logger.error("❌ Failed to create data blocks")
             sys.exit(1)
@@ -559,9 +633,10 @@ def main():
             file_info['block_metadata'], 
             upload_id, 
             user_id="cli_user",
-            target_block_size_mb=2.0
+            target_block_size_mb=2.0,
+            path_mode=args.path_mode
         )
-        commitment_file_path = save_commitment_file(commitment_data, upload_id)
+        commitment_file_path = save_commitment_file(commitment_data, upload_id, binary=args.binary_commitment)
         
         # Step 3: Select all blocks for comprehensive audit
         print_step(3, "Selecting all blocks for comprehensive audit")
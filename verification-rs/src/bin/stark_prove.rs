@@ -1,6 +1,8 @@
 use anyhow::Result;
 use clap::Parser;
-use merkle_verification::{load_commitment, get_root_hash, stark::generate_stark_proof};
+use merkle_verification::{
+    load_commitment, get_root_hash, get_authentication_path, stark::generate_stark_proof,
+};
 use std::fs;
 use std::path::PathBuf;
 
@@ -40,15 +42,16 @@ fn main() -> Result<()> {
     }
 
     let block = &blocks[args.block_index];
+    let auth_path = get_authentication_path(&commitment, args.block_index)?;
     
     println!("📦 Generating STARK proof for block: {}", block.block_id);
     println!("   Block hash: {}", block.hash);
     println!("   Root hash: {}", root_hash);
-    println!("   Auth path length: {}", block.authentication_path.len());
+    println!("   Auth path length: {}", auth_path.len());
 
     if args.verbose {
         println!("\n🔍 Authentication path:");
-        for (i, hash) in block.authentication_path.iter().enumerate() {
+        for (i, hash) in auth_path.iter().enumerate() {
             println!("   Level {}: {}", i + 1, hash);
         }
     }
@@ -59,7 +62,7 @@ fn main() -> Result<()> {
     let proof = generate_stark_proof(
         &block.hash,
         args.block_index,
-        &block.authentication_path,
+        &auth_path,
         &root_hash,
     )?;
 
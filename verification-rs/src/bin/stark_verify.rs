@@ -1,6 +1,9 @@
 use anyhow::Result;
 use clap::Parser;
-use merkle_verification::{load_commitment, get_root_hash, stark::{verify_stark_proof, SimpleStarkProof}};
+use merkle_verification::{
+    load_commitment, get_root_hash, get_authentication_path,
+    stark::{verify_stark_proof, SimpleStarkProof},
+};
 use std::fs;
 use std::path::PathBuf;
 
@@ -48,11 +51,12 @@ fn main() -> Result<()> {
     }
 
     let block = &blocks[args.block_index];
+    let auth_path = get_authentication_path(&commitment, args.block_index)?;
     
     println!("📦 Verifying STARK proof for block: {}", block.block_id);
     println!("   Block hash: {}", block.hash);
     println!("   Root hash: {}", root_hash);
-    println!("   Auth path length: {}", block.authentication_path.len());
+    println!("   Auth path length: {}", auth_path.len());
 
     if args.verbose {
         println!("\n🔍 Proof details:");
@@ -69,7 +73,7 @@ fn main() -> Result<()> {
         proof,
         &block.hash,
         &root_hash,
-        block.authentication_path.len(),
+        auth_path.len(),
     )?;
 
     let verify_time = start_time.elapsed();
@@ -1,6 +1,7 @@
 use anyhow::Result;
 use merkle_verification::{
-    load_commitment, get_root_hash, verify_merkle_path, compute_block_file_hash,
+    load_commitment, get_root_hash, verify_merkle_path, compute_upload_block_hash,
+    compute_padding_hash, read_upload_block, get_authentication_path,
     stark::{generate_stark_proof, verify_stark_proof}
 };
 use std::env;
@@ -51,6 +52,9 @@ fn main() -> Result<()> {
     println!("   Tree height: {}", commitment.merkle_tree_structure.as_ref().map(|s| s.height).unwrap_or(0));
     println!("   Root hash: {}", root_hash);
     
+    // Block files or a pack (segment files and index); read_upload_block handles both
+    let blocks_dir = format!("../upload_blocks/{}", upload_id);
+    
     let mut verification_results = Vec::new();
     let mut total_proof_size = 0;
     let mut total_generation_time = 0;
@@ -67,12 +71,23 @@ fn main() -> Result<()> {
         let block = &blocks[block_index];
         println!("\n🔍 VERIFYING BLOCK {}: {}", block_index, block.block_id);
         
-        // Calculate the current hash of the block file
-        let block_file_path = format!("../upload_blocks/{}/{}.csv", upload_id, block.block_id);
-        let current_hash = match compute_block_file_hash(&block_file_path) {
+        // Calculate the current hash of the block file. Padding leaves have no
+        // file: they must equal the header-only block of this upload, rebuilt
+        // from the header of the first data block
+        let hash_result = if block.is_padding {
+            println!("   🧱 Structural padding leaf (virtual, no block file)");
+            match blocks.iter().find(|b| !b.is_padding) {
+                Some(data_block) => read_upload_block(&blocks_dir, &data_block.block_id)
+                    .map(|data| compute_padding_hash(&data)),
+                None => Err(anyhow::anyhow!("upload has no data blocks")),
+            }
+        } else {
+            compute_upload_block_hash(&blocks_dir, &block.block_id)
+        };
+        let current_hash = match hash_result {
             Ok(hash) => hash,
             Err(e) => {
-                println!("❌ Failed to read block file {}: {}", block_file_path, e);
+                println!("❌ Failed to read block file for block {}: {}", block_index, e);
                 continue;
             }
         };
@@ -80,7 +95,8 @@ fn main() -> Result<()> {
         println!("   Original hash: {}", block.hash);
         println!("   Current hash:  {}", current_hash);
         println!("   Block size: {:.2} MB", block.size_mb);
-        println!("   Auth path length: {}", block.authentication_path.len());
+        let auth_path = get_authentication_path(&commitment, block_index)?;
+        println!("   Auth path length: {}", auth_path.len());
         
         // Check for tampering
         if current_hash != block.hash {
@@ -97,7 +113,7 @@ fn main() -> Result<()> {
         let traditional_result = verify_merkle_path(
             &block.hash,
             block_index,
-            &block.authentication_path,
+            &auth_path,
             &root_hash,
             false,
         )?;
@@ -117,7 +133,7 @@ fn main() -> Result<()> {
         let stark_proof = generate_stark_proof(
             &block.hash,
             block_index,
-            &block.authentication_path,
+            &auth_path,
             &root_hash,
         )?;
         let prove_time = prove_start.elapsed();
@@ -135,7 +151,7 @@ fn main() -> Result<()> {
             stark_proof.clone(),
             &block.hash,
             &root_hash,
-            block.authentication_path.len(),
+            auth_path.len(),
         )?;
         let verify_time = verify_start.elapsed();
         total_verification_time += verify_time.as_micros();
@@ -169,10 +185,9 @@ fn main() -> Result<()> {
         println!("📈 Average verification time: {} μs", total_verification_time / total_verifications as u128);
         
         // Privacy analysis
-        let traditional_path_size = blocks.iter()
-            .enumerate()
-            .filter(|(i, _)| selected_blocks.contains(i))
-            .map(|(_, block)| block.authentication_path.len() * 64)
+        let traditional_path_size = selected_blocks.iter()
+            .filter(|&&i| i < blocks.len())
+            .map(|&i| get_authentication_path(&commitment, i).map_or(0, |path| path.len() * 64))
             .sum::<usize>();
         
         println!("\n🔐 PRIVACY ANALYSIS");
@@ -2,6 +2,7 @@ use anyhow::{Context, Result};
 use serde::{Deserialize, Serialize};
 use sha3::{Digest, Sha3_256};
 use std::fs;
+use std::io::{Read, Seek, SeekFrom};
 use std::path::Path;
 
 // STARK implementation modules
@@ -15,12 +16,22 @@ pub struct MerkleCommitment {
     pub total_blocks: usize,
     pub data_blocks: usize,
     pub empty_blocks: usize,
+    /// Virtual padding leaves at the end of the tree (no block files)
+    #[serde(default)]
+    pub padding_blocks: usize,
+    /// Hash shared by every padding leaf: SHA3-256 of the header-only block
+    #[serde(default)]
+    pub padding_hash: Option<String>,
     pub blocks_power_of_2: bool,
     pub target_block_size_mb: f64,
     pub timestamp: String,
     pub block_metadata: Vec<BlockMetadata>,
     pub merkle_tree_structure: Option<MerkleTreeStructure>,
     pub size_statistics: Option<SizeStatistics>,
+    /// Tree levels above the leaves (root last), each one concatenated hex
+    /// string; present when authentication paths are derived on demand
+    #[serde(default, skip_serializing_if = "Option::is_none")]
+    pub merkle_levels: Option<Vec<String>>,
 }
 
 #[derive(Debug, Deserialize, Serialize)]
@@ -32,7 +43,10 @@ pub struct BlockMetadata {
     pub size_mb: f64,
     pub is_empty: bool,
     pub timestamp: String,
+    #[serde(default)]
     pub authentication_path: Vec<String>,
+    #[serde(default)]
+    pub is_padding: bool,
 }
 
 #[derive(Debug, Deserialize, Serialize)]
@@ -63,8 +77,7 @@ pub fn compute_sha3_hash_str(data: &str) -> String {
 
 /// Calculate the SHA3-256 hash of a block file
 pub fn compute_block_file_hash(file_path: &str) -> Result<String> {
-    let data = fs::read(file_path)
-        .with_context(|| format!("Failed to read block file: {}", file_path))?;
+    let data = read_block_file(Path::new(file_path))?;
     Ok(compute_sha3_hash(&data))
 }
 
@@ -125,10 +138,86 @@ pub fn verify_merkle_path(
     Ok(current_hash == expected_root)
 }
 
+/// Magic prefix of the binary commitment format (binary_commitment.py)
+pub const BINARY_COMMITMENT_MAGIC: &[u8; 8] = b"ZKCOMMIT";
+const BINARY_HEADER_SIZE: usize = 64;
+const DIGEST_SIZE: usize = 32;
+
 pub fn load_commitment<P: AsRef<Path>>(path: P) -> Result<MerkleCommitment> {
-    let content = fs::read_to_string(path).context("Failed to read commitment file")?;
+    let content = fs::read(path).context("Failed to read commitment file")?;
+    if content.starts_with(BINARY_COMMITMENT_MAGIC) {
+        return parse_binary_commitment(&content);
+    }
     let commitment: MerkleCommitment =
-        serde_json::from_str(&content).context("Failed to parse commitment JSON")?;
+        serde_json::from_slice(&content).context("Failed to parse commitment JSON")?;
+    Ok(commitment)
+}
+
+fn read_u64(data: &[u8], offset: usize) -> Result<usize> {
+    let bytes = data
+        .get(offset..offset + 8)
+        .context("Truncated binary commitment")?;
+    Ok(u64::from_le_bytes(bytes.try_into().unwrap()) as usize)
+}
+
+/// Decode a binary commitment: the tree section becomes block hashes plus
+/// `merkle_levels`, so paths are derived with `get_authentication_path`.
+pub fn parse_binary_commitment(data: &[u8]) -> Result<MerkleCommitment> {
+    if data.len() < BINARY_HEADER_SIZE || !data.starts_with(BINARY_COMMITMENT_MAGIC) {
+        anyhow::bail!("Not a binary commitment file");
+    }
+    let version = u16::from_le_bytes([data[8], data[9]]);
+    let digest_size = u16::from_le_bytes([data[10], data[11]]) as usize;
+    if version != 1 || digest_size != DIGEST_SIZE {
+        anyhow::bail!("Unsupported binary commitment version {}", version);
+    }
+    let leaf_count = u32::from_le_bytes(data[12..16].try_into().unwrap()) as usize;
+    let height = u32::from_le_bytes(data[16..20].try_into().unwrap()) as usize;
+    let tree_offset = read_u64(data, 20)?;
+    let index_offset = read_u64(data, 28)?;
+    let records_offset = read_u64(data, 36)?;
+    let info_offset = read_u64(data, 44)?;
+    let info_length = read_u64(data, 52)?;
+
+    // Every level as one hex string, leaves first
+    let mut levels = Vec::with_capacity(height);
+    let (mut offset, mut size) = (tree_offset, leaf_count);
+    for _ in 0..height {
+        let level = data
+            .get(offset..offset + size * DIGEST_SIZE)
+            .context("Truncated binary commitment tree")?;
+        levels.push(hex::encode(level));
+        offset += size * DIGEST_SIZE;
+        size = size.div_ceil(2);
+    }
+
+    let info = data
+        .get(info_offset..info_offset + info_length)
+        .context("Truncated binary commitment info")?;
+    let mut commitment: serde_json::Value =
+        serde_json::from_slice(info).context("Failed to parse commitment info")?;
+    let root = levels.last().cloned().unwrap_or_default();
+    commitment["root_hash"] = serde_json::json!([root]);
+    commitment["block_metadata"] = serde_json::json!([]);
+    let mut commitment: MerkleCommitment =
+        serde_json::from_value(commitment).context("Failed to parse commitment info")?;
+
+    let leaf_hex = &levels[0];
+    for i in 0..leaf_count {
+        let start = read_u64(data, index_offset + i * 8)?;
+        let end = read_u64(data, index_offset + (i + 1) * 8)?;
+        let record = data
+            .get(records_offset + start..records_offset + end)
+            .context("Truncated binary commitment record")?;
+        let mut block: serde_json::Value =
+            serde_json::from_slice(record).context("Failed to parse block record")?;
+        block["hash"] = serde_json::Value::String(leaf_hex[i * 64..(i + 1) * 64].to_string());
+        commitment
+            .block_metadata
+            .push(serde_json::from_value(block).context("Failed to parse block record")?);
+    }
+
+    commitment.merkle_levels = Some(levels.split_off(1));
     Ok(commitment)
 }
 
@@ -137,10 +226,201 @@ pub fn get_root_hash(commitment: &MerkleCommitment) -> String {
     commitment.root_hash[0].clone()
 }
 
+/// Hash of the header-only block a padding leaf stands for, derived from
+/// the header line of any data block file of the same upload.
+pub fn compute_padding_hash_from_block(file_path: &str) -> Result<String> {
+    let data = read_block_file(Path::new(file_path))?;
+    Ok(compute_padding_hash(&data))
+}
+
+/// SHA3-256 of the header-only block built from a data block's bytes.
+pub fn compute_padding_hash(data: &[u8]) -> String {
+    // First newline outside a quoted field ends the header record
+    let mut in_quotes = false;
+    let mut header_end = data.len();
+    for (pos, &byte) in data.iter().enumerate() {
+        match byte {
+            b'"' => in_quotes = !in_quotes,
+            b'\n' if !in_quotes => {
+                header_end = pos + 1;
+                break;
+            }
+            _ => {}
+        }
+    }
+    compute_sha3_hash(&data[..header_end])
+}
+
+const GZIP_MAGIC: &[u8] = b"\x1f\x8b";
+const ZSTD_MAGIC: &[u8] = b"\x28\xb5\x2f\xfd";
+
+/// Canonical CSV bytes of a stored block. Blocks written with
+/// `--compression gzip|zstd` are recognised by their magic bytes; hashes
+/// always cover the uncompressed bytes (see block_compression.py).
+pub fn decompress_block(stored: Vec<u8>) -> Result<Vec<u8>> {
+    if stored.starts_with(GZIP_MAGIC) {
+        let mut data = Vec::new();
+        flate2::read::MultiGzDecoder::new(&stored[..])
+            .read_to_end(&mut data)
+            .context("Failed to decompress gzip block")?;
+        Ok(data)
+    } else if stored.starts_with(ZSTD_MAGIC) {
+        zstd::stream::decode_all(&stored[..]).context("Failed to decompress zstd block")
+    } else {
+        Ok(stored)
+    }
+}
+
+/// Canonical bytes of a block file, decompressing it if needed
+fn read_block_file(file_path: &Path) -> Result<Vec<u8>> {
+    let stored = fs::read(file_path)
+        .with_context(|| format!("Failed to read block file: {}", file_path.display()))?;
+    decompress_block(stored)
+}
+
+/// Pack index of a blocks directory written with `--storage pack`
+pub const PACK_INDEX: &str = "pack.idx";
+const PACK_MAGIC: &[u8; 8] = b"ZKBLKPAK";
+const PACK_HEADER_SIZE: usize = 16;
+const PACK_ENTRY_SIZE: usize = 60;
+
+/// Canonical bytes of one block of an upload: `<blocks_dir>/<block_id>.csv`,
+/// or its range of a segment file when the directory holds a pack index,
+/// decompressed if it was stored compressed.
+///
+/// Pack index entries (little-endian, one per block index) are segment u32,
+/// offset u64, length u64, mtime f64 and the 32-byte digest; see
+/// block_storage.py.
+pub fn read_upload_block(blocks_dir: &str, block_id: &str) -> Result<Vec<u8>> {
+    let dir = Path::new(blocks_dir);
+    let index_path = dir.join(PACK_INDEX);
+    if !index_path.exists() {
+        return read_block_file(&dir.join(format!("{}.csv", block_id)));
+    }
+
+    let block_index = block_id
+        .rsplit('_')
+        .next()
+        .and_then(|n| n.parse::<usize>().ok())
+        .and_then(|n| n.checked_sub(1))
+        .ok_or_else(|| anyhow::anyhow!("Invalid block id: {}", block_id))?;
+    let index = fs::read(&index_path)
+        .with_context(|| format!("Failed to read pack index: {}", index_path.display()))?;
+    if index.len() < PACK_HEADER_SIZE || &index[..8] != PACK_MAGIC {
+        anyhow::bail!("{} is not a block pack index", index_path.display());
+    }
+    let entry_size = u16::from_le_bytes([index[10], index[11]]) as usize;
+    let count = u32::from_le_bytes(index[12..16].try_into()?) as usize;
+    if entry_size != PACK_ENTRY_SIZE {
+        anyhow::bail!("Unsupported pack index entry size {}", entry_size);
+    }
+    let start = PACK_HEADER_SIZE + block_index * PACK_ENTRY_SIZE;
+    if block_index >= count || index.len() < start + PACK_ENTRY_SIZE {
+        anyhow::bail!("{} is not stored in {}", block_id, blocks_dir);
+    }
+    let entry = &index[start..start + PACK_ENTRY_SIZE];
+    let segment = u32::from_le_bytes(entry[0..4].try_into()?);
+    let offset = u64::from_le_bytes(entry[4..12].try_into()?);
+    let length = u64::from_le_bytes(entry[12..20].try_into()?) as usize;
+    if length == 0 {
+        anyhow::bail!("{} is not stored in {}", block_id, blocks_dir);
+    }
+
+    let segment_path = dir.join(format!("pack_{:05}.seg", segment));
+    let mut file = fs::File::open(&segment_path)
+        .with_context(|| format!("Failed to open pack segment: {}", segment_path.display()))?;
+    let mut data = vec![0u8; length];
+    file.seek(SeekFrom::Start(offset))?;
+    file.read_exact(&mut data)
+        .with_context(|| format!("Failed to read {} from {}", block_id, segment_path.display()))?;
+    decompress_block(data)
+}
+
+/// SHA3-256 of one block of an upload, stored as a file or in a pack
+pub fn compute_upload_block_hash(blocks_dir: &str, block_id: &str) -> Result<String> {
+    Ok(compute_sha3_hash(&read_upload_block(blocks_dir, block_id)?))
+}
+
+/// Authentication path for one block, leaf level first.
+///
+/// Embedded commitments carry the path in the block entry; on-demand
+/// commitments store `merkle_levels` and the path is sliced out of them.
+pub fn get_authentication_path(
+    commitment: &MerkleCommitment,
+    leaf_index: usize,
+) -> Result<Vec<String>> {
+    let blocks = &commitment.block_metadata;
+    let block = blocks
+        .get(leaf_index)
+        .with_context(|| format!("Block index {} out of range", leaf_index))?;
+
+    let levels = match &commitment.merkle_levels {
+        None => return Ok(block.authentication_path.clone()),
+        Some(levels) => levels,
+    };
+    if levels.is_empty() {
+        return Ok(Vec::new()); // single-leaf tree
+    }
+
+    const WIDTH: usize = 64;
+    let mut sibling_index = leaf_index ^ 1;
+    if sibling_index >= blocks.len() {
+        sibling_index = leaf_index;
+    }
+    let mut auth_path = vec![blocks[sibling_index].hash.clone()];
+    let mut current_index = leaf_index / 2;
+
+    for level_hex in &levels[..levels.len() - 1] {
+        let mut sibling_index = current_index ^ 1;
+        if sibling_index >= level_hex.len() / WIDTH {
+            sibling_index = current_index;
+        }
+        let sibling = level_hex
+            .get(sibling_index * WIDTH..(sibling_index + 1) * WIDTH)
+            .context("Malformed merkle_levels entry")?;
+        auth_path.push(sibling.to_string());
+        current_index /= 2;
+    }
+
+    Ok(auth_path)
+}
+
 #[cfg(test)]
 mod tests {
     use super::*;
 
+    #[test]
+    fn test_read_upload_block_from_pack() {
+        let dir = std::env::temp_dir().join(format!("zk_pack_test_{}", std::process::id()));
+        fs::create_dir_all(&dir).unwrap();
+        let (first, second) = (b"a,b\n1,2\n".to_vec(), b"a,b\n3,4\n".to_vec());
+        let mut segment = first.clone();
+        segment.extend_from_slice(&second);
+        fs::write(dir.join("pack_00000.seg"), &segment).unwrap();
+
+        let mut index = Vec::new();
+        index.extend_from_slice(PACK_MAGIC);
+        index.extend_from_slice(&1u16.to_le_bytes());
+        index.extend_from_slice(&(PACK_ENTRY_SIZE as u16).to_le_bytes());
+        index.extend_from_slice(&3u32.to_le_bytes());
+        for (offset, data) in [(0u64, &first), (first.len() as u64, &second)] {
+            index.extend_from_slice(&0u32.to_le_bytes());
+            index.extend_from_slice(&offset.to_le_bytes());
+            index.extend_from_slice(&(data.len() as u64).to_le_bytes());
+            index.extend_from_slice(&0f64.to_le_bytes());
+            index.extend_from_slice(&[0u8; 32]);
+        }
+        // Third entry: a virtual padding leaf with no stored bytes
+        index.extend_from_slice(&[0u8; PACK_ENTRY_SIZE]);
+        fs::write(dir.join(PACK_INDEX), &index).unwrap();
+
+        let dir_str = dir.to_str().unwrap();
+        assert_eq!(read_upload_block(dir_str, "block_0002").unwrap(), second);
+        assert_eq!(compute_upload_block_hash(dir_str, "block_0001").unwrap(), compute_sha3_hash(&first));
+        assert!(read_upload_block(dir_str, "block_0003").is_err());
+        fs::remove_dir_all(&dir).unwrap();
+    }
+
     #[test]
     fn test_sha3_hash() {
         let input = "hello world";
@@ -161,4 +441,78 @@ mod tests {
         let result = verify_merkle_path(leaf_hash, 0, &auth_path, &expected_root, false);
         assert!(result.unwrap());
     }
-}
\ No newline at end of file
+
+    #[test]
+    fn test_on_demand_authentication_path() {
+        // Three leaves: the odd third leaf is paired with itself
+        let leaves: Vec<String> = ["a", "b", "c"]
+            .iter()
+            .map(|s| compute_sha3_hash_str(s))
+            .collect();
+        let ab = compute_sha3_hash_str(&format!("{}{}", leaves[0], leaves[1]));
+        let cc = compute_sha3_hash_str(&format!("{}{}", leaves[2], leaves[2]));
+        let root = compute_sha3_hash_str(&format!("{}{}", ab, cc));
+
+        let block = |hash: &String| BlockMetadata {
+            block_id: String::new(),
+            hash: hash.clone(),
+            row_count: 0,
+            size_bytes: 0,
+            size_mb: 0.0,
+            is_empty: false,
+            timestamp: String::new(),
+            authentication_path: Vec::new(),
+            is_padding: false,
+        };
+        let commitment = MerkleCommitment {
+            commitment_type: "merkle_tree".to_string(),
+            hash_algorithm: "sha3_256".to_string(),
+            root_hash: vec![root.clone()],
+            total_blocks: 3,
+            data_blocks: 3,
+            empty_blocks: 0,
+            padding_blocks: 0,
+            padding_hash: None,
+            blocks_power_of_2: false,
+            target_block_size_mb: 2.0,
+            timestamp: String::new(),
+            block_metadata: leaves.iter().map(block).collect(),
+            merkle_tree_structure: None,
+            size_statistics: None,
+            merkle_levels: Some(vec![format!("{}{}", ab, cc), root.clone()]),
+        };
+
+        for (i, leaf) in leaves.iter().enumerate() {
+            let path = get_authentication_path(&commitment, i).unwrap();
+            assert_eq!(path.len(), 2);
+            assert!(verify_merkle_path(leaf, i, &path, &root, false).unwrap());
+        }
+    }
+
+    #[test]
+    fn test_padding_hash_from_block_header() {
+        let dir = tempfile::tempdir().unwrap();
+        let path = dir.path().join("block_0001.csv");
+        fs::write(&path, b"id,\"multi\nline\"\n1,2\n").unwrap();
+
+        let padding_hash = compute_padding_hash_from_block(path.to_str().unwrap()).unwrap();
+        assert_eq!(padding_hash, compute_sha3_hash(b"id,\"multi\nline\"\n"));
+    }
+
+    #[test]
+    fn test_compressed_block_hashes_canonical_bytes() {
+        use std::io::Write;
+
+        let dir = tempfile::tempdir().unwrap();
+        let data = b"a,b\n1,2\n3,4\n";
+        let mut encoder = flate2::write::GzEncoder::new(Vec::new(), flate2::Compression::default());
+        encoder.write_all(data).unwrap();
+        fs::write(dir.path().join("block_0001.csv"), encoder.finish().unwrap()).unwrap();
+        fs::write(dir.path().join("block_0002.csv"), zstd::stream::encode_all(&data[..], 3).unwrap()).unwrap();
+
+        let blocks_dir = dir.path().to_str().unwrap();
+        for block_id in ["block_0001", "block_0002"] {
+            assert_eq!(compute_upload_block_hash(blocks_dir, block_id).unwrap(), compute_sha3_hash(data));
+        }
+    }
+}